@@ -1,11 +1,21 @@
 """Chat endpoint for LLM interactions"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
 import logging
+import time
 
+from app.core.config import settings
 from app.core.llm import llm_manager
+from app.core.search_filters import SearchFilters
+from app.db.session import get_db
+from app.services.chat_batch import run_chat_batch
+from app.services.collection_service import CollectionNotFoundError, collection_service
+from app.services.rag_service import rag_service
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +36,58 @@ class ChatResponse(BaseModel):
     tokens_used: Optional[int] = Field(None, description="Number of tokens in the answer")
 
 
+class RAGChatRequest(ChatRequest):
+    """RAG chat request model"""
+    limit: Optional[int] = Field(None, ge=1, le=50, description="Chunks to retrieve")
+    min_similarity: Optional[float] = Field(None, ge=-1.0, le=1.0, description="Minimum cosine similarity")
+    context_tokens: Optional[int] = Field(None, ge=1, le=100000, description="Context token budget")
+    mode: str = Field("vector", pattern="^(vector|hybrid)$", description="Retrieval mode")
+    collection: Optional[str] = Field(None, description="Retrieve only from this collection")
+    filters: Optional[SearchFilters] = Field(None, description="Optional document and chunk metadata filters")
+
+
+class BatchChatRequest(BaseModel):
+    """Batch of independent chat prompts"""
+    items: List[ChatRequest] = Field(..., min_length=1, description="Prompts to answer independently")
+    concurrency: Optional[int] = Field(None, ge=1, description="Prompts in flight, capped by the server")
+    stream: bool = Field(False, description="Return NDJSON lines as items finish instead of one response")
+
+
+class BatchChatResult(BaseModel):
+    """Outcome of one batch item"""
+    index: int = Field(..., description="Position of the item in the request")
+    answer: Optional[str] = None
+    tokens_used: Optional[int] = None
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class BatchChatResponse(BaseModel):
+    """Batch chat response model"""
+    results: List[BatchChatResult] = Field(..., description="Results in request order")
+    succeeded: int
+    failed: int
+    total_ms: float
+
+
+class Citation(BaseModel):
+    """A context passage the answer may cite as [number]"""
+    number: int
+    document_id: int
+    chunk_index: int
+    chunk_id: int
+    filename: Optional[str] = None
+    similarity: Optional[float] = None
+
+
+class RAGChatResponse(ChatResponse):
+    """RAG chat response model"""
+    citations: List[Citation] = Field(default_factory=list, description="Passages included in the prompt")
+    context_tokens: int = Field(..., description="Tokens of retrieved context in the prompt")
+    retrieval_ms: float = Field(..., description="Retrieval and context assembly time")
+    generation_ms: float = Field(..., description="LLM generation time")
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest) -> ChatResponse:
     """
@@ -48,16 +110,15 @@ async def chat(request: ChatRequest) -> ChatResponse:
         )
 
     try:
-        # Generate response
-        answer = await llm_manager.generate(
+        # Generate response; the token count is the provider-reported usage
+        result = await llm_manager.generate_with_usage(
             prompt=request.message,
             system_prompt=request.system_prompt,
             temperature=request.temperature,
             max_tokens=request.max_tokens
         )
-
-        # Count tokens in response
-        tokens_used = llm_manager.count_tokens(answer)
+        answer = result.text
+        tokens_used = result.completion_tokens
 
         logger.info(f"Chat request processed: {len(request.message)} chars -> {tokens_used} tokens")
 
@@ -72,3 +133,237 @@ async def chat(request: ChatRequest) -> ChatResponse:
             status_code=500,
             detail=f"Failed to generate response: {str(e)}"
         )
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one server-sent event with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def stream_chat_events(request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Server-sent events for a streamed completion
+
+    Each content delta is sent as a `data: {"token": ...}` event. The stream
+    ends with a `done` event carrying token count and timings, or an `error`
+    event if generation fails after the response has started.
+
+    Args:
+        request: Chat request
+
+    Yields:
+        Encoded SSE events
+    """
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+    pieces: List[str] = []
+
+    def on_first_token(ttft_ms: float) -> None:
+        timings["ttft_ms"] = ttft_ms
+
+    stream = llm_manager.generate_stream(
+        prompt=request.message,
+        system_prompt=request.system_prompt,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+        on_first_token=on_first_token
+    )
+    try:
+        async for piece in stream:
+            pieces.append(piece)
+            yield sse_event({"token": piece})
+    except Exception as e:
+        logger.error(f"Chat stream failed: {e}")
+        yield sse_event({"detail": f"Failed to generate response: {str(e)}"}, event="error")
+        return
+    finally:
+        # Runs when the client disconnects too, closing the upstream completion
+        await stream.aclose()
+
+    answer = "".join(pieces)
+    total_ms = (time.perf_counter() - start) * 1000
+    ttft_ms = timings.get("ttft_ms")
+    # Encoding a long answer is CPU-bound, so it is counted in a worker thread
+    (tokens_used,) = await llm_manager.count_tokens_many([answer])
+    logger.info(
+        f"Chat stream processed: {len(request.message)} chars -> {tokens_used} tokens, "
+        f"ttft={ttft_ms or 0:.0f} ms, total={total_ms:.0f} ms"
+    )
+    yield sse_event({
+        "tokens_used": tokens_used,
+        "time_to_first_token_ms": round(ttft_ms, 2) if ttft_ms is not None else None,
+        "total_ms": round(total_ms, 2)
+    }, event="done")
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Chat endpoint streaming the answer as server-sent events
+
+    Tokens are forwarded as they arrive. When the client disconnects the
+    response task is cancelled, which closes the upstream completion stream.
+
+    Args:
+        request: Chat request with message and optional parameters
+
+    Returns:
+        StreamingResponse of text/event-stream events
+
+    Raises:
+        HTTPException: If LLM is not available
+    """
+    if not llm_manager.is_available():
+        logger.error("LLM provider not available")
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service is not available. Please check API key configuration."
+        )
+
+    return StreamingResponse(
+        stream_chat_events(request),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(request: BatchChatRequest):
+    """
+    Answer many independent prompts with bounded concurrency
+
+    Items run through the LLM manager (including its response cache) with
+    at most `concurrency` in flight. A failing item is reported in its
+    result rather than failing the batch. With `stream` set, each result is
+    sent as an NDJSON line as soon as it finishes, followed by a summary line.
+
+    Args:
+        request: Prompts, concurrency and response mode
+
+    Returns:
+        BatchChatResponse, or a StreamingResponse of application/x-ndjson lines
+
+    Raises:
+        HTTPException: If LLM is not available or the batch is too large
+    """
+    if not llm_manager.is_available():
+        logger.error("LLM provider not available")
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service is not available. Please check API key configuration."
+        )
+    if len(request.items) > settings.chat_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.items)} items, maximum {settings.chat_batch_max_items}"
+        )
+
+    concurrency = min(request.concurrency or settings.chat_batch_concurrency, settings.chat_batch_max_concurrency)
+    items = [
+        {
+            "prompt": item.message,
+            "system_prompt": item.system_prompt,
+            "temperature": item.temperature,
+            "max_tokens": item.max_tokens,
+        }
+        for item in request.items
+    ]
+    start = time.perf_counter()
+
+    def summary(succeeded: int, failed: int) -> Dict[str, Any]:
+        total_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Chat batch processed: {succeeded} succeeded, {failed} failed in {total_ms} ms")
+        return {"succeeded": succeeded, "failed": failed, "total_ms": total_ms}
+
+    if request.stream:
+        async def ndjson_lines() -> AsyncIterator[str]:
+            failed = 0
+            results = run_chat_batch(items, concurrency, llm=llm_manager)
+            try:
+                async for result in results:
+                    failed += result["error"] is not None
+                    yield json.dumps(result) + "\n"
+            finally:
+                # Cancels the remaining items when the client disconnects
+                await results.aclose()
+            yield json.dumps({"summary": summary(len(items) - failed, failed)}) + "\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    results = [result async for result in run_chat_batch(items, concurrency, llm=llm_manager)]
+    results.sort(key=lambda result: result["index"])
+    failed = sum(1 for result in results if result["error"] is not None)
+    return BatchChatResponse(
+        results=[BatchChatResult(**result) for result in results],
+        **summary(len(results) - failed, failed)
+    )
+
+
+@router.post("/chat/rag", response_model=RAGChatResponse)
+async def chat_rag(
+    request: RAGChatRequest,
+    db: AsyncSession = Depends(get_db)
+) -> RAGChatResponse:
+    """
+    Chat answered from the indexed documents
+
+    The question is embedded and the best chunks are packed into the prompt
+    up to the context token budget; the answer cites them by number.
+
+    Args:
+        request: Chat request with retrieval options
+        db: Database session
+
+    Returns:
+        RAGChatResponse with the answer, citations and timings
+
+    Raises:
+        HTTPException: If LLM is not available, the request or collection is invalid, or generation fails
+    """
+    if not llm_manager.is_available():
+        logger.error("LLM provider not available")
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service is not available. Please check API key configuration."
+        )
+
+    try:
+        filters = await collection_service.scope_filters(
+            db, request.collection, request.filters.to_filters() if request.filters else None
+        )
+        result = await rag_service.answer(
+            question=request.message,
+            db=db,
+            limit=request.limit,
+            min_similarity=request.min_similarity,
+            context_tokens=request.context_tokens,
+            system_prompt=request.system_prompt,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            mode=request.mode,
+            filters=filters
+        )
+
+        return RAGChatResponse(
+            answer=result["answer"],
+            tokens_used=result["tokens_used"],
+            citations=[Citation(**citation) for citation in result["citations"]],
+            context_tokens=result["context_tokens"],
+            retrieval_ms=round(result["retrieval_ms"], 2),
+            generation_ms=round(result["generation_ms"], 2)
+        )
+
+    except HTTPException:
+        raise
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"RAG chat failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate response: {str(e)}"
+        )
@@ -0,0 +1,122 @@
+"""Document collection endpoints"""
+
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.services.collection_service import CollectionExistsError, collection_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/collections", tags=["collections"])
+
+
+# Schemas
+class CollectionCreate(BaseModel):
+    """Request to create a collection"""
+    name: str = Field(..., min_length=1, max_length=63, description="Lowercase letters, digits, '_' and '-'")
+    description: Optional[str] = Field(None, max_length=2000)
+
+
+class CollectionResponse(BaseModel):
+    """A collection with its size"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    created_at: datetime
+    documents: int = 0
+    chunks: int = 0
+
+
+class CollectionDeleteResponse(BaseModel):
+    """Response for a dropped collection"""
+    name: str
+    documents_deleted: int
+    chunks_deleted: int
+
+
+@router.post("", response_model=CollectionResponse, status_code=201)
+async def create_collection(
+    request: CollectionCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a collection with its own vector index partition
+
+    Args:
+        request: Collection name and description
+        db: Database session
+
+    Returns:
+        The created collection
+
+    Raises:
+        HTTPException: If the name is invalid (400) or taken (409)
+    """
+    try:
+        collection = await collection_service.create(db, request.name, request.description)
+    except CollectionExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CollectionResponse(
+        id=collection.id,
+        name=collection.name,
+        description=collection.description,
+        created_at=collection.created_at
+    )
+
+
+@router.get("", response_model=List[CollectionResponse])
+async def list_collections(db: AsyncSession = Depends(get_db)):
+    """
+    List collections with document and chunk counts
+
+    Args:
+        db: Database session
+
+    Returns:
+        Collections ordered by name
+    """
+    return [CollectionResponse(**collection) for collection in await collection_service.list(db)]
+
+
+@router.delete("/{name}", response_model=CollectionDeleteResponse)
+async def delete_collection(
+    name: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Drop a collection with its documents, chunks and vector index
+
+    Args:
+        name: Collection name
+        db: Database session
+
+    Returns:
+        Number of documents and chunks removed
+
+    Raises:
+        HTTPException: If the collection does not exist
+    """
+    collection = await collection_service.get_by_name(db, name)
+    if not collection:
+        raise HTTPException(status_code=404, detail=f"Collection {name} not found")
+
+    try:
+        deleted = await collection_service.delete(db, collection)
+    except Exception as e:
+        logger.error(f"Failed to drop collection {name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to drop collection: {str(e)}")
+
+    return CollectionDeleteResponse(
+        name=name,
+        documents_deleted=deleted["documents"],
+        chunks_deleted=deleted["chunks"]
+    )
@@ -0,0 +1,190 @@
+"""Conversation endpoints: stored chat history with server-side context windows"""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.chat import ChatRequest, ChatResponse
+from app.core.llm import llm_manager
+from app.db.session import get_db
+from app.services.conversation_service import conversation_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+
+# Schemas
+class ConversationCreate(BaseModel):
+    """Request to start a conversation"""
+    title: Optional[str] = Field(None, max_length=500)
+    session_id: Optional[str] = Field(None, max_length=255, description="Client session, generated if omitted")
+    user_id: Optional[str] = Field(None, max_length=255)
+
+
+class ConversationResponse(BaseModel):
+    """A conversation"""
+    id: int
+    title: Optional[str] = None
+    session_id: str
+    user_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class MessageResponse(BaseModel):
+    """A stored chat turn"""
+    id: int
+    role: str
+    content: str
+    tokens_used: Optional[int] = None
+    created_at: datetime
+
+
+class ConversationChatRequest(ChatRequest):
+    """Chat request continuing a conversation"""
+    context_tokens: Optional[int] = Field(None, ge=1, le=100000, description="Token budget for prompt and history")
+
+
+class ConversationChatResponse(ChatResponse):
+    """Chat response with the context that was sent"""
+    conversation_id: int
+    context_messages: int = Field(..., description="Earlier turns included in the prompt")
+    context_tokens: int = Field(..., description="Tokens of system prompt, history and message")
+
+
+async def _get_conversation(db: AsyncSession, conversation_id: int):
+    conversation = await conversation_service.get(db, conversation_id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
+    return conversation
+
+
+@router.post("", response_model=ConversationResponse, status_code=201)
+async def create_conversation(
+    request: ConversationCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start a conversation
+
+    Args:
+        request: Optional title, session and user
+        db: Database session
+
+    Returns:
+        The new conversation
+    """
+    conversation = await conversation_service.create(
+        db,
+        session_id=request.session_id or uuid.uuid4().hex,
+        user_id=request.user_id,
+        title=request.title
+    )
+    return ConversationResponse.model_validate(conversation, from_attributes=True)
+
+
+@router.get("/{conversation_id}/messages", response_model=List[MessageResponse])
+async def list_messages(
+    conversation_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="Only messages older than this id"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Page through a conversation's messages
+
+    Args:
+        conversation_id: Conversation id
+        limit: Maximum messages returned
+        before_id: Only messages older than this id
+        db: Database session
+
+    Returns:
+        Messages oldest first
+
+    Raises:
+        HTTPException: If the conversation does not exist
+    """
+    await _get_conversation(db, conversation_id)
+    messages = await conversation_service.get_messages(db, conversation_id, limit=limit, before_id=before_id)
+    return [MessageResponse.model_validate(message, from_attributes=True) for message in messages]
+
+
+@router.post("/{conversation_id}/chat", response_model=ConversationChatResponse)
+async def conversation_chat(
+    conversation_id: int,
+    request: ConversationChatRequest,
+    db: AsyncSession = Depends(get_db)
+) -> ConversationChatResponse:
+    """
+    Chat within a conversation
+
+    Only the new message is sent; earlier turns are loaded server-side, newest
+    first, until the context token budget is used up.
+
+    Args:
+        conversation_id: Conversation id
+        request: Chat request with an optional context budget
+        db: Database session
+
+    Returns:
+        ConversationChatResponse with the answer and the context used
+
+    Raises:
+        HTTPException: If LLM is not available, the conversation does not exist or generation fails
+    """
+    if not llm_manager.is_available():
+        logger.error("LLM provider not available")
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service is not available. Please check API key configuration."
+        )
+
+    conversation = await _get_conversation(db, conversation_id)
+    try:
+        result = await conversation_service.chat(
+            db,
+            conversation,
+            message=request.message,
+            system_prompt=request.system_prompt,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            context_tokens=request.context_tokens
+        )
+    except Exception as e:
+        logger.error(f"Conversation chat failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate response: {str(e)}"
+        )
+
+    return ConversationChatResponse(conversation_id=conversation.id, **result)
+
+
+@router.delete("/{conversation_id}")
+async def delete_conversation(
+    conversation_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete a conversation and its messages
+
+    Args:
+        conversation_id: Conversation id
+        db: Database session
+
+    Returns:
+        Number of messages removed
+
+    Raises:
+        HTTPException: If the conversation does not exist
+    """
+    conversation = await _get_conversation(db, conversation_id)
+    deleted = await conversation_service.delete(db, conversation)
+    return {"conversation_id": conversation_id, "messages_deleted": deleted}
@@ -1,6 +1,7 @@
 """Document upload and management endpoints"""
 
 import logging
+import time
 from typing import Optional, List
 from datetime import datetime
 
@@ -11,7 +12,9 @@ from pydantic import BaseModel, Field
 
 from app.db.session import get_db
 from app.db.models import Document, DocumentChunk
-from app.services.indexing_service import IndexingService
+from app.core.search_filters import SearchFilters
+from app.services.collection_service import CollectionNotFoundError, collection_service
+from app.services.indexing_service import indexing_service
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +57,42 @@ class IndexingStatsResponse(BaseModel):
     total_chunks: int
 
 
+class SearchRequest(BaseModel):
+    """Request for semantic document search"""
+    query: str = Field(..., min_length=1, description="Search query")
+    limit: int = Field(5, ge=1, le=100, description="Maximum number of results")
+    min_similarity: Optional[float] = Field(None, ge=-1.0, le=1.0, description="Minimum cosine similarity")
+    mode: str = Field("vector", pattern="^(vector|hybrid)$",
+                      description="vector, or hybrid to fuse full-text and vector rankings")
+    collection: Optional[str] = Field(None, description="Search only this collection")
+    filters: Optional[SearchFilters] = Field(None, description="Optional document and chunk metadata filters")
+    diversify: bool = Field(False, description="Rerank a larger candidate pool with maximal marginal relevance")
+    mmr_lambda: Optional[float] = Field(None, ge=0.0, le=1.0,
+                                        description="MMR trade-off: 1 = relevance only, 0 = diversity only")
+
+
+class SearchResult(BaseModel):
+    """A matching document chunk"""
+    chunk_id: int
+    document_id: int
+    filename: str
+    title: Optional[str] = None
+    content: str
+    chunk_index: int
+    similarity: Optional[float] = None  # None for hybrid results matched by full-text only
+    score: Optional[float] = None  # Reciprocal rank fusion score (hybrid only)
+    matched_by: Optional[List[str]] = None  # Hybrid legs that returned the chunk
+    metadata: dict = {}
+
+
+class SearchResponse(BaseModel):
+    """Response for semantic document search"""
+    query: str
+    results: List[SearchResult]
+    count: int
+    search_time_ms: float
+
+
 # Supported file types
 SUPPORTED_CONTENT_TYPES = {
     "application/pdf",
@@ -76,13 +115,11 @@ async def process_document_background(
     chunk_strategy: str
 ):
     """Background task to process and index document"""
-    from app.db.session import async_session_maker
-
-    indexing_service = IndexingService()
+    from app.db.session import AsyncSessionLocal
 
     try:
         # Create a new database session for background task
-        async with async_session_maker() as db:
+        async with AsyncSessionLocal() as db:
             await indexing_service.process_and_index_document(
                 db=db,
                 document_id=document_id,
@@ -104,6 +141,7 @@ async def upload_document(
     language: Optional[str] = Form("en"),
     tags: Optional[str] = Form(None),
     chunk_strategy: str = Form("sentence"),
+    collection: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -115,6 +153,7 @@ async def upload_document(
         language: Language for OCR (default: en)
         tags: Comma-separated tags
         chunk_strategy: Chunking strategy (sentence, paragraph, token)
+        collection: Optional collection name to add the document to
         db: Database session
 
     Returns:
@@ -156,6 +195,13 @@ async def upload_document(
                 detail="File is empty"
             )
 
+        collection_id = None
+        if collection:
+            found = await collection_service.get_by_name(db, collection)
+            if not found:
+                raise HTTPException(status_code=404, detail=f"Collection {collection} not found")
+            collection_id = found.id
+
         # Parse tags
         tag_list = None
         if tags:
@@ -169,6 +215,7 @@ async def upload_document(
             title=title or file.filename,
             language=language,
             tags=tag_list,
+            collection_id=collection_id,
             status="pending"
         )
 
@@ -205,6 +252,61 @@ async def upload_document(
         )
 
 
+@router.post("/search", response_model=SearchResponse)
+async def search_documents(
+    request: SearchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Semantic search over indexed documents
+
+    Args:
+        request: Search query, result limit, similarity threshold, mode, collection, filters and diversification
+        db: Database session
+
+    Returns:
+        SearchResponse with matching chunks, best first
+
+    Raises:
+        HTTPException: If the query is invalid, the collection is unknown or search fails
+    """
+    start_time = time.perf_counter()
+    try:
+        filters = await collection_service.scope_filters(
+            db, request.collection, request.filters.to_filters() if request.filters else None
+        )
+        results = await indexing_service.search_documents(
+            query=request.query,
+            limit=request.limit,
+            min_similarity=request.min_similarity,
+            db=db,
+            mode=request.mode,
+            filters=filters,
+            diversify=request.diversify,
+            mmr_lambda=request.mmr_lambda
+        )
+
+        return SearchResponse(
+            query=request.query,
+            results=[SearchResult(**result) for result in results],
+            count=len(results),
+            search_time_ms=round((time.perf_counter() - start_time) * 1000, 2)
+        )
+
+    except HTTPException:
+        raise
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Document search failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Document search failed: {str(e)}"
+        )
+
+
 @router.get("/{document_id}", response_model=DocumentStatusResponse)
 async def get_document_status(
     document_id: int,
@@ -348,10 +450,7 @@ async def delete_document(
         HTTPException: If document not found or deletion fails
     """
     try:
-        result = await db.execute(
-            select(Document).where(Document.id == document_id)
-        )
-        document = result.scalar_one_or_none()
+        document = await indexing_service.delete_document(db, document_id)
 
         if not document:
             raise HTTPException(
@@ -359,9 +458,6 @@ async def delete_document(
                 detail=f"Document with ID {document_id} not found"
             )
 
-        await db.delete(document)
-        await db.commit()
-
         logger.info(f"Deleted document {document_id}: {document.filename}")
 
         return {"message": f"Document {document_id} deleted successfully"}
@@ -391,7 +487,6 @@ async def get_indexing_stats(db: AsyncSession = Depends(get_db)):
         HTTPException: If query fails
     """
     try:
-        indexing_service = IndexingService()
         stats = await indexing_service.get_indexing_stats(db)
 
         return IndexingStatsResponse(**stats)
@@ -9,7 +9,11 @@ import logging
 from app.core.config import settings
 from app.core.notion import notion
 from app.core.llm import llm_manager
+from app.core.embeddings import embeddings_service
+from app.core.rate_limit import get_rate_limiter_snapshots
 from app.db import get_db
+from app.services.memory_index import memory_index
+from app.services.search_cache import search_cache
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,15 @@ async def health_check(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
             "database": db_connected,
             "llm": llm_manager.is_available(),
             "notion": notion.is_enabled()
-        }
+        },
+        "embedding_cache": embeddings_service.get_cache_stats(),
+        "embedding_coalescer": embeddings_service.get_coalescer_stats(),
+        "vector_store": settings.vector_db_type,
+        "memory_index": memory_index.stats() if settings.memory_index_enabled else None,
+        "search_cache": search_cache.stats() if settings.search_cache_enabled else None,
+        "rate_limits": get_rate_limiter_snapshots(),
+        "llm_cache": llm_manager.get_cache_stats(),
+        "llm_streams": llm_manager.get_stream_stats()
     }
 
     logger.debug(f"Health check: {health_status}")
@@ -0,0 +1,185 @@
+"""Generic cache tiers: bounded in-memory LRU and persistent SQLite store"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize LRU cache
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+        """
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value and mark it as most recently used"""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        """Insert or update a value, evicting the least recently used entries"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove a value if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters"""
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteCacheStore:
+    """
+    Persistent key/value store backed by a local SQLite file
+
+    Values are stored as raw bytes; serialization is left to the caller.
+    Calls are blocking and should be run in a worker thread from async code.
+    """
+
+    def __init__(self, path: str, table: str = "cache"):
+        """
+        Initialize SQLite store
+
+        Args:
+            path: Path to the SQLite database file
+            table: Table name used for this store
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        logger.info(f"Opened persistent cache store {path} ({table})")
+
+    def get_many(self, keys: Iterable[str], max_age: Optional[float] = None) -> Dict[str, bytes]:
+        """
+        Fetch values for several keys
+
+        Args:
+            keys: Keys to look up
+            max_age: Ignore entries written more than this many seconds ago
+
+        Returns:
+            Dict of found keys to stored bytes
+        """
+        keys = list(keys)
+        found: Dict[str, bytes] = {}
+        min_created = time.time() - max_age if max_age else 0.0
+        # Stay well below SQLite's bound-parameter limit
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders}) AND created_at >= ?",
+                    chunk + [min_created]
+                ).fetchall()
+                found.update({key: value for key, value in rows})
+        return found
+
+    def set_many(self, items: List[Tuple[str, bytes]]) -> None:
+        """
+        Store several key/value pairs in one transaction
+
+        Args:
+            items: List of (key, value) pairs
+        """
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items]
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def delete_older_than(self, max_age: float) -> int:
+        """
+        Remove entries written more than max_age seconds ago
+
+        Args:
+            max_age: Maximum entry age in seconds
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - max_age,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        """Number of stored entries"""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
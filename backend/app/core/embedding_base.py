@@ -0,0 +1,89 @@
+"""Embedding provider interface and token helpers shared by all providers
+
+Kept free of provider and service imports so provider modules (and the
+worker processes that import them) can load it without pulling in the
+global EmbeddingsService.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import List
+
+from app.core.tokenizer import DEFAULT_ENCODING, tokenizer_service
+
+logger = logging.getLogger(__name__)
+
+
+def get_embedding_tokenizer():
+    """Get the tiktoken encoding used to measure embedding inputs"""
+    # cl100k_base is the encoding of all OpenAI embedding models and the
+    # one ChunkingService uses, so chunk token counts can be reused as-is
+    return tokenizer_service.get_encoding(DEFAULT_ENCODING)
+
+
+def count_embedding_tokens(texts: List[str]) -> List[int]:
+    """Count tokens for several texts in one batch encode"""
+    return [len(tokens) for tokens in get_embedding_tokenizer().encode_ordinary_batch(texts)]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to at most max_tokens tokens
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens to keep
+
+    Returns:
+        Original text if it fits, otherwise its first max_tokens tokens
+    """
+    # A token always covers at least one character, so short texts cannot overflow
+    if len(text) <= max_tokens:
+        return text
+
+    tokenizer = get_embedding_tokenizer()
+    tokens = tokenizer.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+
+    logger.warning(f"Text truncated from {len(tokens)} to {max_tokens} tokens")
+    return tokenizer.decode(tokens[:max_tokens])
+
+
+class BaseEmbeddingProvider(ABC):
+    """Abstract base class for embedding providers"""
+
+    name: str = "base"
+    model: str = ""
+
+    # Per-text and per-request limits used for token-budget batch packing
+    max_input_tokens: int = 8191
+    max_batch_tokens: int = 300_000
+    max_batch_size: int = 2048
+
+    def truncate(self, text: str) -> str:
+        """Truncate text to the provider's per-input token limit"""
+        return truncate_to_tokens(text, self.max_input_tokens)
+
+    def close(self) -> None:
+        """Release provider resources such as worker pools"""
+        pass
+
+    @abstractmethod
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding for a single text"""
+        pass
+
+    @abstractmethod
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for multiple texts"""
+        pass
+
+    @abstractmethod
+    def get_dimension(self) -> int:
+        """Get embedding dimension"""
+        pass
+
+    async def load_dimension(self) -> int:
+        """Get embedding dimension, loading it first if the provider must ask the model"""
+        return self.get_dimension()
@@ -0,0 +1,160 @@
+"""Content-addressed cache for text embeddings"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.cache import LRUCache, SQLiteCacheStore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (provider, model, dimension, text hash)
+
+    The in-memory LRU tier is checked first, then the optional persistent
+    SQLite tier. Persistent hits are promoted into the LRU tier.
+    """
+
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None):
+        """
+        Initialize embedding cache
+
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            path: Path to the persistent SQLite store (None disables it)
+        """
+        self.memory = LRUCache(max_entries=max_entries)
+        self.path = path
+        self.persistent_hits = 0
+        self._store: Optional[SQLiteCacheStore] = None
+        self._store_failed = False
+
+    @property
+    def store(self) -> Optional[SQLiteCacheStore]:
+        """Persistent tier, opened lazily on first use"""
+        if self._store is None and self.path and not self._store_failed:
+            try:
+                self._store = SQLiteCacheStore(self.path, table="embedding_cache")
+            except Exception as e:
+                self._store_failed = True
+                logger.error(f"Failed to open persistent embedding cache at {self.path}: {e}")
+        return self._store
+
+    @staticmethod
+    def make_key(provider: str, model: str, dimension: int, text: str) -> str:
+        """Build the cache key for a text"""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{provider}:{model}:{dimension}:{text_hash}"
+
+    @staticmethod
+    def _encode(embedding: List[float]) -> bytes:
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def _decode(value: bytes) -> List[float]:
+        return np.frombuffer(value, dtype=np.float32).tolist()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up embeddings for several keys
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Dict of found keys to embeddings
+        """
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+
+        for key in keys:
+            embedding = self.memory.get(key)
+            if embedding is None:
+                missing.append(key)
+            else:
+                found[key] = embedding
+
+        store = self.store if missing else None
+        if store:
+            try:
+                stored = await asyncio.to_thread(store.get_many, missing)
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache lookup failed: {e}")
+                stored = {}
+
+            for key, value in stored.items():
+                embedding = self._decode(value)
+                self.memory.set(key, embedding)
+                found[key] = embedding
+            self.persistent_hits += len(stored)
+
+        return found
+
+    async def set_many(self, entries: Dict[str, List[float]]) -> None:
+        """
+        Store embeddings in both tiers
+
+        Args:
+            entries: Dict of cache keys to embeddings
+        """
+        if not entries:
+            return
+
+        for key, embedding in entries.items():
+            self.memory.set(key, embedding)
+
+        store = self.store
+        if store:
+            items = [(key, self._encode(embedding)) for key, embedding in entries.items()]
+            try:
+                await asyncio.to_thread(store.set_many, items)
+            except Exception as e:
+                logger.warning(f"Persistent embedding cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Clear both cache tiers"""
+        self.memory.clear()
+        store = self.store
+        if store:
+            store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+
+        ``hits`` counts lookups served from either tier; ``misses`` counts
+        lookups that had to go to the provider.
+        """
+        memory_stats = self.memory.stats()
+        hits = memory_stats["hits"] + self.persistent_hits
+        return {
+            "hits": hits,
+            "misses": memory_stats["misses"] - self.persistent_hits,
+            "memory_hits": memory_stats["hits"],
+            "persistent_hits": self.persistent_hits,
+            "evictions": memory_stats["evictions"],
+            "memory_size": memory_stats["size"],
+            "max_entries": memory_stats["max_entries"],
+            "persistent": bool(self.path) and not self._store_failed,
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache shared by all EmbeddingsService instances"""
+    global _embedding_cache
+
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            max_entries=settings.embedding_cache_max_entries,
+            path=settings.embedding_cache_path or None
+        )
+    return _embedding_cache
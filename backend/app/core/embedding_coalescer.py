@@ -0,0 +1,169 @@
+"""Micro-batching of concurrent single-text embedding calls"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.embeddings import is_request_too_large
+
+logger = logging.getLogger(__name__)
+
+BatchFunction = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def is_client_error(error: Exception) -> bool:
+    """True if the provider rejected the request itself (HTTP 400/413/422)"""
+    status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status_code in (400, 413, 422) or is_request_too_large(error)
+
+
+class EmbeddingCoalescer:
+    """
+    Merge concurrent single-text embedding requests into provider batches
+
+    Calls to ``embed`` are queued for up to ``window_ms`` milliseconds, or
+    until ``max_batch_size`` texts are waiting, then sent as one batch.
+    Identical texts in the same batch are embedded once.
+
+    Each caller receives its own result or its own error: when the provider
+    rejects a batch as a bad request, the texts are retried one by one so a
+    single invalid input only fails its own caller. Other errors (outages,
+    exhausted retries) are raised to every caller in the batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFunction,
+        window_ms: float = 2.0,
+        max_batch_size: int = 64
+    ):
+        """
+        Initialize coalescer
+
+        Args:
+            batch_fn: Async function embedding a list of texts in input order
+            window_ms: How long the first queued text waits for company
+            max_batch_size: Queue size that triggers an immediate flush
+        """
+        self.batch_fn = batch_fn
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.failures = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed a single text as part of the next batch
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+
+        Raises:
+            ValueError: If the text is empty
+            Exception: The provider error for this caller's text or batch
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything queued so far as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # Callers that gave up (e.g. a cancelled request) are dropped here
+        pending = [(text, future) for text, future in self._pending if not future.done()]
+        self._pending = []
+        if not pending:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run_batch(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        # One provider input per distinct text
+        waiters: Dict[str, List[asyncio.Future]] = {}
+        for text, future in pending:
+            waiters.setdefault(text, []).append(future)
+        texts = list(waiters)
+
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(texts))
+
+        try:
+            embeddings = await self.batch_fn(texts)
+        except Exception as e:
+            if len(texts) > 1 and is_client_error(e):
+                logger.warning(f"Coalesced batch of {len(texts)} texts rejected, retrying individually: {e}")
+                await asyncio.gather(*(self._run_single(text, waiters[text]) for text in texts))
+            else:
+                logger.error(f"Coalesced batch of {len(texts)} texts failed: {e}")
+                for text in texts:
+                    self._reject(waiters[text], e)
+            return
+
+        for text, embedding in zip(texts, embeddings):
+            self._resolve(waiters[text], embedding)
+
+    async def _run_single(self, text: str, futures: List[asyncio.Future]) -> None:
+        try:
+            embeddings = await self.batch_fn([text])
+        except Exception as e:
+            self._reject(futures, e)
+        else:
+            self._resolve(futures, embeddings[0])
+
+    def _resolve(self, futures: List[asyncio.Future], embedding: List[float]) -> None:
+        # Batch providers leave zero vectors for texts they could not embed
+        if not any(embedding):
+            self._reject(futures, RuntimeError("Provider returned no embedding for text"))
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(embedding)
+
+    def _reject(self, futures: List[asyncio.Future], error: Exception) -> None:
+        self.failures += len(futures)
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self) -> None:
+        """Flush queued texts and wait for in-flight batches"""
+        if self._pending:
+            self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Coalescing counters"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "failures": self.failures,
+            "average_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
@@ -1,62 +1,107 @@
 """Embeddings generation service"""
 
 import logging
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 import asyncio
-from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 from openai import AsyncOpenAI
 import httpx
 import google.generativeai as genai
 
+from app.core import similarity
 from app.core.config import settings
+from app.core.embedding_base import BaseEmbeddingProvider, count_embedding_tokens
+from app.core.embedding_cache import EmbeddingCache, get_embedding_cache
+from app.core.rate_limit import classify_error, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
-class BaseEmbeddingProvider(ABC):
-    """Abstract base class for embedding providers"""
-
-    @abstractmethod
-    async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text"""
-        pass
-
-    @abstractmethod
-    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
-        pass
-
-    @abstractmethod
-    def get_dimension(self) -> int:
-        """Get embedding dimension"""
-        pass
+def pack_batches(
+    token_counts: List[int],
+    max_batch_tokens: int,
+    max_batch_size: int
+) -> List[List[int]]:
+    """
+    Greedily pack text positions into batches under a token and size budget
+
+    Args:
+        token_counts: Token count of each text, in input order
+        max_batch_tokens: Maximum total tokens per batch
+        max_batch_size: Maximum number of texts per batch
+
+    Returns:
+        List of batches, each a list of input positions
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for idx, count in enumerate(token_counts):
+        if current and (current_tokens + count > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(idx)
+        current_tokens += count
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_request_too_large(error: Exception) -> bool:
+    """Check whether a provider error rejects the request for being too large"""
+    status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status_code == 413:
+        return True
+
+    message = str(error).lower()
+    markers = (
+        "too large",
+        "too many tokens",
+        "maximum context length",
+        "max_tokens_per_request",
+        "request payload size exceeds",
+    )
+    return any(marker in message for marker in markers)
 
 
 class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
     """OpenAI embedding provider"""
 
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        base_url: Optional[str] = None
+    ):
         self.api_key = api_key
         self.model = model
+        # 429s, timeouts, 5xx and connection errors are retried by the shared adaptive rate limiter
         self.client = AsyncOpenAI(
             api_key=api_key,
+            base_url=base_url or None,
             timeout=httpx.Timeout(60.0, connect=10.0),
-            max_retries=3
+            max_retries=0
         )
+        self.rate_limiter = get_rate_limiter("openai-embeddings")
 
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding using OpenAI"""
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
-        max_chars = 8000
-        if len(text) > max_chars:
-            text = text[:max_chars]
-            logger.warning(f"Text truncated to {max_chars} characters")
+        text = self.truncate(text)
 
-        response = await self.client.embeddings.create(
+        response = await self.rate_limiter.call(
+            self.client.embeddings.create,
             model=self.model,
             input=text,
             encoding_format="float"
@@ -68,17 +113,24 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
         if not texts:
             return []
 
-        batch_filtered = [t[:8000] if len(t) > 8000 else t for t in texts if t.strip()]
+        # Empty texts keep a zero vector so results stay aligned with the input
+        embeddings = [[0.0] * self.get_dimension() for _ in texts]
+        positions = [idx for idx, t in enumerate(texts) if t and t.strip()]
+
+        if not positions:
+            return embeddings
 
-        if not batch_filtered:
-            return [[0.0] * self.get_dimension()] * len(texts)
+        batch_filtered = [self.truncate(texts[idx]) for idx in positions]
 
-        response = await self.client.embeddings.create(
+        response = await self.rate_limiter.call(
+            self.client.embeddings.create,
             model=self.model,
             input=batch_filtered,
             encoding_format="float"
         )
-        return [item.embedding for item in response.data]
+        for idx, item in zip(positions, response.data):
+            embeddings[idx] = item.embedding
+        return embeddings
 
     def get_dimension(self) -> int:
         """Get OpenAI embedding dimension"""
@@ -93,94 +145,219 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
 class GeminiEmbeddingProvider(BaseEmbeddingProvider):
     """Gemini embedding provider"""
 
-    def __init__(self, api_key: str, model: str = "models/embedding-001"):
+    name = "gemini"
+
+    # Maximum number of contents accepted by a single batchEmbedContents request
+    MAX_BATCH_SIZE = 100
+
+    # embedding-001 accepts 2048 tokens per input; counts are measured with
+    # tiktoken, which is a close but not exact proxy for Gemini's tokenizer
+    max_input_tokens = 2048
+    max_batch_tokens = MAX_BATCH_SIZE * 2048
+    max_batch_size = MAX_BATCH_SIZE
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "models/embedding-001",
+        max_workers: int = 4,
+        batch_size: int = MAX_BATCH_SIZE
+    ):
         self.api_key = api_key
         self.model = model
+        self.batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+        # Dedicated pool so blocking Gemini calls never starve the default executor
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="gemini-embed"
+        )
+        self.rate_limiter = get_rate_limiter("gemini-embeddings")
         genai.configure(api_key=api_key)
 
+    async def _embed_content(self, content):
+        """Run a blocking embed_content call on the dedicated thread pool under the rate limiter"""
+        loop = asyncio.get_running_loop()
+        func = partial(
+            genai.embed_content,
+            model=self.model,
+            content=content,
+            task_type="retrieval_document"
+        )
+        return await self.rate_limiter.call(loop.run_in_executor, self.executor, func)
+
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding using Gemini"""
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
-        # Gemini handles long texts better, but still truncate very long ones
-        max_chars = 20000
-        if len(text) > max_chars:
-            text = text[:max_chars]
-            logger.warning(f"Text truncated to {max_chars} characters")
+        text = self.truncate(text)
 
-        # Gemini embedding API is synchronous, run in executor for async
-        loop = asyncio.get_event_loop()
-        func = partial(
-            genai.embed_content,
-            model=self.model,
-            content=text,
-            task_type="retrieval_document"
-        )
+        # Quota, timeout and server errors are retried by the rate limiter
+        result = await self._embed_content(text)
+        return result['embedding']
+
+    async def _embed_sub_batch(
+        self,
+        items: List[Tuple[int, str]],
+        embeddings: List[List[float]]
+    ) -> None:
+        """
+        Embed one sub-batch with a single multi-content call
 
-        # Run blocking call in thread executor with retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
+        Falls back to per-item requests when the batch call fails, leaving a
+        zero vector in place for any item that still cannot be embedded.
+        Errors the rate limiter retries (quota, timeouts, server errors) are
+        raised instead once it gives up: sending the items one by one would
+        only multiply requests against an API that is already failing.
+        Multi-item batches rejected as too large are raised as well, so
+        EmbeddingsService can split them in half.
+
+        Raises:
+            Exception: Retryable provider errors after the limiter's retries,
+                or a too-large rejection of a multi-item batch
+        """
+        try:
+            result = await self._embed_content([text for _, text in items])
+            batch_embeddings = result['embedding']
+            if len(batch_embeddings) != len(items):
+                raise ValueError(
+                    f"Gemini returned {len(batch_embeddings)} embeddings for {len(items)} texts"
+                )
+            for (idx, _), embedding in zip(items, batch_embeddings):
+                embeddings[idx] = embedding
+            return
+        except Exception as e:
+            if classify_error(e) is not None or (len(items) > 1 and is_request_too_large(e)):
+                raise
+            logger.warning(f"Gemini batch of {len(items)} texts failed, falling back to single requests: {e}")
+
+        async def embed_single(idx: int, text: str) -> None:
             try:
-                result = await loop.run_in_executor(None, func)
-                return result['embedding']
+                embeddings[idx] = await self.generate_embedding(text)
             except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt)  # exponential backoff: 1s, 2s, 4s
-                    logger.warning(f"Gemini embedding attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Gemini embedding failed after {max_retries} attempts: {e}")
-                    raise
+                logger.error(f"Failed to generate embedding for text {idx + 1}: {e}")
+
+        await asyncio.gather(*(embed_single(idx, text) for idx, text in items))
 
     async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings batch using Gemini"""
+        """Generate embeddings batch using Gemini multi-content requests"""
         if not texts:
             return []
 
-        # Process texts individually for Gemini (it doesn't have batch API)
-        embeddings = []
-        for idx, text in enumerate(texts):
-            if text and text.strip():
-                try:
-                    embedding = await self.generate_embedding(text)
-                    embeddings.append(embedding)
-                    logger.debug(f"Generated embedding {idx + 1}/{len(texts)}")
-                except Exception as e:
-                    logger.error(f"Failed to generate embedding for text {idx + 1}: {e}")
-                    # Use zero vector as fallback
-                    embeddings.append([0.0] * self.get_dimension())
-            else:
-                embeddings.append([0.0] * self.get_dimension())
+        # Zero vectors are kept as fallback for empty and failed texts
+        dimension = self.get_dimension()
+        embeddings = [[0.0] * dimension for _ in texts]
 
-            # Small delay to avoid rate limits (every 5 embeddings)
-            if (idx + 1) % 5 == 0:
-                await asyncio.sleep(0.2)
+        items = [(idx, self.truncate(text)) for idx, text in enumerate(texts) if text and text.strip()]
+        sub_batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
 
+        # Sub-batches run concurrently, bounded by the size of the thread pool
+        await asyncio.gather(*(self._embed_sub_batch(batch, embeddings) for batch in sub_batches))
+
+        logger.debug(f"Generated {len(items)} Gemini embeddings in {len(sub_batches)} requests")
         return embeddings
 
     def get_dimension(self) -> int:
         """Get Gemini embedding dimension"""
         return 768  # Gemini embedding-001 produces 768-dimensional vectors
 
+    def close(self) -> None:
+        """Shut down the dedicated thread pool"""
+        self.executor.shutdown(wait=False)
+
+
+@dataclass
+class BatchEmbeddingStats:
+    """Throughput statistics for a single batch embedding run"""
+    texts: int = 0
+    tokens: int = 0
+    batches: int = 0
+    retries: int = 0
+    splits: int = 0
+    max_concurrency: int = 1
+    elapsed_seconds: float = 0.0
+
+    @property
+    def texts_per_second(self) -> float:
+        """Embedded texts per second of wall-clock time"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.texts / self.elapsed_seconds
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Embedded tokens per second of wall-clock time"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.tokens / self.elapsed_seconds
+
+    def to_dict(self) -> dict:
+        """Serialize stats for logging and API responses"""
+        return {
+            "texts": self.texts,
+            "tokens": self.tokens,
+            "batches": self.batches,
+            "retries": self.retries,
+            "splits": self.splits,
+            "max_concurrency": self.max_concurrency,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "texts_per_second": round(self.texts_per_second, 2),
+            "tokens_per_second": round(self.tokens_per_second, 2),
+        }
+
 
 class EmbeddingsService:
     """Service for generating embeddings for text"""
 
-    def __init__(self, batch_size: int = 100):
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: float = 0.5,
+        cache: Optional[EmbeddingCache] = None
+    ):
         """
         Initialize embeddings service
 
         Args:
             batch_size: Number of texts to process in one batch
+            max_concurrency: Maximum number of provider calls in flight
+            max_retries: Number of retries for a failed batch; errors the
+                provider's rate limiter retries (429, 5xx, timeouts) are not
+                retried again here
+            retry_base_delay: Initial backoff delay in seconds between retries
+            cache: Embedding cache (defaults to the shared cache when enabled)
         """
-        self.batch_size = batch_size
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.max_concurrency = max(1, max_concurrency or settings.embedding_max_concurrency)
+        self.max_retries = settings.embedding_batch_max_retries if max_retries is None else max_retries
+        self.retry_base_delay = retry_base_delay
+        self.last_batch_stats: Optional[BatchEmbeddingStats] = None
         self.provider: Optional[BaseEmbeddingProvider] = None
         self._initialize_provider()
 
+        if cache is None and settings.embedding_cache_enabled:
+            cache = get_embedding_cache()
+        self.cache = cache
+
+        self.coalescer = None
+        if self.provider and settings.embedding_coalesce_window_ms > 0:
+            from app.core.embedding_coalescer import EmbeddingCoalescer
+
+            self.coalescer = EmbeddingCoalescer(
+                self.provider.generate_embeddings_batch,
+                window_ms=settings.embedding_coalesce_window_ms,
+                max_batch_size=min(settings.embedding_coalesce_max_batch, self.provider.max_batch_size)
+            )
+
+    def _cache_key(self, text: str, dimension: int) -> str:
+        """Build the embedding cache key for a text under the current provider"""
+        return EmbeddingCache.make_key(self.provider.name, self.provider.model, dimension, text)
+
     def _initialize_provider(self):
         """Initialize embedding provider based on settings"""
-        provider = settings.llm_provider.lower()
+        provider = (settings.embedding_provider or settings.llm_provider).lower()
 
         if provider == "openai":
             if not settings.openai_api_key:
@@ -189,7 +366,8 @@ class EmbeddingsService:
 
             self.provider = OpenAIEmbeddingProvider(
                 api_key=settings.openai_api_key,
-                model=settings.embedding_model
+                model=settings.embedding_model,
+                base_url=settings.openai_base_url
             )
             logger.info(f"Initialized OpenAI embedding provider with model {settings.embedding_model}")
 
@@ -200,10 +378,22 @@ class EmbeddingsService:
 
             self.provider = GeminiEmbeddingProvider(
                 api_key=settings.gemini_api_key,
-                model=settings.embedding_model
+                model=settings.embedding_model,
+                max_workers=settings.gemini_embedding_max_workers
             )
             logger.info(f"Initialized Gemini embedding provider with model {settings.embedding_model}")
 
+        elif provider == "local":
+            from app.core.local_embeddings import LocalEmbeddingProvider
+
+            self.provider = LocalEmbeddingProvider(
+                model=settings.embedding_model,
+                max_workers=settings.local_embedding_workers,
+                batch_size=settings.local_embedding_batch_size,
+                device=settings.local_embedding_device
+            )
+            logger.info(f"Initialized local embedding provider with model {settings.embedding_model}")
+
         else:
             logger.error(f"Unsupported embedding provider: {provider}")
             raise ValueError(f"Unsupported embedding provider: {provider}")
@@ -212,6 +402,9 @@ class EmbeddingsService:
         """
         Generate embedding for a single text
 
+        Concurrent calls are coalesced into one provider batch when
+        ``EMBEDDING_COALESCE_WINDOW_MS`` is set.
+
         Args:
             text: Text to generate embedding for
 
@@ -224,27 +417,52 @@ class EmbeddingsService:
         if not self.provider:
             raise RuntimeError("No embedding provider configured")
 
+        cache_key = None
+        if self.cache and text and text.strip():
+            cache_key = self._cache_key(text, await self.provider.load_dimension())
+            cached = await self.cache.get_many([cache_key])
+            if cache_key in cached:
+                return cached[cache_key]
+
         try:
-            embedding = await self.provider.generate_embedding(text)
+            if self.coalescer:
+                embedding = await self.coalescer.embed(text)
+            else:
+                embedding = await self.provider.generate_embedding(text)
             logger.debug(f"Generated embedding of dimension {len(embedding)}")
-            return embedding
-
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise Exception(f"Embedding generation failed: {str(e)}")
 
-    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        # A zero vector is a provider fallback for a failed text and must not be cached
+        if cache_key and any(embedding):
+            await self.cache.set_many({cache_key: embedding})
+        return embedding
+
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        token_counts: Optional[List[int]] = None
+    ) -> List[List[float]]:
         """
-        Generate embeddings for multiple texts in batches
+        Generate embeddings for multiple texts in concurrent batches
+
+        Cached embeddings are served from the embedding cache and only the
+        misses are sent to the provider. Batches are packed by token count to
+        stay under the provider's per-request limit, and up to
+        ``max_concurrency`` provider calls are kept in flight. Results are
+        returned in input order and only failed batches are retried.
 
         Args:
             texts: List of texts to generate embeddings for
+            token_counts: Optional pre-computed token counts for each text
+                (e.g. ``TextChunk.token_count``); counted here when omitted
 
         Returns:
             List of embedding vectors
 
         Raises:
-            Exception: If embedding generation fails
+            Exception: If a batch still fails after all retries
         """
         if not texts:
             return []
@@ -252,28 +470,147 @@ class EmbeddingsService:
         if not self.provider:
             raise RuntimeError("No embedding provider configured")
 
-        all_embeddings = []
+        if token_counts is not None and len(token_counts) != len(texts):
+            raise ValueError("token_counts must have the same length as texts")
+
+        if not self.cache:
+            return await self._generate_batches(texts, token_counts)
+
+        dimension = await self.provider.load_dimension()
+        keys = [self._cache_key(text, dimension) if text and text.strip() else None for text in texts]
+        cached = await self.cache.get_many(list({key for key in keys if key}))
+
+        # Send each uncached text to the provider once, even if it repeats
+        miss_texts: List[str] = []
+        miss_counts: List[int] = []
+        miss_index: Dict[str, int] = {}
+        for position, (text, key) in enumerate(zip(texts, keys)):
+            if key is None or key in cached or key in miss_index:
+                continue
+            miss_index[key] = len(miss_texts)
+            miss_texts.append(text)
+            if token_counts is not None:
+                miss_counts.append(token_counts[position])
+
+        new_embeddings = []
+        if miss_texts:
+            new_embeddings = await self._generate_batches(
+                miss_texts,
+                miss_counts if token_counts is not None else None
+            )
 
-        # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
+        # Zero vectors are provider fallbacks for failed texts and must not be cached
+        await self.cache.set_many({
+            key: new_embeddings[idx]
+            for key, idx in miss_index.items()
+            if any(new_embeddings[idx])
+        })
+
+        embeddings: List[List[float]] = []
+        for key in keys:
+            if key is None:
+                embeddings.append([0.0] * dimension)
+            elif key in cached:
+                embeddings.append(cached[key])
+            else:
+                embeddings.append(new_embeddings[miss_index[key]])
 
-            try:
-                batch_embeddings = await self.provider.generate_embeddings_batch(batch)
-                all_embeddings.extend(batch_embeddings)
+        logger.info(f"Embedding cache served {len(texts) - len(miss_texts)}/{len(texts)} texts")
+        return embeddings
 
-                logger.info(f"Generated embeddings for batch {i // self.batch_size + 1} ({len(batch)} texts)")
+    async def _generate_batches(
+        self,
+        texts: List[str],
+        token_counts: Optional[List[int]] = None
+    ) -> List[List[float]]:
+        """Send texts to the provider in token-packed, concurrent, individually retried batches"""
+        provider = self.provider
+
+        if token_counts is None:
+            # Encoding a large upload is CPU-bound, keep it off the event loop
+            token_counts = await asyncio.to_thread(count_embedding_tokens, texts)
+
+        # Oversized texts are truncated by the provider, so cap their budget share
+        token_counts = [min(count, provider.max_input_tokens) for count in token_counts]
+        batches = pack_batches(
+            token_counts,
+            max_batch_tokens=provider.max_batch_tokens,
+            max_batch_size=min(self.batch_size, provider.max_batch_size)
+        )
 
-                # Small delay to avoid rate limits
-                if i + self.batch_size < len(texts):
-                    await asyncio.sleep(0.1)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        stats = BatchEmbeddingStats(
+            texts=len(texts),
+            tokens=sum(token_counts),
+            batches=len(batches),
+            max_concurrency=self.max_concurrency
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        start_time = time.perf_counter()
 
-            except Exception as e:
-                logger.error(f"Failed to generate embeddings for batch {i // self.batch_size}: {e}")
-                raise Exception(f"Batch embedding generation failed: {str(e)}")
+        async def run_batch(positions: List[int]) -> None:
+            batch = [texts[idx] for idx in positions]
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with semaphore:
+                        batch_embeddings = await provider.generate_embeddings_batch(batch)
+                    for idx, embedding in zip(positions, batch_embeddings):
+                        results[idx] = embedding
+                    logger.debug(f"Generated embeddings for batch of {len(batch)} texts")
+                    return
+                except Exception as e:
+                    if len(positions) > 1 and is_request_too_large(e):
+                        # Split and resend both halves; this is not a failed attempt
+                        middle = len(positions) // 2
+                        stats.splits += 1
+                        stats.batches += 1
+                        logger.warning(f"Embedding batch of {len(positions)} texts rejected as too large, splitting: {e}")
+                        await asyncio.gather(run_batch(positions[:middle]), run_batch(positions[middle:]))
+                        return
+
+                    # Throttling, timeouts and server errors were already retried by the rate limiter
+                    if attempt >= self.max_retries or classify_error(e) is not None:
+                        logger.error(f"Failed to generate embeddings for batch of {len(batch)} texts after {attempt + 1} attempts: {e}")
+                        raise
+
+                    # Back off outside the semaphore so other batches keep running
+                    stats.retries += 1
+                    wait_time = self.retry_base_delay * (2 ** attempt)
+                    logger.warning(f"Embedding batch attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                    await asyncio.sleep(wait_time)
+
+        tasks = [asyncio.create_task(run_batch(positions)) for positions in batches]
+
+        try:
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise Exception(f"Batch embedding generation failed: {str(e)}")
+        finally:
+            stats.elapsed_seconds = time.perf_counter() - start_time
+            self.last_batch_stats = stats
+
+        logger.info(
+            f"Generated {len(results)} embeddings in {stats.batches} batches "
+            f"({stats.texts_per_second:.1f} texts/s, {stats.tokens_per_second:.0f} tokens/s, "
+            f"concurrency={stats.max_concurrency}, retries={stats.retries}, splits={stats.splits})"
+        )
+        return results
 
-        logger.info(f"Generated {len(all_embeddings)} embeddings total")
-        return all_embeddings
+    def close(self) -> None:
+        """Release provider resources"""
+        if self.provider:
+            self.provider.close()
+
+    def get_cache_stats(self) -> Optional[dict]:
+        """Get embedding cache counters, or None when caching is disabled"""
+        return self.cache.stats() if self.cache else None
+
+    def get_coalescer_stats(self) -> Optional[dict]:
+        """Get request coalescing counters, or None when coalescing is disabled"""
+        return self.coalescer.stats() if self.coalescer else None
 
     async def get_embedding_dimension(self) -> int:
         """
@@ -285,7 +622,29 @@ class EmbeddingsService:
         if not self.provider:
             raise RuntimeError("No embedding provider configured")
 
-        return self.provider.get_dimension()
+        return await self.provider.load_dimension()
+
+    async def check_dimension(self) -> Optional[int]:
+        """
+        Resolve the provider's dimension and warn if it does not fit the schema
+
+        Run at startup: local models missing from the known-dimension table
+        are asked for their dimension by a worker process.
+
+        Returns:
+            Embedding dimension, or None without a provider
+        """
+        if not self.provider:
+            return None
+
+        dimension = await self.provider.load_dimension()
+        if dimension != settings.embedding_dimension:
+            logger.warning(
+                f"Embedding provider produces {dimension}-dimensional vectors "
+                f"but EMBEDDING_DIMENSION is {settings.embedding_dimension}; "
+                f"vectors will not fit the document_chunks.embedding column"
+            )
+        return dimension
 
     def calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -298,19 +657,32 @@ class EmbeddingsService:
         Returns:
             Cosine similarity score (-1 to 1)
         """
-        if len(embedding1) != len(embedding2):
-            raise ValueError("Embeddings must have the same dimension")
+        return similarity.cosine_similarity(embedding1, embedding2)
+
+    def top_k_similar(
+        self,
+        query_embedding: List[float],
+        embeddings: List[List[float]],
+        k: int = 5,
+        min_similarity: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the embeddings most similar to a query
 
-        # Cosine similarity
-        dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
-        magnitude1 = sum(a * a for a in embedding1) ** 0.5
-        magnitude2 = sum(b * b for b in embedding2) ** 0.5
+        Args:
+            query_embedding: Query embedding vector
+            embeddings: Candidate embedding vectors
+            k: Number of results to return
+            min_similarity: Optional minimum similarity threshold
 
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
+        Returns:
+            List of (candidate index, similarity) pairs, best first
+        """
+        if not embeddings:
+            return []
 
-        similarity = dot_product / (magnitude1 * magnitude2)
-        return similarity
+        index = similarity.SimilarityIndex(embeddings)
+        return index.search(query_embedding, k=k, min_similarity=min_similarity)[0]
 
 
 # Global instance
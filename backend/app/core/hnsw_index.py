@@ -0,0 +1,226 @@
+"""Thread-safe in-memory HNSW index built on hnswlib"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.similarity import MatrixLike, to_matrix
+
+logger = logging.getLogger(__name__)
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or one writer
+
+    Searches only read the graph, so they run in parallel; inserts, deletes
+    and resizes take the lock exclusively. Waiting writers block new readers
+    so a steady search load cannot starve them.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class HNSWIndex:
+    """
+    Cosine HNSW graph with integer ids, upserts and tombstone deletes
+
+    Deleted ids are marked in the graph and skipped by searches; their slots
+    are reused by later inserts, so the graph does not grow with churn.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 10000,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        num_threads: int = 1
+    ):
+        """
+        Initialize HNSW index
+
+        Args:
+            dimension: Vector dimension
+            capacity: Initial number of slots (grows automatically)
+            m: Graph out-degree
+            ef_construction: Candidate list size while inserting
+            ef_search: Candidate list size while searching (raised to k when smaller)
+            num_threads: hnswlib threads used by batch inserts
+
+        Raises:
+            ImportError: If hnswlib is not installed
+        """
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("The in-memory vector index requires hnswlib (pip install hnswlib)") from e
+
+        self.dimension = dimension
+        self._index = hnswlib.Index(space="cosine", dim=dimension)
+        self._index.init_index(
+            max_elements=max(1, capacity),
+            M=m,
+            ef_construction=ef_construction,
+            allow_replace_deleted=True
+        )
+        self._index.set_ef(ef_search)
+        self._index.set_num_threads(max(1, num_threads))
+
+        self._lock = ReadWriteLock()
+        self._live: set = set()
+        self._deleted: set = set()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._live
+
+    @property
+    def capacity(self) -> int:
+        return self._index.get_max_elements()
+
+    def set_ef_search(self, ef_search: int) -> None:
+        """Change the search candidate list size (recall vs latency)"""
+        with self._lock.write():
+            self._index.set_ef(ef_search)
+
+    def add(self, ids: Sequence[int], vectors: MatrixLike) -> None:
+        """
+        Insert or replace vectors
+
+        Args:
+            ids: Integer ids, one per vector
+            vectors: Vectors of shape (n, dimension)
+
+        Raises:
+            ValueError: If ids and vectors do not line up or the dimension differs
+        """
+        matrix = to_matrix(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(matrix):
+            raise ValueError("ids must have the same length as vectors")
+        if len(ids) == 0:
+            return
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {matrix.shape[1]}")
+
+        with self._lock.write():
+            # A tombstoned id is revived in place unless its slot was reused since
+            for item_id in ids.tolist():
+                if item_id in self._deleted:
+                    self._deleted.discard(item_id)
+                    try:
+                        self._index.unmark_deleted(item_id)
+                        self._live.add(item_id)
+                    except RuntimeError:
+                        pass
+
+            # Tombstoned slots are reused, so only live vectors take capacity
+            new_count = len(set(ids.tolist()) - self._live)
+            if len(self._live) + new_count > self.capacity:
+                self._index.resize_index(max(self.capacity * 2, len(self._live) + new_count))
+
+            self._index.add_items(matrix, ids, replace_deleted=True)
+            self._live.update(ids.tolist())
+
+    def delete(self, ids: Sequence[int]) -> int:
+        """
+        Tombstone vectors so searches skip them
+
+        Args:
+            ids: Ids to delete (unknown ids are ignored)
+
+        Returns:
+            Number of vectors deleted
+        """
+        with self._lock.write():
+            removed = 0
+            for item_id in ids:
+                item_id = int(item_id)
+                if item_id in self._live:
+                    self._index.mark_deleted(item_id)
+                    self._live.discard(item_id)
+                    self._deleted.add(item_id)
+                    removed += 1
+            return removed
+
+    def search(
+        self,
+        queries: MatrixLike,
+        k: int = 10,
+        min_similarity: Optional[float] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Approximate top-k cosine search
+
+        Args:
+            queries: Query vector or matrix of query vectors
+            k: Number of results per query
+            min_similarity: Optional minimum cosine similarity
+
+        Returns:
+            One list of (id, similarity) pairs per query, best first
+        """
+        matrix = to_matrix(queries)
+        with self._lock.read():
+            k = min(k, len(self._live))
+            if k <= 0:
+                return [[] for _ in range(len(matrix))]
+            labels, distances = self._index.knn_query(matrix, k=k)
+
+        results = []
+        for row_labels, row_distances in zip(labels, distances):
+            hits = []
+            for label, distance in zip(row_labels, row_distances):
+                similarity = 1.0 - float(distance)
+                if min_similarity is None or similarity >= min_similarity:
+                    hits.append((int(label), similarity))
+            results.append(hits)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Size counters"""
+        return {
+            "vectors": len(self._live),
+            "tombstones": self._index.get_current_count() - len(self._live),
+            "capacity": self.capacity,
+        }
@@ -1,17 +1,60 @@
 """LLM wrapper with support for multiple providers"""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, Any
+import asyncio
 import logging
+import time
 from openai import OpenAI, AsyncOpenAI
 from openai.types.chat import ChatCompletion
-import tiktoken
 
 from .config import settings
+from .llm_cache import LLMResponseCache, get_llm_cache, is_deterministic
+from .rate_limit import get_rate_limiter
+from .tokenizer import tokenizer_service
 
 logger = logging.getLogger(__name__)
 
 
+def build_messages(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    history: Optional[List[Dict[str, str]]] = None
+) -> List[Dict[str, str]]:
+    """
+    Build a chat message list: system prompt, earlier turns, then the prompt
+
+    Args:
+        prompt: User prompt
+        system_prompt: Optional system prompt
+        history: Earlier conversation turns as role/content dicts, oldest first
+
+    Returns:
+        Messages in chat completion format
+    """
+    messages: List[Dict[str, str]] = []
+
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+
+    for turn in history or []:
+        messages.append({"role": turn["role"], "content": turn["content"]})
+
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+@dataclass
+class LLMResult:
+    """Generated text with the token usage of the request"""
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached: bool = False
+
+
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers"""
 
@@ -27,6 +70,50 @@ class BaseLLMProvider(ABC):
         """Generate text from prompt"""
         pass
 
+    async def generate_with_usage(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResult:
+        """
+        Generate text from prompt along with its token usage
+
+        Providers that do not report usage return the text only; LLMManager
+        fills in the counts with the shared tokenizer.
+        """
+        text = await self.generate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        return LLMResult(text=text)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Generate text from prompt, yielding pieces as they are produced
+
+        Providers without native streaming yield the whole completion at once.
+        """
+        yield await self.generate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+
     @abstractmethod
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
@@ -39,15 +126,12 @@ class OpenAIProvider(BaseLLMProvider):
     def __init__(self, api_key: str, model: str = "gpt-4"):
         self.api_key = api_key
         self.model = model
-        self.client = AsyncOpenAI(api_key=api_key)
+        # 429s, timeouts, 5xx and connection errors are retried by the shared adaptive rate limiter
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
         self.sync_client = OpenAI(api_key=api_key)
-
-        # Initialize tokenizer
-        try:
-            self.tokenizer = tiktoken.encoding_for_model(model)
-        except KeyError:
-            logger.warning(f"Model {model} not found, using cl100k_base encoding")
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.rate_limiter = get_rate_limiter("openai-chat")
+        # Loaded once per model and shared with every other tokenizer user
+        self.tokenizer = tokenizer_service.get_encoding(model)
 
     async def generate(
         self,
@@ -55,6 +139,7 @@ class OpenAIProvider(BaseLLMProvider):
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        history: Optional[List[Dict[str, str]]] = None,
         **kwargs
     ) -> str:
         """
@@ -65,20 +150,50 @@ class OpenAIProvider(BaseLLMProvider):
             system_prompt: Optional system prompt
             temperature: Sampling temperature (0.0 - 2.0)
             max_tokens: Maximum tokens to generate
+            history: Earlier conversation turns as role/content dicts, oldest first
             **kwargs: Additional OpenAI API parameters
 
         Returns:
             Generated text
         """
-        messages: List[Dict[str, str]] = []
+        result = await self.generate_with_usage(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            history=history,
+            **kwargs
+        )
+        return result.text
 
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+    async def generate_with_usage(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> LLMResult:
+        """
+        Generate text using OpenAI API, with the usage the API reported
 
-        messages.append({"role": "user", "content": prompt})
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature (0.0 - 2.0)
+            max_tokens: Maximum tokens to generate
+            history: Earlier conversation turns as role/content dicts, oldest first
+            **kwargs: Additional OpenAI API parameters
+
+        Returns:
+            LLMResult with the text and prompt/completion token counts
+        """
+        messages = build_messages(prompt, system_prompt, history)
 
         try:
-            response: ChatCompletion = await self.client.chat.completions.create(
+            response: ChatCompletion = await self.rate_limiter.call(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
@@ -86,25 +201,120 @@ class OpenAIProvider(BaseLLMProvider):
                 **kwargs
             )
 
+            usage = response.usage
             content = response.choices[0].message.content
             if content is None:
                 logger.error("OpenAI returned empty content")
-                return ""
-
-            logger.info(
-                f"LLM generation: {response.usage.prompt_tokens} prompt tokens, "
-                f"{response.usage.completion_tokens} completion tokens"
+                content = ""
+            elif usage:
+                logger.info(
+                    f"LLM generation: {usage.prompt_tokens} prompt tokens, "
+                    f"{usage.completion_tokens} completion tokens"
+                )
+
+            return LLMResult(
+                text=content,
+                prompt_tokens=usage.prompt_tokens if usage else None,
+                completion_tokens=usage.completion_tokens if usage else None
             )
 
-            return content
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion from the OpenAI API
+
+        The rate limiter covers opening the stream, so throttled requests are
+        retried before the first token; errors after that are raised as is.
+        Closing the generator (e.g. on client disconnect) closes the HTTP
+        response, which stops generation upstream.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature (0.0 - 2.0)
+            max_tokens: Maximum tokens to generate
+            history: Earlier conversation turns as role/content dicts, oldest first
+            **kwargs: Additional OpenAI API parameters
+
+        Yields:
+            Content deltas in order
+        """
+        messages = build_messages(prompt, system_prompt, history)
+
+        try:
+            stream = await self.rate_limiter.call(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs
+            )
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
 
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken"""
-        return len(self.tokenizer.encode(text))
+        return tokenizer_service.count(text, self.model)
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+class StreamStats:
+    """Counters and recent time-to-first-token samples of streamed completions"""
+
+    def __init__(self, window: int = 1000):
+        """
+        Initialize stream statistics
+
+        Args:
+            window: Number of recent time-to-first-token samples kept
+        """
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.ttft_ms: Deque[float] = deque(maxlen=window)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus median and p95 time to first token"""
+        samples = sorted(self.ttft_ms)
+
+        def percentile(q: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)
+
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "ttft_p50_ms": percentile(0.5),
+            "ttft_p95_ms": percentile(0.95),
+        }
 
 
 class LLMManager:
@@ -112,6 +322,7 @@ class LLMManager:
 
     def __init__(self):
         self.provider: Optional[BaseLLMProvider] = None
+        self.stream_stats = StreamStats()
         self._initialize_provider()
 
     def _initialize_provider(self):
@@ -133,40 +344,238 @@ class LLMManager:
             logger.error(f"Unsupported LLM provider: {provider}")
             raise ValueError(f"Unsupported LLM provider: {provider}")
 
+    def _response_cache(
+        self,
+        use_cache: bool,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        **kwargs
+    ) -> Tuple[Optional[LLMResponseCache], Optional[str]]:
+        """Response cache and key for a request, or (None, None) if it must not be cached"""
+        if not use_cache or not settings.llm_cache_enabled:
+            return None, None
+
+        cache = get_llm_cache()
+        if not is_deterministic(temperature, **kwargs):
+            cache.record_bypass()
+            return None, None
+
+        model = f"{settings.llm_provider}:{getattr(self.provider, 'model', '')}"
+        return cache, cache.make_key(model, prompt, system_prompt, temperature, max_tokens, **kwargs)
+
+    async def _fill_usage(
+        self,
+        result: LLMResult,
+        prompt: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> LLMResult:
+        """Count tokens the provider did not report, in one bulk encode"""
+        if result.prompt_tokens is not None and result.completion_tokens is not None:
+            return result
+
+        texts = [message["content"] for message in build_messages(prompt, system_prompt, history)]
+        counts = await tokenizer_service.count_many_async(
+            texts + [result.text], getattr(self.provider, "model", None)
+        )
+        if result.prompt_tokens is None:
+            result.prompt_tokens = sum(counts[:-1])
+        if result.completion_tokens is None:
+            result.completion_tokens = counts[-1]
+        return result
+
     async def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        use_cache: bool = True,
         **kwargs
     ) -> str:
         """
         Generate text using configured LLM provider
 
+        Deterministic requests (temperature 0) are served from the response
+        cache when the same model, prompts and parameters were seen before.
+
         Args:
             prompt: User prompt
             system_prompt: Optional system prompt
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
-            **kwargs: Additional provider-specific parameters
+            use_cache: Set to False to always call the provider
+            **kwargs: Additional provider-specific parameters, e.g. history
 
         Returns:
             Generated text
 
+        Raises:
+            RuntimeError: If no provider is configured
+        """
+        result = await self.generate_with_usage(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            **kwargs
+        )
+        return result.text
+
+    async def generate_with_usage(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        **kwargs
+    ) -> LLMResult:
+        """
+        Generate text along with its prompt and completion token counts
+
+        Counts come from the provider's usage report (or the response cache),
+        so callers never have to re-encode the answer. Only providers that
+        report no usage are counted locally.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            use_cache: Set to False to always call the provider
+            **kwargs: Additional provider-specific parameters, e.g. history
+
+        Returns:
+            LLMResult with text, prompt_tokens, completion_tokens and cached
+
         Raises:
             RuntimeError: If no provider is configured
         """
         if not self.provider:
             raise RuntimeError("No LLM provider configured")
 
-        return await self.provider.generate(
+        cache, key = self._response_cache(use_cache, prompt, system_prompt, temperature, max_tokens, **kwargs)
+        if cache:
+            entry = await cache.get(key)
+            if entry:
+                return LLMResult(
+                    text=entry["text"],
+                    prompt_tokens=entry["prompt_tokens"],
+                    completion_tokens=entry["completion_tokens"],
+                    cached=True
+                )
+
+        result = await self.provider.generate_with_usage(
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=temperature,
             max_tokens=max_tokens,
             **kwargs
         )
+        result = await self._fill_usage(result, prompt, system_prompt, kwargs.get("history"))
+
+        if cache and result.text:
+            await cache.set(key, result.text, result.prompt_tokens, result.completion_tokens)
+        return result
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        on_first_token: Optional[Callable[[float], None]] = None,
+        use_cache: bool = True,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream text from the configured LLM provider
+
+        Time to first token is recorded in stream_stats, and streams that are
+        closed or cancelled before finishing are counted as cancelled.
+        Deterministic requests found in the response cache are sent as a
+        single piece; completed ones are added to it.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            on_first_token: Optional callback receiving the time to first token in ms
+            use_cache: Set to False to always call the provider
+            **kwargs: Additional provider-specific parameters, e.g. history
+
+        Yields:
+            Generated text pieces
+
+        Raises:
+            RuntimeError: If no provider is configured
+        """
+        if not self.provider:
+            raise RuntimeError("No LLM provider configured")
+
+        stats = self.stream_stats
+        stats.started += 1
+        start = time.perf_counter()
+        first = True
+
+        cache, key = self._response_cache(use_cache, prompt, system_prompt, temperature, max_tokens, **kwargs)
+        entry = await cache.get(key) if cache else None
+        if entry:
+            pieces = _single(entry["text"])
+            cache = None
+        else:
+            pieces = self.provider.generate_stream(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            )
+
+        received: List[str] = []
+        try:
+            async for piece in pieces:
+                if first:
+                    first = False
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                    stats.ttft_ms.append(ttft_ms)
+                    if on_first_token:
+                        on_first_token(ttft_ms)
+                if cache:
+                    received.append(piece)
+                yield piece
+        except (asyncio.CancelledError, GeneratorExit):
+            stats.cancelled += 1
+            logger.info(f"LLM stream cancelled after {(time.perf_counter() - start) * 1000:.0f} ms")
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        else:
+            stats.completed += 1
+            if cache and received:
+                result = await self._fill_usage(
+                    LLMResult(text="".join(received)), prompt, system_prompt, kwargs.get("history")
+                )
+                await cache.set(key, result.text, result.prompt_tokens, result.completion_tokens)
+        finally:
+            # Close the provider stream now rather than when it is garbage collected
+            await pieces.aclose()
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Response cache counters, or None when the cache is disabled"""
+        if not settings.llm_cache_enabled:
+            return None
+        return get_llm_cache().stats()
+
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """Streaming counters and time-to-first-token percentiles"""
+        return self.stream_stats.snapshot()
 
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
@@ -175,6 +584,13 @@ class LLMManager:
 
         return self.provider.count_tokens(text)
 
+    async def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """Count tokens of several texts in one batch encode, off the event loop"""
+        if not self.provider:
+            raise RuntimeError("No LLM provider configured")
+
+        return await tokenizer_service.count_many_async(texts, getattr(self.provider, "model", None))
+
     def is_available(self) -> bool:
         """Check if LLM provider is available"""
         return self.provider is not None
@@ -0,0 +1,212 @@
+"""Response cache for deterministic LLM completions"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.cache import LRUCache, SQLiteCacheStore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_deterministic(temperature: float, **kwargs: Any) -> bool:
+    """
+    Whether a completion request is repeatable enough to cache
+
+    Only greedy decoding (temperature 0) with a single choice is cached;
+    any sampling makes a repeated request legitimately return something else.
+
+    Args:
+        temperature: Sampling temperature
+        **kwargs: Additional provider parameters
+
+    Returns:
+        True if the response may be served from cache
+    """
+    return temperature == 0 and kwargs.get("n", 1) == 1 and not kwargs.get("stream")
+
+
+class LLMResponseCache:
+    """
+    Two-tier LLM response cache with a time to live
+
+    The in-memory LRU tier is checked first, then the optional persistent
+    SQLite tier. Persistent hits are promoted into the LRU tier. Entries older
+    than the TTL are treated as misses in both tiers.
+    """
+
+    def __init__(self, max_entries: int = 1000, path: Optional[str] = None, ttl_seconds: float = 86400):
+        """
+        Initialize LLM response cache
+
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            path: Path to the persistent SQLite store (None disables it)
+            ttl_seconds: Entry lifetime in seconds (0 = no expiry)
+        """
+        self.memory = LRUCache(max_entries=max_entries)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        self.bypassed = 0
+        self.saved_prompt_tokens = 0
+        self.saved_completion_tokens = 0
+        self._store: Optional[SQLiteCacheStore] = None
+        self._store_failed = False
+
+    @property
+    def store(self) -> Optional[SQLiteCacheStore]:
+        """Persistent tier, opened lazily on first use"""
+        if self._store is None and self.path and not self._store_failed:
+            try:
+                self._store = SQLiteCacheStore(self.path, table="llm_response_cache")
+                if self.ttl_seconds:
+                    self._store.delete_older_than(self.ttl_seconds)
+            except Exception as e:
+                self._store_failed = True
+                logger.error(f"Failed to open persistent LLM cache at {self.path}: {e}")
+        return self._store
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        **kwargs: Any
+    ) -> str:
+        """Build the cache key for a completion request"""
+        request = json.dumps(
+            {
+                "prompt": prompt,
+                "system_prompt": system_prompt,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "kwargs": kwargs,
+            },
+            sort_keys=True,
+            default=str
+        )
+        return f"{model}:{hashlib.sha256(request.encode('utf-8')).hexdigest()}"
+
+    def _fresh(self, created_at: float) -> bool:
+        return not self.ttl_seconds or time.time() - created_at < self.ttl_seconds
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Dict with text, prompt_tokens and completion_tokens, or None
+        """
+        entry = self.memory.get(key)
+        if entry is not None and not self._fresh(entry["created_at"]):
+            self.memory.delete(key)
+            entry = None
+
+        if entry is None and self.store:
+            try:
+                stored = await asyncio.to_thread(self.store.get_many, [key], self.ttl_seconds or None)
+            except Exception as e:
+                logger.warning(f"Persistent LLM cache lookup failed: {e}")
+                stored = {}
+            if key in stored:
+                entry = json.loads(stored[key])
+                self.memory.set(key, entry)
+                self.persistent_hits += 1
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.saved_prompt_tokens += entry["prompt_tokens"]
+        self.saved_completion_tokens += entry["completion_tokens"]
+        return entry
+
+    async def set(self, key: str, text: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Store a response in both tiers
+
+        Args:
+            key: Cache key from make_key
+            text: Completion text
+            prompt_tokens: Prompt tokens the request cost
+            completion_tokens: Completion tokens the request cost
+        """
+        entry = {
+            "text": text,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "created_at": time.time(),
+        }
+        self.memory.set(key, entry)
+
+        store = self.store
+        if store:
+            try:
+                await asyncio.to_thread(store.set_many, [(key, json.dumps(entry).encode("utf-8"))])
+            except Exception as e:
+                logger.warning(f"Persistent LLM cache write failed: {e}")
+
+    def record_bypass(self) -> None:
+        """Count a request that skipped the cache because it samples"""
+        self.bypassed += 1
+
+    def clear(self) -> None:
+        """Clear both cache tiers"""
+        self.memory.clear()
+        store = self.store
+        if store:
+            store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        ``hits`` and ``misses`` only count cacheable requests; sampled
+        requests are counted in ``bypassed``.
+        """
+        memory_stats = self.memory.stats()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "persistent_hits": self.persistent_hits,
+            "bypassed": self.bypassed,
+            "saved_prompt_tokens": self.saved_prompt_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+            "saved_tokens": self.saved_prompt_tokens + self.saved_completion_tokens,
+            "evictions": memory_stats["evictions"],
+            "memory_size": memory_stats["size"],
+            "max_entries": memory_stats["max_entries"],
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": bool(self.path) and not self._store_failed,
+        }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the process-wide LLM response cache"""
+    global _llm_cache
+
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            max_entries=settings.llm_cache_max_entries,
+            path=settings.llm_cache_path or None,
+            ttl_seconds=settings.llm_cache_ttl_seconds
+        )
+    return _llm_cache
@@ -0,0 +1,40 @@
+"""Code run inside the local embedding worker processes
+
+Spawned workers import this module to unpickle their initializer and
+tasks, so it must not import anything from the app: importing the
+embeddings service would build the global EmbeddingsService (and with it
+another provider) in every worker.
+"""
+
+from typing import List
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, device: str, num_threads: int) -> None:
+    """Process pool initializer: load the model once per worker"""
+    global _worker_model
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Avoid oversubscribing cores when several workers run side by side
+    torch.set_num_threads(max(1, num_threads))
+    _worker_model = SentenceTransformer(model_name, device=device)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> List[List[float]]:
+    """Encode texts with the worker's model"""
+    embeddings = _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    return embeddings.tolist()
+
+
+def _dimension_in_worker() -> int:
+    """Report the worker model's output dimension"""
+    return _worker_model.get_sentence_embedding_dimension()
@@ -0,0 +1,143 @@
+"""Local CPU embedding provider based on sentence-transformers"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional
+
+from app.core.embedding_base import BaseEmbeddingProvider
+from app.core.local_embedding_worker import _dimension_in_worker, _encode_in_worker, _init_worker
+
+logger = logging.getLogger(__name__)
+
+# Known output dimensions, so the dimension can be reported without loading a model
+MODEL_DIMENSIONS = {
+    "sentence-transformers/all-MiniLM-L6-v2": 384,
+    "all-MiniLM-L6-v2": 384,
+    "sentence-transformers/all-MiniLM-L12-v2": 384,
+    "sentence-transformers/all-mpnet-base-v2": 768,
+    "all-mpnet-base-v2": 768,
+    "sentence-transformers/multi-qa-mpnet-base-dot-v1": 768,
+    "BAAI/bge-small-en-v1.5": 384,
+    "BAAI/bge-base-en-v1.5": 768,
+    "BAAI/bge-large-en-v1.5": 1024,
+    "intfloat/e5-base-v2": 768,
+}
+
+class LocalEmbeddingProvider(BaseEmbeddingProvider):
+    """
+    sentence-transformers provider running on CPU worker processes
+
+    Inference runs in a process pool so the event loop is never blocked and
+    the GIL is not contended; each worker loads the model once at start-up.
+    """
+
+    name = "local"
+
+    # No API limits apply; the model truncates inputs to its own max_seq_length
+    max_batch_tokens = 1_000_000
+
+    def __init__(
+        self,
+        model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        max_workers: int = 2,
+        batch_size: int = 32,
+        device: str = "cpu",
+        dimension: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize local embedding provider
+
+        Args:
+            model: sentence-transformers model name or path
+            max_workers: Number of worker processes
+            batch_size: Encode batch size inside each worker
+            device: Torch device for inference
+            dimension: Output dimension for models missing from MODEL_DIMENSIONS;
+                if None it is asked from a worker by load_dimension()
+            executor: Optional executor to use instead of a new process pool
+        """
+        self.model = model
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self._dimension: Optional[int] = MODEL_DIMENSIONS.get(model) or dimension
+
+        if executor is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.max_workers)
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # spawn keeps torch and the parent's threads out of the workers
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model, device, threads_per_worker)
+            )
+        self.executor = executor
+
+    def truncate(self, text: str) -> str:
+        """sentence-transformers truncates to the model's max_seq_length itself"""
+        return text
+
+    async def _encode(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _encode_in_worker, texts, self.batch_size)
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding using the local model"""
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+
+        embeddings = await self._encode([text])
+        return embeddings[0]
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings batch, spreading the work over all worker processes"""
+        if not texts:
+            return []
+
+        embeddings = [[0.0] * await self.load_dimension() for _ in texts]
+        positions = [idx for idx, text in enumerate(texts) if text and text.strip()]
+        if not positions:
+            return embeddings
+
+        # One slice per worker, but never smaller than an encode batch
+        slice_size = max(self.batch_size, -(-len(positions) // self.max_workers))
+        slices = [positions[i:i + slice_size] for i in range(0, len(positions), slice_size)]
+
+        results = await asyncio.gather(*(
+            self._encode([texts[idx] for idx in slice_positions])
+            for slice_positions in slices
+        ))
+
+        for slice_positions, slice_embeddings in zip(slices, results):
+            for idx, embedding in zip(slice_positions, slice_embeddings):
+                embeddings[idx] = embedding
+        return embeddings
+
+    async def load_dimension(self) -> int:
+        """Get the model's embedding dimension, asking a worker for unknown models"""
+        if self._dimension is None:
+            loop = asyncio.get_running_loop()
+            self._dimension = await loop.run_in_executor(self.executor, _dimension_in_worker)
+        return self._dimension
+
+    def get_dimension(self) -> int:
+        """
+        Get the model's embedding dimension
+
+        Never waits for a worker, since the model may still be loading.
+
+        Raises:
+            RuntimeError: If the dimension is neither known nor loaded yet
+        """
+        if self._dimension is None:
+            raise RuntimeError(
+                f"Embedding dimension of {self.model} is unknown; pass dimension or await load_dimension()"
+            )
+        return self._dimension
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
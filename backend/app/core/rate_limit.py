@@ -0,0 +1,351 @@
+"""Adaptive concurrency and throughput control for external provider APIs"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THROTTLED = "throttled"
+TIMEOUT = "timeout"
+TRANSIENT = "transient"
+
+# Server and connection failures that usually succeed on a later attempt
+TRANSIENT_STATUS_CODES = (500, 502, 503, 504)
+TRANSIENT_ERROR_NAMES = ("APIConnectionError", "InternalServerError", "ServiceUnavailable", "BadGateway")
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """
+    Classify a provider error for the rate limiter
+
+    Returns:
+        "throttled" for HTTP 429 / quota errors, "timeout" for timeouts,
+        "transient" for 5xx and connection errors, None for errors the
+        limiter should not handle
+    """
+    status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status_code == 429 or type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return THROTTLED
+
+    if isinstance(error, asyncio.TimeoutError):
+        return TIMEOUT
+    name = type(error).__name__
+    if "Timeout" in name or name == "DeadlineExceeded":
+        return TIMEOUT
+
+    if status_code in TRANSIENT_STATUS_CODES or name in TRANSIENT_ERROR_NAMES or isinstance(error, ConnectionError):
+        return TRANSIENT
+
+    return None
+
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """
+    Extract the server-requested delay from a provider error
+
+    Supports ``retry-after-ms`` and ``retry-after`` headers, the latter as
+    seconds or an HTTP date.
+
+    Returns:
+        Delay in seconds, or None if the error carries no hint
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD concurrency and request-rate controller
+
+    The concurrency limit grows by one for every window of successful calls
+    and is multiplied by ``decrease_factor`` on throttling or timeouts. After
+    the first throttle a request rate is enforced too, starting from the
+    observed throughput and following the same increase/decrease rules.
+    ``Retry-After`` hints pause all callers until the requested time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        max_rate: Optional[float] = None,
+        min_rate: float = 0.5,
+        decrease_factor: float = 0.5,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        decrease_cooldown: float = 1.0
+    ):
+        """
+        Initialize rate limiter
+
+        Args:
+            name: Limiter name used in logs and snapshots
+            initial_concurrency: Starting number of calls allowed in flight
+            min_concurrency: Lower bound for the concurrency limit
+            max_concurrency: Upper bound for the concurrency limit
+            max_rate: Optional cap in requests per second (None = unlimited)
+            min_rate: Lower bound for the enforced request rate
+            decrease_factor: Multiplier applied on throttling or timeouts
+            max_retries: Retries for throttled, timed out or transiently failed calls
+            base_backoff: Backoff in seconds when no Retry-After is given
+            max_backoff: Upper bound for any single wait
+            decrease_cooldown: Seconds during which further decreases are ignored,
+                so one burst of 429s only backs off once
+        """
+        self.name = name
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate: Optional[float] = max_rate
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._next_send = 0.0
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._completions: Deque[float] = deque()
+
+        self.successes = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self.transient_errors = 0
+        self.retries = 0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self.limit)
+
+    def observed_rate(self, window: float = 10.0) -> float:
+        """Successful calls per second over the recent window"""
+        cutoff = time.monotonic() - window
+        while self._completions and self._completions[0] < cutoff:
+            self._completions.popleft()
+        return len(self._completions) / window
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot, any Retry-After pause and the rate pacing"""
+        while True:
+            pause = self.blocked_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.in_flight < self.concurrency_limit:
+                break
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self.in_flight += 1
+
+        if self.rate:
+            now = time.monotonic()
+            send_at = max(now, self._next_send)
+            self._next_send = send_at + 1.0 / self.rate
+            if send_at > now:
+                try:
+                    await asyncio.sleep(send_at - now)
+                except asyncio.CancelledError:
+                    self.release()
+                    raise
+
+    def release(self) -> None:
+        """Return a concurrency slot and wake waiting callers"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        available = self.concurrency_limit - self.in_flight
+        for waiter in list(self._waiters):
+            if available <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                available -= 1
+
+    def on_success(self) -> None:
+        """Additive increase after a successful call"""
+        self.successes += 1
+        self._completions.append(time.monotonic())
+
+        # +1 slot per window of `limit` successes
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        if self.rate:
+            # Roughly +1 request/s per second of successful traffic
+            self.rate = self.rate + 1.0 / self.rate
+            if self.max_rate:
+                self.rate = min(self.rate, self.max_rate)
+        self._wake()
+
+    def _decrease(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return False
+        self._last_decrease = now
+
+        self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+        observed = self.observed_rate()
+        current = min(self.rate, observed) if self.rate and observed else (self.rate or observed)
+        if current:
+            self.rate = max(self.min_rate, current * self.decrease_factor)
+        else:
+            self.rate = self.min_rate
+        return True
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> float:
+        """
+        Multiplicative decrease after a 429
+
+        Args:
+            retry_after: Server-requested delay in seconds, if any
+
+        Returns:
+            Seconds all callers will pause before the next request
+        """
+        self.throttles += 1
+        if self._decrease():
+            logger.warning(
+                f"Rate limiter {self.name} throttled: concurrency={self.concurrency_limit}, "
+                f"rate={self.rate:.2f}/s, retry_after={retry_after}"
+            )
+
+        delay = retry_after if retry_after is not None else self.base_backoff
+        delay = min(delay, self.max_backoff)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        return delay
+
+    def on_timeout(self) -> None:
+        """Multiplicative decrease after a timeout"""
+        self.timeouts += 1
+        if self._decrease():
+            logger.warning(f"Rate limiter {self.name} saw a timeout: concurrency={self.concurrency_limit}")
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a provider call under the limiter, retrying throttles, timeouts and transient errors
+
+        Server errors and dropped connections are retried with exponential
+        backoff but, unlike throttles and timeouts, do not lower the limits.
+
+        Args:
+            func: Async callable performing the request
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            Exception: The provider error if it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            await self.acquire()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if kind is None or attempt >= self.max_retries:
+                    raise
+                if kind == THROTTLED:
+                    self.on_throttle(parse_retry_after(e))
+                    backoff = 0.0
+                else:
+                    if kind == TIMEOUT:
+                        self.on_timeout()
+                    else:
+                        self.transient_errors += 1
+                    backoff = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+            else:
+                self.on_success()
+                return result
+            finally:
+                self.release()
+
+            attempt += 1
+            self.retries += 1
+            logger.info(f"Rate limiter {self.name} retrying {kind} call (attempt {attempt + 1})")
+            if backoff:
+                await asyncio.sleep(backoff)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limits and back-off state"""
+        return {
+            "name": self.name,
+            "concurrency_limit": self.concurrency_limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "rate_limit_per_second": round(self.rate, 2) if self.rate else None,
+            "observed_rate_per_second": round(self.observed_rate(), 2),
+            "blocked_for_seconds": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            "successes": self.successes,
+            "throttles": self.throttles,
+            "timeouts": self.timeouts,
+            "transient_errors": self.transient_errors,
+            "retries": self.retries,
+        }
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(name: str) -> AdaptiveRateLimiter:
+    """Get the process-wide limiter for a provider API, creating it on first use"""
+    if name not in _limiters:
+        _limiters[name] = AdaptiveRateLimiter(
+            name=name,
+            initial_concurrency=settings.provider_initial_concurrency,
+            max_concurrency=settings.provider_max_concurrency,
+            max_rate=settings.provider_max_rate or None,
+            max_retries=settings.provider_max_retries
+        )
+    return _limiters[name]
+
+
+def get_rate_limiter_snapshots() -> Dict[str, Dict[str, Any]]:
+    """Snapshots of every limiter created so far"""
+    return {name: limiter.snapshot() for name, limiter in _limiters.items()}
+
+
+def reset_rate_limiters() -> None:
+    """Drop all limiters so the next call starts from the configured defaults"""
+    _limiters.clear()
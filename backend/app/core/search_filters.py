@@ -0,0 +1,106 @@
+"""Search filter normalization and in-process matching shared by the vector stores"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+# Filter keys on the parent document; chunk metadata filters go under "metadata"
+DOCUMENT_FILTER_FIELDS = ("tags", "language", "content_type")
+FILTER_FIELDS = ("collection_id", "document_id") + DOCUMENT_FILTER_FIELDS + ("metadata",)
+
+Filters = Dict[str, Any]
+
+
+class SearchFilters(BaseModel):
+    """Restrict search to chunks matching every given field"""
+    document_ids: Optional[List[int]] = Field(None, description="Chunks of any of these documents")
+    tags: Optional[List[str]] = Field(None, description="Documents with any of these tags")
+    language: Optional[List[str]] = Field(None, description="Documents in any of these languages")
+    content_type: Optional[List[str]] = Field(None, description="Documents of any of these MIME types")
+    metadata: Optional[Dict[str, Any]] = Field(
+        None, description="Chunk metadata key to a value or list of allowed values"
+    )
+
+    def to_filters(self) -> Dict[str, Any]:
+        """Filter dict for IndexingService.search_documents"""
+        filters = self.model_dump(exclude_none=True)
+        if "document_ids" in filters:
+            filters["document_id"] = filters.pop("document_ids")
+        return filters
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def normalize_filters(filters: Optional[Filters]) -> Filters:
+    """
+    Validate a filter dict and turn every value into a list
+
+    Supported keys:
+        collection_id: Chunk's collection id (routes pgvector searches to the collection's index)
+        document_id: Chunk's document id
+        tags: Document has any of the tags
+        language: Document language
+        content_type: Document MIME type
+        metadata: Dict of chunk_metadata key to value
+
+    A list value matches any of its items. Keys with None or empty values
+    are dropped.
+
+    Args:
+        filters: Filter dict (may already be normalized)
+
+    Returns:
+        Normalized filter dict
+
+    Raises:
+        ValueError: If a key is not supported
+    """
+    unknown = set(filters or {}) - set(FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported search filters: {', '.join(sorted(unknown))}")
+
+    normalized: Filters = {}
+    for key, value in (filters or {}).items():
+        if key == "metadata":
+            metadata = {
+                field: _as_list(field_value)
+                for field, field_value in (value or {}).items()
+                if field_value is not None and _as_list(field_value)
+            }
+            if metadata:
+                normalized["metadata"] = metadata
+        elif value is not None and _as_list(value):
+            normalized[key] = _as_list(value)
+    return normalized
+
+
+def needs_document_fields(filters: Optional[Filters]) -> bool:
+    """Whether a filter references columns of the parent document"""
+    return any(key in DOCUMENT_FILTER_FIELDS for key in (filters or {}))
+
+
+def matches_filters(fields: Dict[str, Any], metadata: Dict[str, Any], filters: Optional[Filters]) -> bool:
+    """
+    Check one chunk against a filter dict
+
+    Args:
+        fields: Chunk's collection_id and document_id plus the document's tags, language and content_type
+        metadata: Chunk metadata
+        filters: Filter dict already passed through normalize_filters
+
+    Returns:
+        True if every filter matches
+    """
+    for key, values in (filters or {}).items():
+        if key == "metadata":
+            if any(metadata.get(field) not in allowed for field, allowed in values.items()):
+                return False
+        elif key == "tags":
+            tags: Iterable[str] = fields.get("tags") or []
+            if not set(tags) & set(values):
+                return False
+        elif fields.get(key) not in values:
+            return False
+    return True
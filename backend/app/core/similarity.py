@@ -0,0 +1,276 @@
+"""Vectorized similarity scoring and top-k selection for embeddings"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VectorLike = Union[Sequence[float], np.ndarray]
+MatrixLike = Union[Sequence[Sequence[float]], np.ndarray]
+
+
+def to_matrix(vectors: MatrixLike) -> np.ndarray:
+    """
+    Convert vectors to a 2-D float32 matrix
+
+    Args:
+        vectors: A single vector or a list of vectors
+
+    Returns:
+        Matrix of shape (n, dim)
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a vector or a matrix, got array with {matrix.ndim} dimensions")
+    return matrix
+
+
+def normalize(vectors: MatrixLike) -> np.ndarray:
+    """
+    L2-normalize vectors row-wise
+
+    Zero vectors are left as zeros so they score 0.0 against everything.
+
+    Args:
+        vectors: A single vector or a list of vectors
+
+    Returns:
+        Normalized float32 matrix of shape (n, dim)
+    """
+    matrix = to_matrix(vectors)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity(vector1: VectorLike, vector2: VectorLike) -> float:
+    """
+    Cosine similarity between two vectors
+
+    Args:
+        vector1: First vector
+        vector2: Second vector
+
+    Returns:
+        Cosine similarity score (-1 to 1)
+
+    Raises:
+        ValueError: If the vectors have different dimensions
+    """
+    a = np.asarray(vector1, dtype=np.float32)
+    b = np.asarray(vector2, dtype=np.float32)
+    if a.shape != b.shape:
+        raise ValueError("Embeddings must have the same dimension")
+
+    denominator = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if denominator == 0:
+        return 0.0
+    return float(np.dot(a, b) / denominator)
+
+
+def cosine_similarity_matrix(
+    queries: MatrixLike,
+    corpus: MatrixLike,
+    normalized: bool = False
+) -> np.ndarray:
+    """
+    Score every query against every corpus vector
+
+    Args:
+        queries: Query vectors, shape (q, dim)
+        corpus: Corpus vectors, shape (n, dim)
+        normalized: Set when both inputs are already L2-normalized
+
+    Returns:
+        Similarity matrix of shape (q, n)
+
+    Raises:
+        ValueError: If the dimensions do not match
+    """
+    if normalized:
+        query_matrix, corpus_matrix = to_matrix(queries), to_matrix(corpus)
+    else:
+        query_matrix, corpus_matrix = normalize(queries), normalize(corpus)
+
+    if query_matrix.shape[1] != corpus_matrix.shape[1]:
+        raise ValueError("Embeddings must have the same dimension")
+
+    return query_matrix @ corpus_matrix.T
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores per row in descending order
+
+    Uses ``argpartition`` so only the selected k items are sorted.
+
+    Args:
+        scores: Score vector (n,) or matrix (q, n)
+        k: Number of items to select
+
+    Returns:
+        Tuple of (indices, scores), each shaped (k,) or (q, k)
+    """
+    scores = np.asarray(scores)
+    single = scores.ndim == 1
+    if single:
+        scores = scores.reshape(1, -1)
+
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        indices, values = empty.astype(np.int64), empty.astype(scores.dtype)
+    else:
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        indices = np.take_along_axis(candidates, order, axis=1)
+        values = np.take_along_axis(candidate_scores, order, axis=1)
+
+    if single:
+        return indices[0], values[0]
+    return indices, values
+
+
+def mmr_select(
+    relevance: VectorLike,
+    embeddings: MatrixLike,
+    k: int,
+    lambda_mult: float = 0.5,
+    normalized: bool = False
+) -> np.ndarray:
+    """
+    Pick a relevant but diverse subset with maximal marginal relevance
+
+    Each step takes the candidate maximizing
+    ``lambda_mult * relevance - (1 - lambda_mult) * max similarity to the
+    already selected candidates``. Pairwise similarities come from a single
+    matrix product and the redundancy of every candidate is updated with
+    one vector operation per pick, so the cost is O(n^2 * dim + k * n).
+
+    Args:
+        relevance: Relevance of each candidate to the query, shape (n,)
+        embeddings: Candidate vectors, shape (n, dim)
+        k: Number of candidates to select
+        lambda_mult: 1 ranks by relevance only, 0 by diversity only
+        normalized: Set when the embeddings are already L2-normalized
+
+    Returns:
+        Indices of the selected candidates in selection order
+
+    Raises:
+        ValueError: If relevance and embeddings have different lengths
+    """
+    relevance = np.asarray(relevance, dtype=np.float32).reshape(-1)
+    k = min(k, len(relevance))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    matrix = to_matrix(embeddings) if normalized else normalize(embeddings)
+    if len(matrix) != len(relevance):
+        raise ValueError("relevance and embeddings must have the same length")
+
+    pairwise = matrix @ matrix.T
+    weighted = lambda_mult * relevance
+    redundancy = np.full(len(relevance), -np.inf, dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    selected = np.empty(k, dtype=np.int64)
+
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = weighted - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        choice = int(np.argmax(scores))
+        selected[step] = choice
+        available[choice] = False
+        np.maximum(redundancy, pairwise[choice], out=redundancy)
+    return selected
+
+
+class SimilarityIndex:
+    """
+    Pre-normalized float32 corpus for repeated similarity queries
+
+    Useful for search, deduplication and reranking over in-memory vectors.
+    """
+
+    def __init__(self, vectors: MatrixLike, ids: Optional[Sequence] = None):
+        """
+        Initialize similarity index
+
+        Args:
+            vectors: Corpus vectors, shape (n, dim)
+            ids: Optional identifiers for each vector (defaults to positions)
+        """
+        self.matrix = normalize(vectors) if len(vectors) else np.empty((0, 0), dtype=np.float32)
+        self.ids = list(ids) if ids is not None else list(range(len(self.matrix)))
+        if len(self.ids) != len(self.matrix):
+            raise ValueError("ids must have the same length as vectors")
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def scores(self, queries: MatrixLike) -> np.ndarray:
+        """Similarity of each query against the whole corpus, shape (q, n)"""
+        return cosine_similarity_matrix(normalize(queries), self.matrix, normalized=True)
+
+    def search(
+        self,
+        queries: MatrixLike,
+        k: int = 10,
+        min_similarity: Optional[float] = None
+    ) -> List[List[Tuple[object, float]]]:
+        """
+        Top-k search for one or more queries
+
+        Args:
+            queries: Query vector or matrix of query vectors
+            k: Number of results per query
+            min_similarity: Optional minimum similarity threshold
+
+        Returns:
+            One list of (id, score) pairs per query, best first
+        """
+        if not len(self.matrix):
+            return [[] for _ in range(len(to_matrix(queries)))]
+
+        indices, values = top_k(self.scores(queries), k)
+        results = []
+        for row_indices, row_values in zip(indices, values):
+            hits = [
+                (self.ids[idx], float(score))
+                for idx, score in zip(row_indices, row_values)
+                if min_similarity is None or score >= min_similarity
+            ]
+            results.append(hits)
+        return results
+
+    def near_duplicates(self, threshold: float = 0.95) -> List[Tuple[object, object, float]]:
+        """
+        Find pairs of corpus vectors whose similarity is at least threshold
+
+        Args:
+            threshold: Minimum similarity for a pair to count as duplicate
+
+        Returns:
+            List of (id_a, id_b, score) pairs with id_a before id_b in the corpus
+        """
+        if len(self.matrix) < 2:
+            return []
+
+        scores = self.matrix @ self.matrix.T
+        rows, cols = np.nonzero(np.triu(scores >= threshold, k=1))
+        return [(self.ids[i], self.ids[j], float(scores[i, j])) for i, j in zip(rows, cols)]
@@ -0,0 +1,107 @@
+"""Process-wide tokenizer: encodings loaded once, bulk counting off the event loop"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import tiktoken
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+class TokenizerService:
+    """
+    Shared tiktoken encodings with single and bulk token counting
+
+    Encodings are resolved once per model and reused by every caller
+    (chunking, LLM providers, context packing). Counting uses
+    encode_ordinary, so text that happens to contain special-token markup
+    is counted as plain text instead of raising. Bulk counts go through
+    tiktoken's batch encoder, which spreads the texts over its own thread
+    pool; the async variant also keeps that work off the event loop.
+    """
+
+    def __init__(self, default_model: Optional[str] = None, num_threads: Optional[int] = None):
+        """
+        Initialize tokenizer service
+
+        Args:
+            default_model: Model whose encoding is used when none is given
+                (defaults to settings.llm_model)
+            num_threads: Threads for batch encoding (defaults to settings.tokenizer_threads)
+        """
+        self.default_model = default_model or settings.llm_model
+        self.num_threads = num_threads or settings.tokenizer_threads
+        self._encodings: Dict[str, "tiktoken.Encoding"] = {}
+        self._lock = threading.Lock()
+
+    def get_encoding(self, model: Optional[str] = None) -> "tiktoken.Encoding":
+        """
+        Encoding for a model, loaded on first use
+
+        Args:
+            model: Model name, or an encoding name such as cl100k_base
+
+        Returns:
+            tiktoken encoding (cl100k_base for unknown models)
+        """
+        model = model or self.default_model
+        encoding = self._encodings.get(model)
+        if encoding is not None:
+            return encoding
+
+        with self._lock:
+            if model not in self._encodings:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    try:
+                        encoding = tiktoken.get_encoding(model)
+                    except ValueError:
+                        logger.warning(f"Model {model} not found, using {DEFAULT_ENCODING} encoding")
+                        encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+                self._encodings[model] = encoding
+            return self._encodings[model]
+
+    def encode(self, text: str, model: Optional[str] = None) -> List[int]:
+        """Token ids of a text"""
+        return self.get_encoding(model).encode_ordinary(text)
+
+    def decode(self, tokens: List[int], model: Optional[str] = None) -> str:
+        """Text of token ids"""
+        return self.get_encoding(model).decode(tokens)
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Number of tokens in a text"""
+        return len(self.encode(text, model))
+
+    def count_many(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        """
+        Count tokens of several texts in one batch encode
+
+        Args:
+            texts: Texts to count
+            model: Model whose encoding is used
+
+        Returns:
+            Token counts in input order
+        """
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [self.count(texts[0], model)]
+        batches = self.get_encoding(model).encode_ordinary_batch(texts, num_threads=self.num_threads)
+        return [len(tokens) for tokens in batches]
+
+    async def count_many_async(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        """Bulk count in a worker thread so large batches do not block the event loop"""
+        return await asyncio.to_thread(self.count_many, texts, model)
+
+
+# Global instance
+tokenizer_service = TokenizerService()
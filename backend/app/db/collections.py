@@ -0,0 +1,151 @@
+"""Per-collection partial vector indexes on document_chunks"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.db.vector_indexes import ann_index_ddl, quantized_index_ddl, recommended_ivfflat_lists
+
+logger = logging.getLogger(__name__)
+
+# Databases created before collections existed lack these columns; new ones get them from the models
+COLLECTION_COLUMN_DDL = [
+    (
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS collection_id integer "
+        "REFERENCES collections (id) ON DELETE CASCADE"
+    ),
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS collection_id integer",
+    "CREATE INDEX IF NOT EXISTS ix_documents_collection_id ON documents (collection_id)",
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_collection_id ON document_chunks (collection_id)",
+]
+
+
+def collection_index_name(collection_id: int) -> str:
+    """Name of a collection's partial vector index"""
+    return f"ix_document_chunks_embedding_c{int(collection_id)}"
+
+
+def collection_index_ddl(collection_id: int, row_count: int = 0, concurrently: bool = False) -> Optional[str]:
+    """
+    DDL for a collection's partial vector index
+
+    The index has the same type as the table-wide one (the quantized HNSW
+    index when quantization is enabled) but only covers the collection's
+    rows, so a query scoped to the collection traverses a graph, or scans
+    lists, sized to the collection alone.
+
+    Args:
+        collection_id: Collection id
+        row_count: Current rows in the collection, used to size IVFFlat lists
+        concurrently: Build without blocking writes (must run outside a transaction)
+
+    Returns:
+        CREATE INDEX statement, or None when no vector index is configured
+    """
+    name = collection_index_name(collection_id)
+    where = f"collection_id = {int(collection_id)}"
+    if settings.embedding_quantization != "none":
+        ddl = quantized_index_ddl(settings.embedding_quantization, settings.embedding_dimension, name, where)
+    else:
+        lists = None
+        if settings.vector_index_type == "ivfflat":
+            lists = settings.ivfflat_lists or recommended_ivfflat_lists(row_count)
+        ddl = ann_index_ddl(settings.vector_index_type, lists=lists, name=name, where=where)
+
+    if ddl and concurrently:
+        ddl = ddl.replace("CREATE INDEX IF NOT EXISTS", "CREATE INDEX CONCURRENTLY IF NOT EXISTS", 1)
+    return ddl
+
+
+async def ensure_collection_columns(conn: AsyncConnection) -> None:
+    """Add the collection columns to tables created before collections (PostgreSQL only)"""
+    if conn.dialect.name != "postgresql":
+        return
+    for statement in COLLECTION_COLUMN_DDL:
+        await conn.execute(text(statement))
+
+
+async def create_collection_index(conn: AsyncConnection, collection_id: int, concurrently: bool = False) -> None:
+    """Build a collection's partial vector index (PostgreSQL only)"""
+    if conn.dialect.name != "postgresql":
+        return
+
+    row_count = 0
+    if settings.vector_index_type == "ivfflat" and not settings.ivfflat_lists:
+        row_count = (await conn.execute(
+            text("SELECT count(*) FROM document_chunks WHERE collection_id = :collection_id"),
+            {"collection_id": collection_id}
+        )).scalar()
+
+    ddl = collection_index_ddl(collection_id, row_count, concurrently)
+    if ddl:
+        await conn.execute(text(ddl))
+        logger.info(f"Ensured vector index for collection {collection_id}")
+
+
+async def drop_collection_index(conn: AsyncConnection, collection_id: int, concurrently: bool = False) -> None:
+    """Drop a collection's partial vector index (PostgreSQL only)"""
+    if conn.dialect.name != "postgresql":
+        return
+    concurrent = " CONCURRENTLY" if concurrently else ""
+    await conn.execute(text(f"DROP INDEX{concurrent} IF EXISTS {collection_index_name(collection_id)}"))
+
+
+async def build_collection_index(engine: AsyncEngine, collection_id: int) -> None:
+    """
+    Build a collection's partial index without blocking writes to document_chunks
+
+    Even a partial index scans the whole table, and a plain CREATE INDEX
+    holds a SHARE lock on it until commit. CREATE INDEX CONCURRENTLY avoids
+    that but cannot run in a transaction, so it gets an autocommit
+    connection of its own. A failed concurrent build leaves an invalid
+    index behind, which is dropped so a later attempt can rebuild it.
+
+    Args:
+        engine: Database engine
+        collection_id: Collection id
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            await create_collection_index(conn, collection_id, concurrently=True)
+        except Exception:
+            await drop_collection_index(conn, collection_id, concurrently=True)
+            raise
+
+
+async def remove_collection_index(engine: AsyncEngine, collection_id: int) -> None:
+    """
+    Drop a collection's partial index without locking out other collections
+
+    DROP INDEX takes an ACCESS EXCLUSIVE lock on document_chunks; inside the
+    transaction deleting the collection's rows it would be held until commit
+    and block every other search and upload. DROP INDEX CONCURRENTLY on an
+    autocommit connection waits for running queries instead.
+
+    Args:
+        engine: Database engine
+        collection_id: Collection id
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await drop_collection_index(conn, collection_id, concurrently=True)
+
+
+async def ensure_collection_indexes(conn: AsyncConnection) -> None:
+    """Make sure every collection has its partial vector index (PostgreSQL only)"""
+    if conn.dialect.name != "postgresql":
+        return
+    await ensure_collection_columns(conn)
+    result = await conn.execute(text("SELECT id FROM collections"))
+    for collection_id in result.scalars().all():
+        await create_collection_index(conn, collection_id)
@@ -0,0 +1,78 @@
+"""Token-budgeted conversation history queries"""
+
+import logging
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import Select
+
+from app.db.models import Message
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_HISTORY_INDEX = "ix_messages_conversation_id_id"
+
+# Tables created before the composite index existed; new ones get it from the model
+MESSAGE_HISTORY_INDEX_DDL = (
+    f"CREATE INDEX IF NOT EXISTS {MESSAGE_HISTORY_INDEX} ON messages (conversation_id, id)"
+)
+
+# Chat formatting adds a few tokens per message on top of its content
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+def message_cost():
+    """
+    Tokens a stored message takes up in the prompt
+
+    Uses the cached Message.tokens_used; rows written before token counts
+    were stored fall back to roughly four characters per token.
+    """
+    return func.coalesce(Message.tokens_used, func.length(Message.content) / 4) + MESSAGE_TOKEN_OVERHEAD
+
+
+def context_window_query(conversation_id: int, budget: int, max_messages: int) -> Select:
+    """
+    Newest messages of a conversation that fit a token budget, oldest first
+
+    The inner query walks the (conversation_id, id) index backwards from the
+    newest message, a window function keeps a running token total, and the
+    outer query keeps the contiguous newest run whose total fits the budget,
+    so history is loaded in one round trip without tokenizing anything.
+
+    Args:
+        conversation_id: Conversation id
+        budget: Token budget for the returned messages
+        max_messages: Upper bound on messages considered
+
+    Returns:
+        Query selecting id, role, content and tokens (cost including overhead)
+    """
+    newest = (
+        select(
+            Message.id,
+            Message.role,
+            Message.content,
+            message_cost().label("tokens")
+        )
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.id.desc())
+        .limit(max_messages)
+        .subquery()
+    )
+    running = select(
+        newest,
+        func.sum(newest.c.tokens).over(order_by=newest.c.id.desc()).label("running_tokens")
+    ).subquery()
+
+    return (
+        select(running.c.id, running.c.role, running.c.content, running.c.tokens)
+        .where(running.c.running_tokens <= budget)
+        .order_by(running.c.id)
+    )
+
+
+async def ensure_message_history_index(conn: AsyncConnection) -> None:
+    """Add the composite history index to existing messages tables"""
+    await conn.execute(text(MESSAGE_HISTORY_INDEX_DDL))
+    logger.info("Ensured conversation history index on messages")
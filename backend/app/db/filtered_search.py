@@ -0,0 +1,192 @@
+"""Search filter SQL, supporting indexes and pre-filter vs ANN planning"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import cast, func, literal, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.types import String
+
+from app.core.config import settings
+from app.core.search_filters import Filters, needs_document_fields, normalize_filters
+from app.db.models import Document, DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+# Largest hnsw.ef_search pgvector accepts; an HNSW scan returns at most this many rows
+HNSW_MAX_EF_SEARCH = 1000
+
+# The JSON columns are cast to jsonb in queries; the expression indexes use the same casts
+FILTER_INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_document_id ON document_chunks (document_id)",
+    (
+        "CREATE INDEX IF NOT EXISTS ix_document_chunks_metadata ON document_chunks "
+        "USING gin ((chunk_metadata::jsonb) jsonb_path_ops)"
+    ),
+    "CREATE INDEX IF NOT EXISTS ix_documents_tags ON documents USING gin ((tags::jsonb))",
+    "CREATE INDEX IF NOT EXISTS ix_documents_language ON documents (language)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_content_type ON documents (content_type)",
+]
+
+
+async def ensure_filter_indexes(conn: AsyncConnection) -> None:
+    """Create the indexes behind search filters (PostgreSQL only)"""
+    if conn.dialect.name != "postgresql":
+        return
+    for statement in FILTER_INDEX_DDL:
+        await conn.execute(text(statement))
+    logger.info("Ensured search filter indexes")
+
+
+def filter_clauses(filters: Optional[Filters]) -> list:
+    """
+    PostgreSQL WHERE clauses for a search filter dict
+
+    Queries using document fields must join documents. Tag and chunk
+    metadata filters use jsonb ``?|`` and ``@>`` so the GIN indexes apply,
+    and collection ids are inlined so per-collection partial indexes apply.
+
+    Args:
+        filters: Filter dict (see app.core.search_filters.normalize_filters)
+
+    Returns:
+        SQLAlchemy boolean clauses
+    """
+    filters = normalize_filters(filters)
+    clauses = []
+    if "collection_id" in filters:
+        # Rendered inline so the planner can match the collection's partial vector index,
+        # which a bound parameter in a generic plan would not
+        collections = [literal(int(value), literal_execute=True) for value in filters["collection_id"]]
+        clauses.append(
+            DocumentChunk.collection_id == collections[0] if len(collections) == 1
+            else DocumentChunk.collection_id.in_(collections)
+        )
+    for key, column in (
+        ("document_id", DocumentChunk.document_id),
+        ("language", Document.language),
+        ("content_type", Document.content_type),
+    ):
+        if key in filters:
+            values = filters[key]
+            clauses.append(column == values[0] if len(values) == 1 else column.in_(values))
+    if "tags" in filters:
+        tags = cast(filters["tags"], ARRAY(String))
+        clauses.append(cast(Document.tags, JSONB).has_any(tags))
+    metadata = cast(DocumentChunk.chunk_metadata, JSONB)
+    for field, values in filters.get("metadata", {}).items():
+        clauses.append(or_(*[metadata.contains({field: value}) for value in values]))
+    return clauses
+
+
+def filtered_chunks(filters: Optional[Filters], *columns):
+    """Select of the given columns over embedded chunks matching the filters"""
+    query = select(*columns).where(DocumentChunk.embedding.isnot(None), *filter_clauses(filters))
+    if needs_document_fields(filters):
+        query = query.join(Document, Document.id == DocumentChunk.document_id)
+    return query
+
+
+@dataclass
+class SearchPlan:
+    """How a filtered top-k search is executed"""
+
+    strategy: str  # "exact": scan the filtered rows; "ann": index scan with the filter applied during the scan
+    matching_rows: int  # Rows matching the filter, capped at the exact-scan limit + 1
+    total_rows: int  # Estimated rows in document_chunks
+
+    @property
+    def selectivity(self) -> float:
+        """Estimated fraction of rows passing the filter"""
+        if self.total_rows <= 0:
+            return 1.0
+        return min(1.0, self.matching_rows / self.total_rows)
+
+    def candidates(self, limit: int, cap: int = HNSW_MAX_EF_SEARCH) -> int:
+        """
+        Index scan size needed to find ``limit`` matches without iterative scans
+
+        A scan that returns n rows yields about ``n * selectivity`` matches.
+        """
+        return min(cap, max(limit, int(limit / max(self.selectivity, 1e-6))))
+
+
+async def plan_filtered_search(db: AsyncSession, filters: Optional[Filters]) -> Optional[SearchPlan]:
+    """
+    Choose between a pre-filtered exact scan and a filtered ANN scan
+
+    Matching rows are counted through the filter indexes, stopping one past
+    FILTER_EXACT_SCAN_MAX_ROWS. Up to that many rows an exact scan over the
+    subset is both faster and perfectly accurate; beyond it the ANN index
+    is used, with the filter evaluated during the scan.
+
+    Args:
+        db: Database session
+        filters: Filter dict
+
+    Returns:
+        The plan, or None without filters or outside PostgreSQL
+    """
+    if not normalize_filters(filters) or db.bind.dialect.name != "postgresql":
+        return None
+
+    cap = int(settings.filter_exact_scan_max_rows)
+    bounded = filtered_chunks(filters, DocumentChunk.id).limit(cap + 1).subquery()
+    matching = (await db.execute(select(func.count()).select_from(bounded))).scalar_one()
+
+    # Planner statistics are enough here; reltuples is -1 before the first ANALYZE
+    estimate = (await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'document_chunks'")
+    )).scalar()
+    total = max(int(estimate or 0), matching)
+
+    plan = SearchPlan(
+        strategy="exact" if matching <= cap else "ann",
+        matching_rows=matching,
+        total_rows=total
+    )
+    logger.debug(f"Filtered search plan: {plan.strategy} ({matching} of ~{total} rows)")
+    return plan
+
+
+def filtered_scan_settings(plan: SearchPlan, limit: int, mode: Optional[str] = None) -> List[str]:
+    """
+    SET LOCAL statements letting a filtered ANN scan find enough matching rows
+
+    Uses pgvector's iterative index scans (pgvector 0.8+), which keep scanning
+    until ``limit`` rows pass the filter. With VECTOR_ITERATIVE_SCAN=off, for
+    older versions, the scan is widened by the inverse of the selectivity.
+
+    Args:
+        plan: Plan from plan_filtered_search
+        limit: Number of results requested
+        mode: Iterative scan mode (defaults to settings.vector_iterative_scan)
+
+    Returns:
+        Statements to execute in the search transaction
+    """
+    mode = mode or settings.vector_iterative_scan
+    hnsw = settings.embedding_quantization != "none" or settings.vector_index_type == "hnsw"
+    ivfflat = not hnsw and settings.vector_index_type == "ivfflat"
+
+    if mode != "off":
+        if hnsw:
+            return [
+                f"SET LOCAL hnsw.iterative_scan = {mode}",
+                f"SET LOCAL hnsw.max_scan_tuples = {int(settings.vector_max_scan_tuples)}",
+            ]
+        if ivfflat:
+            # IVFFlat only supports relaxed ordering
+            return ["SET LOCAL ivfflat.iterative_scan = relaxed_order"]
+        return []
+
+    if hnsw:
+        ef_search = min(HNSW_MAX_EF_SEARCH, max(int(settings.hnsw_ef_search), plan.candidates(limit)))
+        return [f"SET LOCAL hnsw.ef_search = {ef_search}"]
+    if ivfflat:
+        probes = min(1000, math.ceil(int(settings.ivfflat_probes) / max(plan.selectivity, 1e-3)))
+        return [f"SET LOCAL ivfflat.probes = {probes}"]
+    return []
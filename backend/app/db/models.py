@@ -2,18 +2,36 @@
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON, Float, Boolean
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 
+from app.core.config import settings
 from .base import Base
 
 
+class Collection(Base):
+    """Named document collection (tenant namespace) with its own vector index partition"""
+    __tablename__ = "collections"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(63), nullable=False, unique=True, index=True)
+    description = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    documents = relationship("Document", back_populates="collection")
+
+
 class Document(Base):
     """Document model for storing uploaded documents"""
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
+    # Documents without a collection belong to the shared default namespace
+    collection_id = Column(Integer, ForeignKey("collections.id", ondelete="CASCADE"), nullable=True, index=True)
     filename = Column(String(255), nullable=False)
     content_type = Column(String(100), nullable=False)
     file_size = Column(Integer, nullable=False)
@@ -34,6 +52,7 @@ class Document(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
+    collection = relationship("Collection", back_populates="documents")
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
 
 
@@ -43,14 +62,17 @@ class DocumentChunk(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    # Copied from the document so each collection's partial vector index can be defined on this table
+    collection_id = Column(Integer, nullable=True, index=True)
 
     # Chunk content
     content = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)
 
-    # Embedding (768 dimensions for Gemini embedding-001)
-    # Change to 1536 for OpenAI text-embedding-3-small if needed
-    embedding = Column(Vector(768), nullable=True)
+    # Embedding size follows EMBEDDING_DIMENSION and must match the embedding provider
+    # (768 for Gemini embedding-001, 1536 for OpenAI text-embedding-3-small,
+    # 384 or 768 for common sentence-transformers models)
+    embedding = Column(Vector(settings.embedding_dimension), nullable=True)
 
     # Metadata
     chunk_metadata = Column(JSON, nullable=True)
@@ -85,6 +107,8 @@ class Conversation(Base):
 class Message(Base):
     """Individual messages in conversations"""
     __tablename__ = "messages"
+    # Serves newest-first history reads of one conversation
+    __table_args__ = (Index("ix_messages_conversation_id_id", "conversation_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
@@ -111,9 +135,12 @@ class VectorSearchCache(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    # Query
+    # Query (query_hash covers the normalized text and the search parameters,
+    # params_hash only the parameters so near-duplicate lookups stay comparable)
     query_text = Column(Text, nullable=False)
-    query_embedding = Column(Vector(1536), nullable=True)
+    query_hash = Column(String(64), nullable=False, unique=True, index=True)
+    params_hash = Column(String(64), nullable=False, index=True)
+    query_embedding = Column(Vector(settings.embedding_dimension), nullable=True)
 
     # Results
     results = Column(JSON, nullable=False)
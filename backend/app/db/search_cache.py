@@ -0,0 +1,46 @@
+"""Schema upkeep for the vector_search_cache table"""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.models import VectorSearchCache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_COLUMNS_QUERY = (
+    "SELECT column_name FROM information_schema.columns "
+    "WHERE table_schema = current_schema() AND table_name = 'vector_search_cache'"
+)
+SEARCH_CACHE_EMBEDDING_TYPE_QUERY = (
+    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+    "WHERE attrelid = to_regclass('vector_search_cache') AND attname = 'query_embedding'"
+)
+
+
+async def ensure_search_cache_table(conn: AsyncConnection) -> None:
+    """
+    Recreate vector_search_cache if it predates the current schema (PostgreSQL only)
+
+    create_all never alters an existing table, so databases created before
+    the result cache lack its NOT NULL hash columns and may have a different
+    embedding dimension, and every cache write would fail. The table only
+    holds disposable cached results, so it is dropped and rebuilt with its
+    indexes rather than migrated.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+
+    columns = set((await conn.execute(text(SEARCH_CACHE_COLUMNS_QUERY))).scalars().all())
+    if not columns:
+        return
+    embedding_type = (await conn.execute(text(SEARCH_CACHE_EMBEDDING_TYPE_QUERY))).scalar()
+
+    if {"query_hash", "params_hash"} <= columns and embedding_type == f"vector({settings.embedding_dimension})":
+        return
+
+    await conn.execute(text("DROP TABLE vector_search_cache"))
+    await conn.run_sync(VectorSearchCache.__table__.create)
+    logger.warning("Recreated vector_search_cache with the current schema; cached results were discarded")
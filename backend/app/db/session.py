@@ -54,9 +54,20 @@ async def init_db() -> None:
     from .base import Base
     from . import models  # Import models to register them
 
+    from .collections import ensure_collection_indexes
+    from .conversations import ensure_message_history_index
+    from .search_cache import ensure_search_cache_table
+    from .text_search import ensure_text_search_index
+    from .vector_indexes import ensure_vector_indexes
+
     async with engine.begin() as conn:
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_collection_indexes(conn)
+        await ensure_message_history_index(conn)
+        await ensure_search_cache_table(conn)
+        await ensure_vector_indexes(conn)
+        await ensure_text_search_index(conn)
         logger.info("Database tables created successfully")
 
 
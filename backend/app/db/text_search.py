@@ -0,0 +1,131 @@
+"""PostgreSQL full-text search over document_chunks.content"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Float, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.models import Document, DocumentChunk
+from app.db.filtered_search import filter_clauses
+
+logger = logging.getLogger(__name__)
+
+TSV_COLUMN = "content_tsv"
+TSV_INDEX_NAME = "ix_document_chunks_content_tsv"
+
+# The generated column is PostgreSQL-only, so it is referenced by name rather than mapped on the model
+content_tsv = literal_column(f"document_chunks.{TSV_COLUMN}")
+
+
+def text_search_ddl(config: Optional[str] = None) -> List[str]:
+    """
+    DDL for the generated tsvector column and its GIN index
+
+    Args:
+        config: Text search configuration (defaults to settings.text_search_config)
+
+    Returns:
+        Statements to run in order
+    """
+    config = config or settings.text_search_config
+    return [
+        (
+            f"ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS {TSV_COLUMN} tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{config}', content)) STORED"
+        ),
+        f"CREATE INDEX IF NOT EXISTS {TSV_INDEX_NAME} ON document_chunks USING gin ({TSV_COLUMN})",
+    ]
+
+
+async def ensure_text_search_index(conn: AsyncConnection) -> None:
+    """Add the tsvector column and GIN index used by lexical search (PostgreSQL only)"""
+    if conn.dialect.name != "postgresql":
+        return
+    for statement in text_search_ddl():
+        await conn.execute(text(statement))
+    logger.info(f"Ensured full-text index on document_chunks.content ({settings.text_search_config})")
+
+
+def lexical_search_query(
+    query: str,
+    limit: int,
+    filters: Optional[Dict[str, Any]] = None,
+    config: Optional[str] = None
+) -> Select:
+    """
+    Top-k full-text query ranked by ts_rank_cd
+
+    ``websearch_to_tsquery`` accepts free text (quoted phrases, ``or``,
+    ``-exclusions``) without raising on syntax errors, and the ``@@`` match
+    is served by the GIN index.
+
+    Args:
+        query: Search query text
+        limit: Maximum number of results
+        filters: Optional search filters (see app.core.search_filters)
+        config: Text search configuration (defaults to settings.text_search_config)
+
+    Returns:
+        Select yielding chunk columns, ``rank``, ``filename`` and ``title``, best first
+    """
+    config = config or settings.text_search_config
+    tsquery = func.websearch_to_tsquery(config, query)
+    rank = func.ts_rank_cd(content_tsv, tsquery, type_=Float)
+
+    return (
+        select(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.content,
+            DocumentChunk.chunk_index,
+            DocumentChunk.chunk_metadata,
+            rank.label("rank"),
+            Document.filename,
+            Document.title
+        )
+        .join(Document, Document.id == DocumentChunk.document_id)
+        .where(content_tsv.op("@@")(tsquery), *filter_clauses(filters))
+        .order_by(rank.desc())
+        .limit(limit)
+    )
+
+
+async def lexical_search(
+    db: AsyncSession,
+    query: str,
+    limit: int,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run the full-text query
+
+    Args:
+        db: Database session
+        query: Search query text
+        limit: Maximum number of results
+        filters: Optional chunk filters
+
+    Returns:
+        Result dicts with a ``rank`` instead of a similarity, best first
+        (empty outside PostgreSQL)
+    """
+    if db.bind.dialect.name != "postgresql":
+        return []
+
+    result = await db.execute(lexical_search_query(query, limit, filters))
+    return [
+        {
+            "chunk_id": row.id,
+            "document_id": row.document_id,
+            "filename": row.filename,
+            "title": row.title,
+            "content": row.content,
+            "chunk_index": row.chunk_index,
+            "rank": float(row.rank),
+            "metadata": row.chunk_metadata or {}
+        }
+        for row in result.all()
+    ]
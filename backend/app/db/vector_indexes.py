@@ -0,0 +1,399 @@
+"""pgvector index management and vector query helpers"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.types import Float, UserDefinedType
+from pgvector.sqlalchemy import Vector
+
+from app.core.config import settings
+from app.core.search_filters import needs_document_fields
+from app.db.filtered_search import HNSW_MAX_EF_SEARCH, ensure_filter_indexes, filter_clauses, filtered_chunks
+from app.db.models import Document, DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+
+class HalfVec(UserDefinedType):
+    """pgvector ``halfvec`` type (used in casts only)"""
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return f"HALFVEC({self.dim})"
+
+
+class Bit(UserDefinedType):
+    """PostgreSQL ``bit`` type (used in casts only)"""
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return f"BIT({self.dim})"
+
+
+EMBEDDING_TYPE_QUERY = (
+    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+    "WHERE attrelid = to_regclass('document_chunks') AND attname = 'embedding'"
+)
+
+QUANTIZED_INDEX_NAMES = {
+    "halfvec": "ix_document_chunks_embedding_halfvec",
+    "binary": "ix_document_chunks_embedding_bit",
+}
+
+
+def quantized_index_ddl(
+    mode: str,
+    dimension: int,
+    name: Optional[str] = None,
+    where: Optional[str] = None
+) -> Optional[str]:
+    """
+    DDL for the HNSW expression index over quantized embeddings
+
+    The compact halfvec/bit representation lives only in the index; the full
+    precision vectors stay in the table for rescoring.
+
+    Args:
+        mode: Quantization mode ("none", "halfvec" or "binary")
+        dimension: Embedding dimension
+        name: Index name (defaults to the table-wide index for the mode)
+        where: Optional predicate making this a partial index
+
+    Returns:
+        CREATE INDEX statement, or None when quantization is disabled
+    """
+    predicate = f" WHERE {where}" if where else ""
+    if mode == "halfvec":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {name or QUANTIZED_INDEX_NAMES['halfvec']} ON document_chunks "
+            f"USING hnsw ((embedding::halfvec({dimension})) halfvec_cosine_ops){predicate}"
+        )
+    if mode == "binary":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {name or QUANTIZED_INDEX_NAMES['binary']} ON document_chunks "
+            f"USING hnsw ((binary_quantize(embedding)::bit({dimension})) bit_hamming_ops){predicate}"
+        )
+    if mode == "none":
+        return None
+    raise ValueError(f"Unsupported quantization mode: {mode}")
+
+
+ANN_INDEX_NAME = "ix_document_chunks_embedding_ann"
+
+
+def recommended_ivfflat_lists(row_count: int) -> int:
+    """pgvector's guideline for IVFFlat lists: rows / 1000 up to 1M rows, sqrt(rows) above"""
+    if row_count <= 1_000_000:
+        return max(1, row_count // 1000)
+    return int(math.sqrt(row_count))
+
+
+def ann_index_ddl(
+    index_type: str,
+    lists: Optional[int] = None,
+    name: Optional[str] = None,
+    where: Optional[str] = None
+) -> Optional[str]:
+    """
+    DDL for the full-precision ANN index on document_chunks.embedding
+
+    Args:
+        index_type: "hnsw", "ivfflat" or "none"
+        lists: IVFFlat list count (defaults to settings.ivfflat_lists)
+        name: Index name (defaults to the table-wide ANN index)
+        where: Optional predicate making this a partial index
+
+    Returns:
+        CREATE INDEX statement, or None when no index is wanted
+    """
+    name = name or ANN_INDEX_NAME
+    predicate = f" WHERE {where}" if where else ""
+    if index_type == "hnsw":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {name} ON document_chunks "
+            f"USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(settings.hnsw_m)}, ef_construction = {int(settings.hnsw_ef_construction)}){predicate}"
+        )
+    if index_type == "ivfflat":
+        lists = lists or settings.ivfflat_lists or 100
+        return (
+            f"CREATE INDEX IF NOT EXISTS {name} ON document_chunks "
+            f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {int(lists)}){predicate}"
+        )
+    if index_type == "none":
+        return None
+    raise ValueError(f"Unsupported vector index type: {index_type}")
+
+
+async def ensure_quantized_index(conn: AsyncConnection) -> None:
+    """Create the quantized expression index for the configured mode"""
+    ddl = quantized_index_ddl(settings.embedding_quantization, settings.embedding_dimension)
+    if ddl:
+        await conn.execute(text(ddl))
+        logger.info(f"Ensured {settings.embedding_quantization} quantized index on document_chunks")
+
+
+async def check_embedding_column(conn: AsyncConnection) -> bool:
+    """
+    Check document_chunks.embedding has EMBEDDING_DIMENSION dimensions (PostgreSQL only)
+
+    create_all never alters an existing column, so a database created with
+    another dimension keeps it and every chunk insert fails. The stored
+    vectors cannot be converted, so this only reports the mismatch.
+
+    Returns:
+        False if the column exists with a different dimension
+    """
+    if conn.dialect.name != "postgresql":
+        return True
+
+    embedding_type = (await conn.execute(text(EMBEDDING_TYPE_QUERY))).scalar()
+    expected = f"vector({settings.embedding_dimension})"
+    if embedding_type and embedding_type != expected:
+        logger.error(
+            f"document_chunks.embedding is {embedding_type} but EMBEDDING_DIMENSION is "
+            f"{settings.embedding_dimension}; set EMBEDDING_DIMENSION to match the database "
+            f"or re-create the table and re-index the documents"
+        )
+        return False
+    return True
+
+
+async def ensure_vector_indexes(conn: AsyncConnection) -> None:
+    """
+    Create the vector index used by semantic search and the filter indexes
+
+    With quantization enabled the quantized expression index serves the
+    candidate scan, so no full-precision ANN index is built. IVFFlat lists
+    are derived from the current row count unless IVFFLAT_LISTS is set; an
+    IVFFlat index built on an empty table should be rebuilt once data is loaded.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+
+    await ensure_filter_indexes(conn)
+
+    if not await check_embedding_column(conn):
+        return
+
+    if settings.embedding_quantization != "none":
+        await ensure_quantized_index(conn)
+        return
+
+    lists = None
+    if settings.vector_index_type == "ivfflat" and not settings.ivfflat_lists:
+        row_count = (await conn.execute(text("SELECT count(*) FROM document_chunks"))).scalar()
+        lists = recommended_ivfflat_lists(row_count)
+
+    ddl = ann_index_ddl(settings.vector_index_type, lists=lists)
+    if ddl:
+        await conn.execute(text(ddl))
+        logger.info(f"Ensured {settings.vector_index_type} index on document_chunks.embedding")
+
+
+async def rebuild_vector_indexes(conn: AsyncConnection) -> None:
+    """Drop and recreate the ANN index, e.g. to re-cluster IVFFlat lists after bulk loads"""
+    if conn.dialect.name != "postgresql":
+        return
+    await conn.execute(text(f"DROP INDEX IF EXISTS {ANN_INDEX_NAME}"))
+    await ensure_vector_indexes(conn)
+
+
+async def configure_search_session(db: AsyncSession, candidates: int) -> None:
+    """
+    Apply per-query ANN search parameters for the current transaction
+
+    ``hnsw.ef_search`` also caps how many rows an HNSW scan can return, so it
+    is raised to the number of candidates requested, up to pgvector's maximum
+    of 1000 (a larger value would make the SET fail).
+
+    Args:
+        db: Database session (the settings last until the transaction ends)
+        candidates: Number of rows the index scan must produce
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+
+    quantized = settings.embedding_quantization != "none"
+    if quantized or settings.vector_index_type == "hnsw":
+        ef_search = min(HNSW_MAX_EF_SEARCH, max(int(settings.hnsw_ef_search), int(candidates)))
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+    elif settings.vector_index_type == "ivfflat":
+        await db.execute(text(f"SET LOCAL ivfflat.probes = {int(settings.ivfflat_probes)}"))
+
+
+def quantized_distance(query_embedding: List[float], mode: str, dimension: int):
+    """
+    SQL distance expression between the stored embeddings and a query in quantized space
+
+    The expression matches the index definition so pgvector can use the index.
+    """
+    # Explicit cast so overloaded functions like binary_quantize resolve
+    query = literal(query_embedding, Vector(dimension)).cast(Vector(dimension))
+    if mode == "halfvec":
+        return DocumentChunk.embedding.cast(HalfVec(dimension)).op("<=>", return_type=Float)(
+            query.cast(HalfVec(dimension))
+        )
+    if mode == "binary":
+        return func.binary_quantize(DocumentChunk.embedding).cast(Bit(dimension)).op("<~>", return_type=Float)(
+            func.binary_quantize(query).cast(Bit(dimension))
+        )
+    raise ValueError(f"Unsupported quantization mode: {mode}")
+
+
+def candidate_count(limit: int, mode: Optional[str] = None, rescore_factor: Optional[int] = None) -> int:
+    """
+    Number of rows the index scan produces for a top-``limit`` query
+
+    The rescoring pool is capped at what one HNSW scan can return, but is
+    never smaller than ``limit``.
+    """
+    mode = mode or settings.embedding_quantization
+    if mode == "none":
+        return limit
+    pool = limit * max(1, rescore_factor or settings.quantization_rescore_factor)
+    return max(limit, min(pool, HNSW_MAX_EF_SEARCH))
+
+
+def rescored_search_query(
+    query_embedding: List[float],
+    limit: int,
+    mode: Optional[str] = None,
+    rescore_factor: Optional[int] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    exact: bool = False
+) -> Select:
+    """
+    Build a top-k cosine query with optional quantized candidate generation
+
+    With quantization enabled, ``limit * rescore_factor`` candidates are taken
+    from the quantized index and only those are rescored with the full
+    precision embeddings. The embedding column itself is not selected.
+
+    With ``exact`` the filtered rows are materialized first and scanned
+    without the ANN index, which is exact and fast for selective filters.
+
+    Args:
+        query_embedding: Query embedding vector
+        limit: Number of results
+        mode: Quantization mode (defaults to settings)
+        rescore_factor: Candidate pool size as a multiple of limit (defaults to settings)
+        filters: Optional search filters (see app.core.search_filters)
+        exact: Scan the filtered rows instead of using the ANN index
+
+    Returns:
+        Select yielding chunk columns plus ``similarity``, ordered best first
+    """
+    mode = mode or settings.embedding_quantization
+
+    if exact:
+        # MATERIALIZED keeps PostgreSQL from pushing the ORDER BY into an ANN index scan
+        filtered = filtered_chunks(
+            filters,
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.content,
+            DocumentChunk.chunk_index,
+            DocumentChunk.chunk_metadata,
+            DocumentChunk.token_count,
+            DocumentChunk.embedding
+        ).cte("filtered").prefix_with("MATERIALIZED")
+        distance = filtered.c.embedding.cosine_distance(query_embedding)
+        return (
+            select(
+                filtered.c.id,
+                filtered.c.document_id,
+                filtered.c.content,
+                filtered.c.chunk_index,
+                filtered.c.chunk_metadata,
+                filtered.c.token_count,
+                (1 - distance).label("similarity")
+            )
+            .order_by(distance)
+            .limit(limit)
+        )
+
+    full_distance = DocumentChunk.embedding.cosine_distance(query_embedding)
+    clauses = filter_clauses(filters)
+
+    query = select(
+        DocumentChunk.id,
+        DocumentChunk.document_id,
+        DocumentChunk.content,
+        DocumentChunk.chunk_index,
+        DocumentChunk.chunk_metadata,
+        DocumentChunk.token_count,
+        (1 - full_distance).label("similarity")
+    )
+
+    if mode != "none":
+        candidates = (
+            select(DocumentChunk.id)
+            .where(DocumentChunk.embedding.isnot(None), *clauses)
+            .order_by(quantized_distance(query_embedding, mode, settings.embedding_dimension))
+            .limit(candidate_count(limit, mode, rescore_factor))
+        )
+        if needs_document_fields(filters):
+            candidates = candidates.join(Document, Document.id == DocumentChunk.document_id)
+        candidates = candidates.subquery()
+        query = query.join(candidates, candidates.c.id == DocumentChunk.id)
+    else:
+        query = query.where(DocumentChunk.embedding.isnot(None), *clauses)
+        if needs_document_fields(filters):
+            query = query.join(Document, Document.id == DocumentChunk.document_id)
+
+    return query.order_by(full_distance).limit(limit)
+
+
+def semantic_search_query(
+    query_embedding: List[float],
+    limit: int,
+    min_similarity: Optional[float] = None,
+    mode: Optional[str] = None,
+    rescore_factor: Optional[int] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    exact: bool = False
+) -> Select:
+    """
+    Top-k semantic search with the similarity threshold applied in SQL
+
+    The inner query is a plain ``ORDER BY distance LIMIT k`` so pgvector can
+    serve it from the ANN index; the threshold and the document join are
+    applied to those k rows only.
+
+    Args:
+        query_embedding: Query embedding vector
+        limit: Maximum number of results
+        min_similarity: Optional minimum cosine similarity
+        mode: Quantization mode (defaults to settings)
+        rescore_factor: Candidate pool size as a multiple of limit (defaults to settings)
+        filters: Optional search filters (see app.core.search_filters)
+        exact: Scan the filtered rows instead of using the ANN index
+
+    Returns:
+        Select yielding chunk columns, ``similarity``, ``filename`` and ``title``
+    """
+    top_k = rescored_search_query(
+        query_embedding, limit, mode, rescore_factor, filters, exact
+    ).subquery("top_k")
+
+    query = (
+        select(top_k, Document.filename, Document.title)
+        .join(Document, Document.id == top_k.c.document_id)
+        .order_by(top_k.c.similarity.desc())
+    )
+    if min_similarity is not None:
+        query = query.where(top_k.c.similarity >= min_similarity)
+    return query
@@ -10,7 +10,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.notion import notion
 from app.core.llm import llm_manager
-from app.api.v1 import health, chat, documents, workflows
+from app.core.embeddings import embeddings_service
+from app.db.session import AsyncSessionLocal
+from app.services.memory_index import memory_index
+from app.services.search_cache import search_cache
+from app.services.vector_store import get_vector_store, load_document_chunks
+from app.api.v1 import health, chat, collections, conversations, documents, workflows
 from app.api import voice
 
 # Configure logging
@@ -29,9 +34,33 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Notion integration: {'enabled' if notion.is_enabled() else 'disabled'}")
     logger.info(f"LLM provider: {'enabled' if llm_manager.is_available() else 'disabled'}")
+    try:
+        await embeddings_service.check_dimension()
+    except Exception as e:
+        logger.error(f"Failed to determine embedding dimension: {e}")
+    if settings.memory_index_enabled:
+        try:
+            async with AsyncSessionLocal() as db:
+                await memory_index.load(db)
+        except Exception as e:
+            logger.error(f"Failed to load in-memory vector index, searching with pgvector: {e}")
+    if settings.vector_db_type == "memory":
+        # The NumPy store is not persisted, so it is rebuilt from document_chunks
+        try:
+            async with AsyncSessionLocal() as db:
+                loaded = await load_document_chunks(get_vector_store(), db)
+            logger.info(f"Loaded {loaded} chunks into the memory vector store")
+        except Exception as e:
+            logger.error(f"Failed to load memory vector store: {e}")
+    if settings.search_cache_enabled:
+        search_cache.start()
     yield
     # Shutdown
     logger.info("Shutting down application")
+    if settings.search_cache_enabled:
+        await search_cache.close()
+    embeddings_service.close()
+    get_vector_store().close()
 
 
 # Create FastAPI application
@@ -53,7 +82,9 @@ app.add_middleware(
 # Register routers
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
+app.include_router(conversations.router, prefix="/api/v1", tags=["conversations"])
 app.include_router(documents.router, prefix="/api/v1", tags=["documents"])
+app.include_router(collections.router, prefix="/api/v1", tags=["collections"])
 app.include_router(voice.router, prefix="/api/v1", tags=["voice"])
 app.include_router(workflows.router, prefix="/api/v1", tags=["workflows"])
 
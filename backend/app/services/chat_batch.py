@@ -0,0 +1,68 @@
+"""Bounded-concurrency fan-out of independent chat prompts"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.llm import LLMManager, llm_manager
+
+logger = logging.getLogger(__name__)
+
+
+async def run_chat_batch(
+    items: List[Dict[str, Any]],
+    concurrency: int,
+    llm: Optional[LLMManager] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run chat prompts through the LLM manager, yielding results as they finish
+
+    A fixed pool of workers pulls items from a queue, so at most
+    `concurrency` prompts of this batch are in flight however large it is,
+    and a slow item only holds up its own worker. Provider-wide throttling
+    still applies through the shared rate limiter. A failed item is reported
+    with its error and does not affect the rest. Closing the iterator early
+    cancels the outstanding work.
+
+    Args:
+        items: LLMManager.generate keyword arguments per prompt
+        concurrency: Maximum prompts in flight
+        llm: LLM manager (defaults to the global instance)
+
+    Yields:
+        Dicts with index, answer, tokens_used, error and elapsed_ms, in completion order
+    """
+    llm = llm or llm_manager
+    pending: asyncio.Queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        pending.put_nowait((index, item))
+    finished: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            start = time.perf_counter()
+            result: Dict[str, Any] = {"index": index, "answer": None, "tokens_used": None, "error": None}
+            try:
+                generated = await llm.generate_with_usage(**item)
+                result["answer"] = generated.text
+                result["tokens_used"] = generated.completion_tokens
+            except Exception as e:
+                logger.warning(f"Batch chat item {index} failed: {e}")
+                result["error"] = str(e)
+            result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            finished.put_nowait(result)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(max(1, concurrency), len(items)))]
+    try:
+        for _ in range(len(items)):
+            yield await finished.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
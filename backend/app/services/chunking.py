@@ -5,7 +5,7 @@ import re
 from typing import List, Optional
 from dataclasses import dataclass
 
-import tiktoken
+from app.core.tokenizer import tokenizer_service
 
 logger = logging.getLogger(__name__)
 
@@ -41,12 +41,8 @@ class ChunkingService:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.model_name = model_name
-
-        try:
-            self.tokenizer = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            logger.warning(f"Model {model_name} not found, using cl100k_base encoding")
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        # Shared with every other tokenizer user, so building a chunker is cheap
+        self.tokenizer = tokenizer_service.get_encoding(model_name)
 
     def count_tokens(self, text: str) -> int:
         """
@@ -58,7 +54,7 @@ class ChunkingService:
         Returns:
             Number of tokens
         """
-        return len(self.tokenizer.encode(text))
+        return tokenizer_service.count(text, self.model_name)
 
     def _split_by_sentences(self, text: str) -> List[str]:
         """
@@ -130,8 +126,11 @@ class ChunkingService:
         current_start_char = 0
         chunk_index = 0
 
-        for segment in segments:
-            segment_tokens = self.count_tokens(segment)
+        # One batch encode for all segments instead of one call per segment
+        segment_counts = tokenizer_service.count_many(segments, self.model_name)
+        previous_tokens = 0
+
+        for segment, segment_tokens in zip(segments, segment_counts):
 
             # If single segment exceeds chunk_size, split it further
             if segment_tokens > self.chunk_size:
@@ -151,10 +150,10 @@ class ChunkingService:
                     current_tokens = 0
 
                 # Split large segment by tokens
-                tokens = self.tokenizer.encode(segment)
+                tokens = tokenizer_service.encode(segment, self.model_name)
                 for i in range(0, len(tokens), self.chunk_size - self.chunk_overlap):
                     chunk_tokens = tokens[i:i + self.chunk_size]
-                    chunk_text = self.tokenizer.decode(chunk_tokens)
+                    chunk_text = tokenizer_service.decode(chunk_tokens, self.model_name)
 
                     chunks.append(TextChunk(
                         content=chunk_text,
@@ -190,9 +189,8 @@ class ChunkingService:
                     # Keep overlap
                     if self.chunk_overlap > 0 and len(current_chunk) > 1:
                         overlap_text = current_chunk[-1]
-                        overlap_tokens = self.count_tokens(overlap_text)
                         current_chunk = [overlap_text]
-                        current_tokens = overlap_tokens
+                        current_tokens = previous_tokens
                         current_start_char += len(chunk_text) - len(overlap_text)
                     else:
                         current_chunk = []
@@ -203,6 +201,8 @@ class ChunkingService:
                 current_chunk.append(segment)
                 current_tokens += segment_tokens
 
+            previous_tokens = segment_tokens
+
         # Add remaining chunk
         if current_chunk:
             chunk_text = " ".join(current_chunk)
@@ -0,0 +1,197 @@
+"""Document collections: tenant namespaces with their own vector index partition"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.collections import build_collection_index, remove_collection_index
+from app.db.models import Collection, Document, DocumentChunk
+from app.services.indexing_service import IndexingService, indexing_service
+
+logger = logging.getLogger(__name__)
+
+# Lowercase so names map one-to-one onto URL path segments
+COLLECTION_NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+
+class CollectionNotFoundError(LookupError):
+    """Raised when a collection name does not exist"""
+
+
+class CollectionExistsError(ValueError):
+    """Raised when a collection name is already taken"""
+
+
+class CollectionService:
+    """Create, list and drop collections together with their vector indexes"""
+
+    def __init__(self, indexing: Optional[IndexingService] = None):
+        """
+        Initialize collection service
+
+        Args:
+            indexing: Indexing service whose vector store, in-memory index and
+                search cache are kept in sync (defaults to the global instance)
+        """
+        self.indexing_service = indexing or indexing_service
+
+    async def get_by_name(self, db: AsyncSession, name: str) -> Optional[Collection]:
+        """Look up a collection by name"""
+        result = await db.execute(select(Collection).where(Collection.name == name))
+        return result.scalar_one_or_none()
+
+    async def scope_filters(
+        self,
+        db: AsyncSession,
+        collection: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Scope a search filter dict to a collection by name
+
+        Args:
+            db: Database session
+            collection: Collection name, or None to search every collection
+            filters: Filter dict for IndexingService.search_documents, or None
+
+        Returns:
+            Filter dict with collection_id set when a collection was given, or None
+
+        Raises:
+            CollectionNotFoundError: If the collection does not exist
+        """
+        result = dict(filters or {})
+        if collection:
+            found = await self.get_by_name(db, collection)
+            if not found:
+                raise CollectionNotFoundError(f"Collection {collection} not found")
+            result["collection_id"] = found.id
+        return result or None
+
+    async def create(self, db: AsyncSession, name: str, description: Optional[str] = None) -> Collection:
+        """
+        Create a collection and its partial vector index
+
+        The collection is committed first, then the index is built with
+        CREATE INDEX CONCURRENTLY. The build still scans all of
+        document_chunks, but uploads and searches keep running meanwhile.
+        If it fails the collection stays usable (searches fall back to the
+        table-wide index) and the index is rebuilt on the next start-up.
+
+        Args:
+            db: Database session
+            name: Collection name (lowercase letters, digits, "_" and "-")
+            description: Optional description
+
+        Returns:
+            The new collection
+
+        Raises:
+            ValueError: If the name is invalid
+            CollectionExistsError: If the name is already taken
+        """
+        if not COLLECTION_NAME_PATTERN.match(name):
+            raise ValueError(
+                "Collection name must be 1-63 lowercase letters, digits, '_' or '-', starting with a letter or digit"
+            )
+        if await self.get_by_name(db, name):
+            raise CollectionExistsError(f"Collection {name} already exists")
+
+        collection = Collection(name=name, description=description)
+        db.add(collection)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent create of the same name
+            await db.rollback()
+            raise CollectionExistsError(f"Collection {name} already exists")
+        await db.refresh(collection)
+
+        try:
+            await build_collection_index(db.bind, collection.id)
+        except Exception as e:
+            logger.error(f"Failed to build vector index for collection {collection.id}: {e}")
+
+        logger.info(f"Created collection {collection.id}: {name}")
+        return collection
+
+    async def list(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        """
+        List collections with their document and chunk counts
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dicts with id, name, description, created_at, documents and chunks
+        """
+        documents = dict((await db.execute(
+            select(Document.collection_id, func.count(Document.id))
+            .where(Document.collection_id.isnot(None))
+            .group_by(Document.collection_id)
+        )).all())
+        chunks = dict((await db.execute(
+            select(DocumentChunk.collection_id, func.count(DocumentChunk.id))
+            .where(DocumentChunk.collection_id.isnot(None))
+            .group_by(DocumentChunk.collection_id)
+        )).all())
+
+        result = await db.execute(select(Collection).order_by(Collection.name))
+        return [
+            {
+                "id": collection.id,
+                "name": collection.name,
+                "description": collection.description,
+                "created_at": collection.created_at,
+                "documents": documents.get(collection.id, 0),
+                "chunks": chunks.get(collection.id, 0),
+            }
+            for collection in result.scalars().all()
+        ]
+
+    async def delete(self, db: AsyncSession, collection: Collection) -> Dict[str, int]:
+        """
+        Drop a collection with its documents, chunks and vector index
+
+        The partial index is dropped first, concurrently and outside the
+        delete transaction, so deleting the rows does not pay for index
+        maintenance and other collections' searches and uploads are not
+        blocked while a large collection goes away.
+
+        Args:
+            db: Database session
+            collection: Collection to drop
+
+        Returns:
+            Dict with the number of documents and chunks removed
+        """
+        collection_id = collection.id
+        document_ids = (await db.execute(
+            select(Document.id).where(Document.collection_id == collection_id)
+        )).scalars().all()
+
+        await remove_collection_index(db.bind, collection_id)
+        chunks = await db.execute(delete(DocumentChunk).where(DocumentChunk.collection_id == collection_id))
+        await db.execute(delete(Document).where(Document.collection_id == collection_id))
+        await db.execute(delete(Collection).where(Collection.id == collection_id))
+        await db.commit()
+
+        service = self.indexing_service
+        if service.memory_index:
+            for document_id in document_ids:
+                service.memory_index.remove_document(document_id)
+        if not service.vector_store.uses_document_chunks:
+            await service.vector_store.delete_collection(collection_id)
+        if service.search_cache:
+            await service.search_cache.invalidate()
+
+        logger.info(f"Dropped collection {collection_id} with {len(document_ids)} documents")
+        return {"documents": len(document_ids), "chunks": chunks.rowcount or 0}
+
+
+# Global instance
+collection_service = CollectionService()
@@ -0,0 +1,185 @@
+"""Conversation-aware chat with server-side, token-budgeted history"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.llm import LLMManager, llm_manager
+from app.db.conversations import MESSAGE_TOKEN_OVERHEAD, context_window_query
+from app.db.models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationService:
+    """Store chat turns and rebuild the context window from them"""
+
+    def __init__(self, llm: Optional[LLMManager] = None):
+        """
+        Initialize conversation service
+
+        Args:
+            llm: LLM manager used for generation and token counting (defaults to the global instance)
+        """
+        self.llm = llm or llm_manager
+
+    async def create(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        user_id: Optional[str] = None,
+        title: Optional[str] = None
+    ) -> Conversation:
+        """Create an empty conversation"""
+        conversation = Conversation(session_id=session_id, user_id=user_id, title=title)
+        db.add(conversation)
+        await db.commit()
+        await db.refresh(conversation)
+        return conversation
+
+    async def get(self, db: AsyncSession, conversation_id: int) -> Optional[Conversation]:
+        """Look up a conversation by id"""
+        return await db.get(Conversation, conversation_id)
+
+    async def delete(self, db: AsyncSession, conversation: Conversation) -> int:
+        """
+        Delete a conversation and its messages
+
+        Returns:
+            Number of messages removed
+        """
+        result = await db.execute(delete(Message).where(Message.conversation_id == conversation.id))
+        await db.execute(delete(Conversation).where(Conversation.id == conversation.id))
+        await db.commit()
+        return result.rowcount or 0
+
+    async def get_messages(
+        self,
+        db: AsyncSession,
+        conversation_id: int,
+        limit: int = 50,
+        before_id: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Page through a conversation's messages, newest page first
+
+        Args:
+            db: Database session
+            conversation_id: Conversation id
+            limit: Maximum messages returned
+            before_id: Only messages older than this id
+
+        Returns:
+            Messages oldest first
+        """
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if before_id is not None:
+            query = query.where(Message.id < before_id)
+        result = await db.execute(query.order_by(Message.id.desc()).limit(limit))
+        return list(reversed(result.scalars().all()))
+
+    async def load_context(
+        self,
+        db: AsyncSession,
+        conversation_id: int,
+        budget: int,
+        max_messages: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest turns of a conversation that fit a token budget
+
+        Args:
+            db: Database session
+            conversation_id: Conversation id
+            budget: Token budget for the history
+            max_messages: Upper bound on turns considered (defaults to settings)
+
+        Returns:
+            Dicts with role, content and tokens, oldest first
+        """
+        if budget <= 0:
+            return []
+        query = context_window_query(conversation_id, budget, max_messages or settings.conversation_max_messages)
+        result = await db.execute(query)
+        return [
+            {"role": row.role, "content": row.content, "tokens": int(row.tokens)}
+            for row in result.all()
+        ]
+
+    async def chat(
+        self,
+        db: AsyncSession,
+        conversation: Conversation,
+        message: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        context_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Answer a message in the context of a conversation and store both turns
+
+        History is filled newest-first with whatever budget is left after the
+        system prompt and the new message. Turns are only stored once the LLM
+        has answered, so a failed generation leaves the conversation unchanged.
+
+        Args:
+            db: Database session
+            conversation: Conversation to continue
+            message: New user message
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            context_tokens: Token budget for system prompt, history and message (defaults to settings)
+
+        Returns:
+            Dict with answer, tokens_used, context_messages and context_tokens
+        """
+        budget = context_tokens or settings.conversation_context_tokens
+        counts = await self.llm.count_tokens_many([message] + ([system_prompt] if system_prompt else []))
+        message_tokens = counts[0]
+        fixed_tokens = sum(counts) + MESSAGE_TOKEN_OVERHEAD * len(counts)
+
+        history = await self.load_context(db, conversation.id, budget - fixed_tokens)
+
+        # The answer's count comes from the provider's usage report, not a re-encode
+        result = await self.llm.generate_with_usage(
+            prompt=message,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            history=[{"role": turn["role"], "content": turn["content"]} for turn in history]
+        )
+        answer, answer_tokens = result.text, result.completion_tokens
+
+        db.add_all([
+            Message(conversation_id=conversation.id, role="user", content=message, tokens_used=message_tokens),
+            Message(
+                conversation_id=conversation.id,
+                role="assistant",
+                content=answer,
+                tokens_used=answer_tokens,
+                model=settings.llm_model
+            ),
+        ])
+        if not conversation.title:
+            conversation.title = message[:100]
+        conversation.updated_at = datetime.utcnow()
+        await db.commit()
+
+        used_tokens = sum(turn["tokens"] for turn in history) + fixed_tokens
+        logger.info(f"Conversation {conversation.id}: {len(history)} history turns, {used_tokens} context tokens")
+        return {
+            "answer": answer,
+            "tokens_used": answer_tokens,
+            "context_messages": len(history),
+            "context_tokens": used_tokens,
+        }
+
+
+# Global instance
+conversation_service = ConversationService()
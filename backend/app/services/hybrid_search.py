@@ -0,0 +1,77 @@
+"""Rank fusion and per-leg latency budgets for hybrid lexical + vector search"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, List[Dict[str, Any]]],
+    limit: int,
+    k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion
+
+    Each result scores ``sum(1 / (k + rank))`` over the lists it appears in
+    (rank starting at 1), so agreement between lists outweighs a high
+    position in just one. Raw scores are never compared across lists, which
+    is what makes ts_rank and cosine similarity fusable.
+
+    Args:
+        ranked_lists: Leg name to results (best first), identified by ``chunk_id``
+        limit: Number of fused results
+        k: Damping constant; larger values flatten the rank contribution
+
+    Returns:
+        Fused results, best first, each with ``score`` (the RRF score),
+        ``matched_by`` (leg names) and ``similarity`` (None when only the
+        lexical leg matched)
+    """
+    fused: Dict[int, Dict[str, Any]] = {}
+    for name, results in ranked_lists.items():
+        for rank, result in enumerate(results, start=1):
+            entry = fused.get(result["chunk_id"])
+            if entry is None:
+                entry = fused[result["chunk_id"]] = {
+                    **result,
+                    "similarity": result.get("similarity"),
+                    "score": 0.0,
+                    "matched_by": [],
+                }
+                entry.pop("rank", None)
+            elif entry["similarity"] is None and result.get("similarity") is not None:
+                entry["similarity"] = result["similarity"]
+            entry["score"] += 1.0 / (k + rank)
+            entry["matched_by"].append(name)
+
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:limit]
+
+
+async def run_with_budget(
+    name: str,
+    search: Awaitable[List[Dict[str, Any]]],
+    timeout_ms: float
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Await one search leg within its latency budget
+
+    Args:
+        name: Leg name for logging
+        search: Search coroutine
+        timeout_ms: Budget in milliseconds (0 = no budget)
+
+    Returns:
+        The leg's results, or None if it timed out or failed
+    """
+    try:
+        if timeout_ms > 0:
+            return await asyncio.wait_for(search, timeout=timeout_ms / 1000)
+        return await search
+    except asyncio.TimeoutError:
+        logger.warning(f"Hybrid search {name} leg exceeded its {timeout_ms:.0f}ms budget")
+    except Exception as e:
+        logger.warning(f"Hybrid search {name} leg failed: {e}")
+    return None
@@ -1,16 +1,28 @@
 """Document indexing service for vector database"""
 
+import asyncio
 import logging
+import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Document, DocumentChunk
+from app.db.session import AsyncSessionLocal
+from app.db.text_search import lexical_search
 from app.services.text_extraction import TextExtractionService
 from app.services.chunking import ChunkingService, TextChunk
-from app.core.embeddings import EmbeddingsService
+from app.services.hybrid_search import reciprocal_rank_fusion, run_with_budget
+from app.services.memory_index import MemoryVectorIndex, memory_index
+from app.services.search_cache import SearchResultCache, search_cache
+from app.services.vector_store import VectorRecord, VectorStore, get_vector_store
+from app.services.vector_store.pgvector import search_chunks
+from app.core.config import settings
+from app.core.search_filters import normalize_filters
+from app.core.similarity import mmr_select
+from app.core.embeddings import EmbeddingsService, embeddings_service
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +34,11 @@ class IndexingService:
         self,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
-        embedding_model: str = "text-embedding-3-small"
+        embedding_model: str = "text-embedding-3-small",
+        embeddings: Optional[EmbeddingsService] = None,
+        vector_index: Optional[MemoryVectorIndex] = None,
+        result_cache: Optional[SearchResultCache] = None,
+        store: Optional[VectorStore] = None
     ):
         """
         Initialize indexing service
@@ -31,10 +47,24 @@ class IndexingService:
             chunk_size: Target size of each chunk in tokens
             chunk_overlap: Number of overlapping tokens between chunks
             embedding_model: Model to use for embeddings
+            embeddings: Embeddings service (defaults to the shared instance)
+            vector_index: In-memory vector index to keep in sync and search
+                (defaults to the shared instance when MEMORY_INDEX_ENABLED is set)
+            result_cache: Search result cache for database searches
+                (defaults to the shared instance when SEARCH_CACHE_ENABLED is set)
+            store: Vector store searched and kept in sync (defaults to the
+                backend selected by VECTOR_DB_TYPE)
         """
         self.text_extractor = TextExtractionService()
         self.chunker = ChunkingService(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        self.embeddings_service = EmbeddingsService()
+        self.embeddings_service = embeddings or embeddings_service
+        if vector_index is None and settings.memory_index_enabled:
+            vector_index = memory_index
+        self.memory_index = vector_index
+        if result_cache is None and settings.search_cache_enabled:
+            result_cache = search_cache
+        self.search_cache = result_cache
+        self.vector_store = store or get_vector_store()
 
     async def process_and_index_document(
         self,
@@ -122,7 +152,10 @@ class IndexingService:
                 chunk_texts = [chunk.content for chunk in chunks]
                 logger.info(f"Generating embeddings for {len(chunk_texts)} chunks...")
 
-                embeddings = await self.embeddings_service.generate_embeddings_batch(chunk_texts)
+                embeddings = await self.embeddings_service.generate_embeddings_batch(
+                    chunk_texts,
+                    token_counts=[chunk.token_count for chunk in chunks]
+                )
 
                 logger.info(f"Successfully generated {len(embeddings)} embeddings")
 
@@ -139,9 +172,11 @@ class IndexingService:
 
             # Step 4: Save chunks to database
             try:
+                db_chunks = []
                 for chunk, embedding in zip(chunks, embeddings):
                     db_chunk = DocumentChunk(
                         document_id=document_id,
+                        collection_id=document.collection_id,
                         content=chunk.content,
                         chunk_index=chunk.index,
                         embedding=embedding,
@@ -154,6 +189,19 @@ class IndexingService:
                         token_count=chunk.token_count
                     )
                     db.add(db_chunk)
+                    db_chunks.append(db_chunk)
+
+                # Stores outside document_chunks need the chunk ids assigned by the flush
+                records = []
+                if not self.vector_store.uses_document_chunks:
+                    await db.flush()
+                    records = [VectorRecord.from_chunk(db_chunk, document) for db_chunk in db_chunks
+                               if db_chunk.embedding is not None]
+
+                # Commit before upserting, so the store never holds chunks whose insert was rolled back
+                await db.commit()
+                if records:
+                    await self.vector_store.upsert(records)
 
                 # Update document status
                 document.status = "completed"
@@ -161,6 +209,12 @@ class IndexingService:
 
                 await db.commit()
 
+                if self.memory_index:
+                    # Also while the index is still loading, so the document is not missed
+                    await asyncio.to_thread(self.memory_index.add_chunks, db_chunks, document)
+                if self.search_cache:
+                    await self.search_cache.invalidate()
+
                 logger.info(f"Successfully indexed document {document_id} with {len(chunks)} chunks")
 
                 return {
@@ -213,6 +267,13 @@ class IndexingService:
 
             await db.commit()
 
+            if self.memory_index:
+                self.memory_index.remove_document(document_id)
+            if not self.vector_store.uses_document_chunks:
+                await self.vector_store.delete_document(document_id)
+            if self.search_cache:
+                await self.search_cache.invalidate()
+
             logger.info(f"Deleted existing chunks for document {document_id}")
 
             # Re-process (need file content - this is a limitation)
@@ -223,6 +284,294 @@ class IndexingService:
             logger.error(f"Failed to re-index document {document_id}: {e}")
             raise
 
+    async def search_documents(
+        self,
+        query: str,
+        limit: int = 5,
+        min_similarity: Optional[float] = None,
+        db: Optional[AsyncSession] = None,
+        mode: str = "vector",
+        filters: Optional[Dict[str, Any]] = None,
+        diversify: bool = False,
+        mmr_lambda: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Semantic search over indexed document chunks
+
+        Served from the in-memory HNSW index when it is enabled and loaded,
+        otherwise by the configured vector store (for pgvector, a top-k cosine
+        query on document_chunks.embedding with the limit and similarity
+        threshold applied in SQL). Vector store searches go through the
+        search result cache when it is enabled.
+
+        In ``hybrid`` mode a full-text query runs concurrently with the vector
+        search and the two rankings are merged with reciprocal rank fusion.
+
+        Filtered searches bypass the in-memory index, which cannot filter;
+        the pgvector store picks a pre-filtered exact scan or a filtered ANN
+        scan depending on how many chunks match.
+
+        With ``diversify`` a larger candidate pool is fetched and reranked
+        with maximal marginal relevance, so near-duplicate chunks do not
+        crowd out the rest of the results.
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results
+            min_similarity: Optional minimum cosine similarity (-1 to 1),
+                applied to the vector results
+            db: Database session (a new session is opened when omitted)
+            mode: "vector" or "hybrid"
+            filters: Optional filters on collection_id, document_id, tags, language,
+                content_type and chunk metadata (see app.core.search_filters)
+            diversify: Rerank a larger candidate pool with MMR
+            mmr_lambda: MMR trade-off from 0 (diversity) to 1 (relevance),
+                defaults to settings.mmr_lambda
+
+        Returns:
+            List of matching chunks with document info and similarity, best first
+            (hybrid results also carry ``score`` and ``matched_by``)
+
+        Raises:
+            ValueError: If the query is empty, limit is not positive, the mode
+                is unknown, the filters are invalid or mmr_lambda is out of range
+            Exception: If embedding generation or the query fails
+        """
+        if not query or not query.strip():
+            raise ValueError("Search query cannot be empty")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if mode not in ("vector", "hybrid"):
+            raise ValueError("mode must be one of: vector, hybrid")
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError("mmr_lambda must be between 0 and 1")
+        filters = normalize_filters(filters)
+
+        start_time = time.perf_counter()
+
+        if diversify:
+            return await self._search_diversified(
+                query, limit, min_similarity, db, mode, filters,
+                settings.mmr_lambda if mmr_lambda is None else mmr_lambda, start_time
+            )
+
+        if mode == "hybrid":
+            return await self._search_hybrid(query, limit, min_similarity, filters, start_time)
+
+        if self.memory_index and self.memory_index.ready and not filters:
+            query_embedding = await self.embeddings_service.generate_embedding(query)
+            results = self.memory_index.search(query_embedding, limit=limit, min_similarity=min_similarity)
+            logger.info(
+                f"In-memory search returned {len(results)} chunks in "
+                f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+            )
+            return results
+
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                return await self._search_cached(session, query, limit, min_similarity, filters, start_time)
+        return await self._search_cached(db, query, limit, min_similarity, filters, start_time)
+
+    async def _search_diversified(
+        self,
+        query: str,
+        limit: int,
+        min_similarity: Optional[float],
+        db: Optional[AsyncSession],
+        mode: str,
+        filters: Dict[str, Any],
+        lambda_mult: float,
+        start_time: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a candidate pool and select a diverse top-k with MMR
+
+        Relevance is the cosine similarity in vector mode and the fused score,
+        scaled to a maximum of 1, in hybrid mode. Candidate embeddings come
+        from the vector store in one lookup.
+        """
+        pool = max(limit, min(limit * max(1, settings.mmr_candidate_factor), settings.mmr_max_candidates))
+        candidates = await self.search_documents(
+            query, limit=pool, min_similarity=min_similarity, db=db, mode=mode, filters=filters
+        )
+        if len(candidates) <= limit:
+            return candidates
+
+        if mode == "hybrid":
+            top_score = max(candidate["score"] for candidate in candidates) or 1.0
+            relevance = [candidate["score"] / top_score for candidate in candidates]
+        else:
+            relevance = [candidate["similarity"] for candidate in candidates]
+
+        embeddings = await self.vector_store.get_embeddings([candidate["chunk_id"] for candidate in candidates])
+        missing = [0.0] * settings.embedding_dimension
+        selected = mmr_select(
+            relevance,
+            [embeddings.get(candidate["chunk_id"], missing) for candidate in candidates],
+            limit,
+            lambda_mult
+        )
+
+        logger.info(
+            f"Diversified search picked {len(selected)} of {len(candidates)} candidates in "
+            f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return [candidates[idx] for idx in selected]
+
+    async def _search_hybrid(
+        self,
+        query: str,
+        limit: int,
+        min_similarity: Optional[float],
+        filters: Dict[str, Any],
+        start_time: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the vector and full-text legs concurrently and fuse their rankings
+
+        Each leg gets its own session and latency budget; a leg that times out
+        or fails is dropped and the other leg's ranking is returned alone.
+        """
+        candidates = limit * max(1, settings.hybrid_candidate_factor)
+        vector_results, lexical_results = await asyncio.gather(
+            run_with_budget(
+                "vector",
+                self.search_documents(query, limit=candidates, min_similarity=min_similarity, filters=filters),
+                settings.hybrid_vector_timeout_ms
+            ),
+            run_with_budget(
+                "lexical",
+                self._search_lexical(query, candidates, filters),
+                settings.hybrid_lexical_timeout_ms
+            )
+        )
+
+        ranked = {
+            name: results
+            for name, results in (("vector", vector_results), ("lexical", lexical_results))
+            if results is not None
+        }
+        if not ranked:
+            raise Exception("Document search failed: no hybrid search leg finished within its budget")
+
+        results = reciprocal_rank_fusion(ranked, limit=limit, k=settings.hybrid_rrf_k)
+        logger.info(
+            f"Hybrid search returned {len(results)} chunks from {', '.join(ranked)} in "
+            f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return results
+
+    async def _search_lexical(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Full-text leg of hybrid search, in its own session"""
+        async with AsyncSessionLocal() as session:
+            # Stop the query server-side too when it overruns the leg's budget
+            if session.bind.dialect.name == "postgresql" and settings.hybrid_lexical_timeout_ms > 0:
+                await session.execute(
+                    text(f"SET LOCAL statement_timeout = {int(settings.hybrid_lexical_timeout_ms)}")
+                )
+            return await lexical_search(session, query, limit, filters)
+
+    async def _search_cached(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        min_similarity: Optional[float],
+        filters: Dict[str, Any],
+        start_time: float
+    ) -> List[Dict[str, Any]]:
+        """Answer from the search cache when possible, otherwise search and cache the results"""
+        cache = self.search_cache
+        if cache is None:
+            query_embedding = await self.embeddings_service.generate_embedding(query)
+            return await self._search_store(db, query_embedding, limit, min_similarity, filters, start_time)
+
+        params_hash = cache.params_hash(limit, min_similarity, filters)
+        generation = cache.generation
+
+        # Exact repeats are answered before the query is embedded
+        results = await cache.get(db, query, params_hash)
+        if results is None:
+            query_embedding = await self.embeddings_service.generate_embedding(query)
+            results = await cache.get_similar(db, query_embedding, params_hash)
+            if results is None:
+                results = await self._search_store(db, query_embedding, limit, min_similarity, filters, start_time)
+                await cache.set(
+                    query, params_hash, query_embedding, results,
+                    (time.perf_counter() - start_time) * 1000, generation
+                )
+                return results
+
+        logger.info(
+            f"Search cache hit with {len(results)} chunks in "
+            f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return results
+
+    async def _search_store(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        limit: int,
+        min_similarity: Optional[float],
+        filters: Dict[str, Any],
+        start_time: float
+    ) -> List[Dict[str, Any]]:
+        """Run the top-k query on the vector store (pgvector reuses the caller's session)"""
+        try:
+            if self.vector_store.uses_document_chunks:
+                results = await search_chunks(db, query_embedding, limit, min_similarity, filters)
+            else:
+                results = await self.vector_store.search(
+                    query_embedding, limit=limit, min_similarity=min_similarity, filters=filters
+                )
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            raise Exception(f"Document search failed: {str(e)}")
+
+        logger.info(
+            f"Search returned {len(results)} chunks from {self.vector_store.name} in "
+            f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return results
+
+    async def delete_document(self, db: AsyncSession, document_id: int) -> Optional[Document]:
+        """
+        Delete a document with its chunks and drop them from the in-memory index
+
+        Args:
+            db: Database session
+            document_id: ID of the document to delete
+
+        Returns:
+            The deleted document, or None if it does not exist
+        """
+        result = await db.execute(
+            select(Document).where(Document.id == document_id)
+        )
+        document = result.scalar_one_or_none()
+
+        if not document:
+            return None
+
+        await db.delete(document)
+        await db.commit()
+
+        if self.memory_index:
+            removed = self.memory_index.remove_document(document_id)
+            logger.debug(f"Removed {removed} chunks of document {document_id} from the in-memory index")
+        if not self.vector_store.uses_document_chunks:
+            await self.vector_store.delete_document(document_id)
+        if self.search_cache:
+            await self.search_cache.invalidate()
+
+        return document
+
     async def get_indexing_stats(self, db: AsyncSession) -> Dict[str, Any]:
         """
         Get statistics about indexed documents
@@ -256,3 +605,7 @@ class IndexingService:
         except Exception as e:
             logger.error(f"Failed to get indexing stats: {e}")
             raise
+
+
+# Global instance
+indexing_service = IndexingService()
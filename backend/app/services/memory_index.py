@@ -0,0 +1,211 @@
+"""In-memory HNSW copy of document_chunks for database-free semantic search"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.hnsw_index import HNSWIndex
+from app.db.models import Document, DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryVectorIndex:
+    """
+    HNSW index over chunk embeddings plus the chunk payloads needed for results
+
+    Built from document_chunks at startup and kept in sync by IndexingService:
+    new chunks are inserted as they are written and deleted documents are
+    tombstoned. Searches are answered without touching the database.
+
+    Writes are applied while the startup load is still running too, so
+    documents uploaded meanwhile are searchable once the index is ready;
+    documents deleted meanwhile are skipped by the rest of the load.
+    """
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        capacity: Optional[int] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ):
+        """
+        Initialize memory index (the HNSW graph is created on first use)
+
+        Args:
+            dimension: Embedding dimension (defaults to settings)
+            capacity: Initial number of slots (defaults to settings)
+            m: HNSW out-degree (defaults to settings)
+            ef_construction: Insert-time candidate list size (defaults to settings)
+            ef_search: Query-time candidate list size (defaults to settings)
+        """
+        self.dimension = dimension or settings.embedding_dimension
+        self.capacity = capacity or settings.memory_index_capacity
+        self.m = m or settings.memory_index_m
+        self.ef_construction = ef_construction or settings.memory_index_ef_construction
+        self.ef_search = ef_search or settings.memory_index_ef_search
+
+        self.ready = False
+        self._loading = False
+        self._removed_during_load: Set[int] = set()
+        self._index: Optional[HNSWIndex] = None
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._document_chunks: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> HNSWIndex:
+        if self._index is None:
+            # Uploads and the startup load may both insert first from worker threads
+            with self._lock:
+                if self._index is None:
+                    self._index = HNSWIndex(
+                        self.dimension,
+                        capacity=self.capacity,
+                        m=self.m,
+                        ef_construction=self.ef_construction,
+                        ef_search=self.ef_search
+                    )
+        return self._index
+
+    def add_chunks(self, chunks: Iterable[DocumentChunk], document: Document) -> int:
+        """
+        Insert or replace chunks of one document
+
+        Blocks while the graph is updated; call it from a worker thread
+        (asyncio.to_thread) rather than on the event loop.
+
+        Args:
+            chunks: Persisted chunks (with ids and embeddings)
+            document: Their parent document
+
+        Returns:
+            Number of chunks indexed
+        """
+        chunks = [chunk for chunk in chunks if chunk.embedding is not None and any(chunk.embedding)]
+        if not chunks:
+            return 0
+
+        self.index.add([chunk.id for chunk in chunks], [list(chunk.embedding) for chunk in chunks])
+        with self._lock:
+            for chunk in chunks:
+                self._payloads[chunk.id] = {
+                    "chunk_id": chunk.id,
+                    "document_id": document.id,
+                    "filename": document.filename,
+                    "title": document.title,
+                    "content": chunk.content,
+                    "chunk_index": chunk.chunk_index,
+                    "metadata": chunk.chunk_metadata or {},
+                }
+                self._document_chunks.setdefault(document.id, set()).add(chunk.id)
+        return len(chunks)
+
+    def remove_document(self, document_id: int) -> int:
+        """
+        Tombstone every chunk of a document
+
+        Returns:
+            Number of chunks removed
+        """
+        with self._lock:
+            if self._loading:
+                self._removed_during_load.add(document_id)
+            chunk_ids = self._document_chunks.pop(document_id, set())
+            for chunk_id in chunk_ids:
+                self._payloads.pop(chunk_id, None)
+        if not chunk_ids or self._index is None:
+            return 0
+        return self._index.delete(list(chunk_ids))
+
+    def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        min_similarity: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k semantic search over the in-memory graph
+
+        Args:
+            query_embedding: Query embedding vector
+            limit: Maximum number of results
+            min_similarity: Optional minimum cosine similarity
+
+        Returns:
+            Result dicts in the same shape as IndexingService.search_documents
+        """
+        if self._index is None:
+            return []
+
+        hits = self._index.search(query_embedding, k=limit, min_similarity=min_similarity)[0]
+        results = []
+        for chunk_id, similarity in hits:
+            payload = self._payloads.get(chunk_id)
+            # A concurrent delete may have dropped the payload after the graph search
+            if payload is not None:
+                results.append({**payload, "similarity": similarity})
+        return results
+
+    async def load(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """
+        Build the index from document_chunks
+
+        Rows are streamed in batches and inserted on a worker thread, so the
+        event loop keeps serving requests while a large corpus loads.
+
+        Args:
+            db: Database session
+            batch_size: Rows fetched and inserted per batch
+
+        Returns:
+            Number of chunks indexed
+        """
+        query = (
+            select(DocumentChunk, Document)
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .where(DocumentChunk.embedding.isnot(None))
+            .execution_options(yield_per=batch_size)
+        )
+
+        loaded = 0
+        self._loading = True
+        self._removed_during_load = set()
+        try:
+            result = await db.stream(query)
+            async for partition in result.partitions(batch_size):
+                by_document: Dict[int, List[DocumentChunk]] = {}
+                documents: Dict[int, Document] = {}
+                for chunk, document in partition:
+                    by_document.setdefault(document.id, []).append(chunk)
+                    documents[document.id] = document
+                for document_id, chunks in by_document.items():
+                    # Rows streamed before a concurrent delete must not resurrect the document
+                    if document_id in self._removed_during_load:
+                        continue
+                    loaded += await asyncio.to_thread(self.add_chunks, chunks, documents[document_id])
+        finally:
+            self._loading = False
+            self._removed_during_load = set()
+
+        self.ready = True
+        logger.info(f"Loaded {loaded} chunks into the in-memory vector index")
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and readiness"""
+        stats = {"ready": self.ready, "documents": len(self._document_chunks)}
+        if self._index is not None:
+            stats.update(self._index.stats())
+        return stats
+
+
+# Global instance (populated at startup when MEMORY_INDEX_ENABLED is set)
+memory_index = MemoryVectorIndex()
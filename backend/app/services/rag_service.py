@@ -0,0 +1,197 @@
+"""Retrieval-augmented generation over the indexed documents"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.llm import LLMManager, llm_manager
+from app.core.tokenizer import tokenizer_service
+from app.services.indexing_service import IndexingService, indexing_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RAG_SYSTEM_PROMPT = (
+    "You are a helpful assistant answering questions about the user's documents. "
+    "Answer using only the numbered context passages. Cite the passages you use as [1], [2], ... "
+    "If the context does not contain the answer, say so."
+)
+
+
+def format_chunk(number: int, chunk: Dict[str, Any]) -> str:
+    """Render a retrieved chunk as a numbered context passage"""
+    source = chunk.get("title") or chunk.get("filename") or f"document {chunk['document_id']}"
+    return f"[{number}] {source} (chunk {chunk['chunk_index']})\n{chunk['content']}"
+
+
+async def pack_context(
+    chunks: List[Dict[str, Any]],
+    budget: int,
+    count_tokens_many: Callable[[List[str]], Awaitable[List[int]]],
+    truncate: Optional[Callable[[str, int], Awaitable[str]]] = None
+) -> Tuple[str, List[Dict[str, Any]], int]:
+    """
+    Pack chunks, best first, into a context block until the token budget is reached
+
+    Packing stops at the first passage that does not fit, so the context
+    never skips a better chunk in favor of a worse one. All passages are
+    counted in one bulk call before packing. When even the best passage is
+    over the budget, it is cut to fit with ``truncate`` so the answer still
+    has a source.
+
+    Args:
+        chunks: Retrieved chunks, best first
+        budget: Maximum context tokens
+        count_tokens_many: Async bulk tokenizer of the generating model
+        truncate: Optional async function cutting a text to a number of tokens
+
+    Returns:
+        Tuple of (context text, chunks used, context tokens)
+    """
+    # Passages are numbered in rank order, and packing keeps a prefix of that order
+    candidates = [format_chunk(number, chunk) for number, chunk in enumerate(chunks, start=1)]
+    *candidate_tokens, separator_tokens = await count_tokens_many(candidates + ["\n\n"])
+
+    passages: List[str] = []
+    used: List[Dict[str, Any]] = []
+    tokens = 0
+
+    for chunk, passage, count in zip(chunks, candidates, candidate_tokens):
+        passage_tokens = count + (separator_tokens if passages else 0)
+        if tokens + passage_tokens > budget:
+            if not passages and truncate is not None and budget > 0:
+                passages.append(await truncate(passage, budget))
+                used.append(chunk)
+                tokens = budget
+            break
+        passages.append(passage)
+        used.append(chunk)
+        tokens += passage_tokens
+
+    return "\n\n".join(passages), used, tokens
+
+
+def build_prompt(question: str, context: str) -> str:
+    """User prompt with the packed context followed by the question"""
+    if not context:
+        return f"No document passages matched this question.\n\nQuestion: {question}"
+    return f"Context:\n{context}\n\nQuestion: {question}"
+
+
+class RAGService:
+    """Answer questions with document chunks retrieved by semantic search"""
+
+    def __init__(
+        self,
+        indexing: Optional[IndexingService] = None,
+        llm: Optional[LLMManager] = None
+    ):
+        """
+        Initialize RAG service
+
+        Args:
+            indexing: Indexing service used for retrieval (defaults to the global instance)
+            llm: LLM manager used for generation (defaults to the global instance)
+        """
+        self.indexing_service = indexing or indexing_service
+        self.llm = llm or llm_manager
+
+    async def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens tokens of the generating model, off the event loop"""
+        model = getattr(self.llm.provider, "model", None)
+
+        def cut() -> str:
+            tokens = tokenizer_service.encode(text, model)
+            return text if len(tokens) <= max_tokens else tokenizer_service.decode(tokens[:max_tokens], model)
+
+        return await asyncio.to_thread(cut)
+
+    async def answer(
+        self,
+        question: str,
+        db: Optional[AsyncSession] = None,
+        limit: Optional[int] = None,
+        min_similarity: Optional[float] = None,
+        context_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        mode: str = "vector",
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve chunks for a question, pack them into the prompt and generate an answer
+
+        Args:
+            question: User question
+            db: Database session (a new session is opened when omitted)
+            limit: Chunks retrieved (defaults to settings.rag_top_k)
+            min_similarity: Optional minimum cosine similarity
+            context_tokens: Context token budget (defaults to settings.rag_context_tokens)
+            system_prompt: System prompt (defaults to citing the numbered passages)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            mode: Retrieval mode, "vector" or "hybrid"
+            filters: Optional search filters (see app.core.search_filters)
+
+        Returns:
+            Dict with answer, tokens_used, citations, context_tokens, retrieval_ms and generation_ms
+
+        Raises:
+            ValueError: If the question or retrieval parameters are invalid
+            Exception: If retrieval or generation fails
+        """
+        limit = limit or settings.rag_top_k
+        budget = context_tokens or settings.rag_context_tokens
+
+        start_time = time.perf_counter()
+        chunks = await self.indexing_service.search_documents(
+            query=question,
+            limit=limit,
+            min_similarity=min_similarity,
+            db=db,
+            mode=mode,
+            filters=filters
+        )
+        context, used, tokens = await pack_context(chunks, budget, self.llm.count_tokens_many, self.truncate)
+        retrieval_ms = (time.perf_counter() - start_time) * 1000
+
+        start_time = time.perf_counter()
+        result = await self.llm.generate_with_usage(
+            prompt=build_prompt(question, context),
+            system_prompt=system_prompt or DEFAULT_RAG_SYSTEM_PROMPT,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        generation_ms = (time.perf_counter() - start_time) * 1000
+
+        logger.info(
+            f"RAG answer from {len(used)} of {len(chunks)} chunks ({tokens} context tokens): "
+            f"retrieval {retrieval_ms:.1f}ms, generation {generation_ms:.1f}ms"
+        )
+
+        return {
+            "answer": result.text,
+            "tokens_used": result.completion_tokens,
+            "citations": [
+                {
+                    "number": number,
+                    "document_id": chunk["document_id"],
+                    "chunk_index": chunk["chunk_index"],
+                    "chunk_id": chunk["chunk_id"],
+                    "filename": chunk.get("filename"),
+                    "similarity": chunk.get("similarity"),
+                }
+                for number, chunk in enumerate(used, start=1)
+            ],
+            "context_tokens": tokens,
+            "retrieval_ms": retrieval_ms,
+            "generation_ms": generation_ms,
+        }
+
+
+# Global instance
+rag_service = RAGService()
@@ -0,0 +1,311 @@
+"""Semantic search result cache stored in vector_search_cache"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.models import VectorSearchCache
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """
+    Query-result cache for semantic search
+
+    Lookups go by a hash of the normalized query text and search parameters,
+    so an exact repeat is answered before the query is embedded. With a
+    similarity threshold set, a query whose embedding is close enough to a
+    cached one with the same parameters is also a hit (PostgreSQL only).
+
+    Hit statistics are collected in memory and written in batches by a
+    background task. Any document change clears the cache; a generation
+    counter keeps searches that started before the change from storing
+    stale results.
+
+    Writes go through sessions of their own, so storing or clearing entries
+    never commits or rolls back the caller's request session.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        flush_seconds: Optional[float] = None,
+        session_factory: Optional[async_sessionmaker] = None
+    ):
+        """
+        Initialize search cache
+
+        Args:
+            ttl_seconds: Entry lifetime, 0 = never expires (defaults to settings)
+            similarity_threshold: Minimum cosine similarity for near-duplicate
+                hits, 0 = exact matches only (defaults to settings)
+            flush_seconds: Interval between hit statistic writes (defaults to settings)
+            session_factory: Session factory for cache writes (defaults to the application's)
+        """
+        self.ttl_seconds = settings.search_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.similarity_threshold = (
+            settings.search_cache_similarity_threshold
+            if similarity_threshold is None else similarity_threshold
+        )
+        self.flush_seconds = settings.search_cache_flush_seconds if flush_seconds is None else flush_seconds
+        self.session_factory = session_factory or AsyncSessionLocal
+
+        self.generation = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._pending_hits: Dict[int, Tuple[int, datetime]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Collapse whitespace so trivially different queries share an entry"""
+        return " ".join(query.split())
+
+    @staticmethod
+    def params_hash(
+        limit: int,
+        min_similarity: Optional[float],
+        filters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Hash of everything besides the query text that shapes the results"""
+        params = (
+            f"{settings.embedding_provider or settings.llm_provider}:{settings.embedding_dimension}:"
+            f"{settings.embedding_quantization}:{limit}:{min_similarity}"
+        )
+        if filters:
+            params += ":" + json.dumps(filters, sort_keys=True)
+        return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+    def query_hash(self, query: str, params_hash: str) -> str:
+        """Cache key for a query under the given parameters"""
+        key = f"{params_hash}:{self.normalize_query(query)}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _not_expired(self):
+        return or_(VectorSearchCache.expires_at.is_(None), VectorSearchCache.expires_at > datetime.utcnow())
+
+    async def get(self, db: AsyncSession, query: str, params_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up an exact query match
+
+        Args:
+            db: Database session
+            query: Search query text
+            params_hash: Result of params_hash() for the search
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        try:
+            result = await db.execute(
+                select(VectorSearchCache.id, VectorSearchCache.results)
+                .where(VectorSearchCache.query_hash == self.query_hash(query, params_hash))
+                .where(self._not_expired())
+            )
+            row = result.first()
+        except Exception as e:
+            logger.warning(f"Search cache lookup failed: {e}")
+            return None
+
+        if row is None:
+            return None
+        self.exact_hits += 1
+        self.record_hit(row.id)
+        return row.results
+
+    async def get_similar(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        params_hash: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a cached query whose embedding is close to this one
+
+        Args:
+            db: Database session
+            query_embedding: Embedding of the search query
+            params_hash: Result of params_hash() for the search
+
+        Returns:
+            Cached results of the nearest query above the threshold, or None
+        """
+        if self.similarity_threshold <= 0 or db.bind.dialect.name != "postgresql":
+            self.misses += 1
+            return None
+
+        distance = VectorSearchCache.query_embedding.cosine_distance(query_embedding)
+        try:
+            result = await db.execute(
+                select(VectorSearchCache.id, VectorSearchCache.results, (1 - distance).label("similarity"))
+                .where(VectorSearchCache.params_hash == params_hash)
+                .where(VectorSearchCache.query_embedding.isnot(None))
+                .where(self._not_expired())
+                .order_by(distance)
+                .limit(1)
+            )
+            row = result.first()
+        except Exception as e:
+            logger.warning(f"Search cache similarity lookup failed: {e}")
+            row = None
+
+        if row is None or row.similarity < self.similarity_threshold:
+            self.misses += 1
+            return None
+        self.similar_hits += 1
+        self.record_hit(row.id)
+        return row.results
+
+    async def set(
+        self,
+        query: str,
+        params_hash: str,
+        query_embedding: Optional[List[float]],
+        results: List[Dict[str, Any]],
+        search_time_ms: float,
+        generation: int
+    ) -> bool:
+        """
+        Store search results
+
+        Args:
+            query: Search query text
+            params_hash: Result of params_hash() for the search
+            query_embedding: Embedding of the search query
+            results: Results to cache
+            search_time_ms: Time the uncached search took
+            generation: Value of self.generation when the search started
+
+        Returns:
+            True if the entry was stored
+        """
+        if generation != self.generation:
+            return False
+
+        query_hash = self.query_hash(query, params_hash)
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds) if self.ttl_seconds > 0 else None
+        async with self.session_factory() as db:
+            try:
+                await db.execute(delete(VectorSearchCache).where(VectorSearchCache.query_hash == query_hash))
+                db.add(VectorSearchCache(
+                    query_text=self.normalize_query(query),
+                    query_hash=query_hash,
+                    params_hash=params_hash,
+                    query_embedding=query_embedding,
+                    results=results,
+                    result_count=len(results),
+                    search_time_ms=search_time_ms,
+                    hit_count=0,
+                    expires_at=expires_at
+                ))
+                await db.commit()
+                return True
+            except Exception as e:
+                # Typically a concurrent miss for the same query stored it first
+                await db.rollback()
+                logger.warning(f"Search cache write failed: {e}")
+                return False
+
+    def record_hit(self, entry_id: int) -> None:
+        """Count a hit in memory; written by flush_hits()"""
+        count, _ = self._pending_hits.get(entry_id, (0, None))
+        self._pending_hits[entry_id] = (count + 1, datetime.utcnow())
+
+    async def flush_hits(self, db: AsyncSession) -> int:
+        """
+        Write pending hit counts in one batched UPDATE and purge expired entries
+
+        Args:
+            db: Database session (committed)
+
+        Returns:
+            Number of entries whose statistics were written
+        """
+        pending, self._pending_hits = self._pending_hits, {}
+        table = VectorSearchCache.__table__
+        try:
+            if pending:
+                statement = (
+                    update(table)
+                    .where(table.c.id == bindparam("entry_id"))
+                    .values(
+                        hit_count=func.coalesce(table.c.hit_count, 0) + bindparam("hits"),
+                        last_hit_at=bindparam("hit_at")
+                    )
+                )
+                await db.execute(statement, [
+                    {"entry_id": entry_id, "hits": hits, "hit_at": hit_at}
+                    for entry_id, (hits, hit_at) in pending.items()
+                ])
+            await db.execute(delete(table).where(table.c.expires_at <= datetime.utcnow()))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Failed to write search cache hit statistics: {e}")
+            # Keep the counts for the next flush
+            for entry_id, (hits, hit_at) in pending.items():
+                count, _ = self._pending_hits.get(entry_id, (0, None))
+                self._pending_hits[entry_id] = (count + hits, hit_at)
+            return 0
+        return len(pending)
+
+    async def invalidate(self) -> None:
+        """Drop every cached result after the document set changed"""
+        self.generation += 1
+        self._pending_hits.clear()
+        async with self.session_factory() as db:
+            try:
+                await db.execute(delete(VectorSearchCache))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Failed to invalidate search cache: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            async with self.session_factory() as db:
+                await self.flush_hits(db)
+
+    def start(self) -> None:
+        """Start the background hit statistics writer"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop the background writer and write the remaining statistics"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._pending_hits:
+            async with self.session_factory() as db:
+                await self.flush_hits(db)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters"""
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "pending_hit_updates": len(self._pending_hits),
+            "generation": self.generation,
+        }
+
+
+# Global instance
+search_cache = SearchResultCache()
@@ -0,0 +1,57 @@
+"""Pluggable vector stores selected by VECTOR_DB_TYPE"""
+
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from .base import VectorRecord, VectorStore, load_document_chunks
+
+logger = logging.getLogger(__name__)
+
+_vector_store: Optional[VectorStore] = None
+
+
+def create_vector_store(store_type: Optional[str] = None) -> VectorStore:
+    """
+    Create a vector store
+
+    Args:
+        store_type: pgvector, chroma or memory (defaults to settings.vector_db_type)
+
+    Returns:
+        New vector store instance
+
+    Raises:
+        ValueError: If the store type is not supported
+    """
+    store_type = (store_type or settings.vector_db_type).lower()
+
+    if store_type == "pgvector":
+        from .pgvector import PgVectorStore
+        return PgVectorStore()
+    if store_type == "chroma":
+        from .chroma import ChromaVectorStore
+        return ChromaVectorStore(settings.chroma_persist_directory, settings.chroma_collection)
+    if store_type == "memory":
+        from .memory import MemoryVectorStore
+        return MemoryVectorStore(settings.embedding_dimension)
+
+    raise ValueError(f"Unsupported vector store: {store_type}")
+
+
+def get_vector_store() -> VectorStore:
+    """Shared vector store for the configured backend"""
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = create_vector_store()
+        logger.info(f"Using {_vector_store.name} vector store")
+    return _vector_store
+
+
+__all__ = [
+    "VectorRecord",
+    "VectorStore",
+    "create_vector_store",
+    "get_vector_store",
+    "load_document_chunks",
+]
@@ -0,0 +1,145 @@
+"""Vector store interface shared by the pgvector, Chroma and in-memory backends"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Document, DocumentChunk
+
+
+@dataclass
+class VectorRecord:
+    """One chunk embedding plus the payload returned with search results"""
+
+    chunk_id: int
+    document_id: int
+    embedding: List[float]
+    content: str
+    chunk_index: int
+    filename: Optional[str] = None
+    title: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Document fields available to search filters
+    tags: List[str] = field(default_factory=list)
+    language: Optional[str] = None
+    content_type: Optional[str] = None
+    collection_id: Optional[int] = None
+
+    @classmethod
+    def from_chunk(cls, chunk: DocumentChunk, document: Document) -> "VectorRecord":
+        return cls(
+            chunk_id=chunk.id,
+            document_id=document.id,
+            embedding=list(chunk.embedding),
+            content=chunk.content,
+            chunk_index=chunk.chunk_index,
+            filename=document.filename,
+            title=document.title,
+            metadata=chunk.chunk_metadata or {},
+            tags=list(document.tags or []),
+            language=document.language,
+            content_type=document.content_type,
+            collection_id=document.collection_id
+        )
+
+    def filter_fields(self) -> Dict[str, Any]:
+        """Fields matched by search filters besides the chunk metadata"""
+        return {
+            "collection_id": self.collection_id,
+            "document_id": self.document_id,
+            "tags": self.tags,
+            "language": self.language,
+            "content_type": self.content_type,
+        }
+
+    def to_result(self, similarity: float) -> Dict[str, Any]:
+        """Search result dict in the shape returned by IndexingService.search_documents"""
+        return {
+            "chunk_id": self.chunk_id,
+            "document_id": self.document_id,
+            "filename": self.filename,
+            "title": self.title,
+            "content": self.content,
+            "chunk_index": self.chunk_index,
+            "similarity": similarity,
+            "metadata": self.metadata,
+        }
+
+
+class VectorStore(ABC):
+    """Abstract base class for vector stores"""
+
+    name: str = "base"
+
+    # True when the store reads document_chunks directly, so chunk rows written
+    # by IndexingService need no separate upsert
+    uses_document_chunks: bool = False
+
+    @abstractmethod
+    async def upsert(self, records: List[VectorRecord]) -> int:
+        """Insert or replace records by chunk id, returns the number written"""
+        pass
+
+    @abstractmethod
+    async def delete_document(self, document_id: int) -> int:
+        """Remove every chunk of a document, returns the number removed"""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        min_similarity: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Top-k cosine search, best first, optionally restricted by filters (see app.core.search_filters)"""
+        pass
+
+    @abstractmethod
+    async def delete_collection(self, collection_id: int) -> int:
+        """Remove every chunk of a collection, returns the number removed"""
+        pass
+
+    @abstractmethod
+    async def get_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        """Stored embeddings of the given chunks by chunk id; unknown ids are omitted"""
+        pass
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """Store size and configuration"""
+        pass
+
+    def close(self) -> None:
+        """Release client resources"""
+        pass
+
+
+async def load_document_chunks(store: VectorStore, db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Copy every embedded chunk from document_chunks into a store
+
+    Args:
+        store: Target vector store
+        db: Database session
+        batch_size: Rows fetched and upserted per batch
+
+    Returns:
+        Number of chunks copied
+    """
+    query = (
+        select(DocumentChunk, Document)
+        .join(Document, Document.id == DocumentChunk.document_id)
+        .where(DocumentChunk.embedding.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+
+    loaded = 0
+    result = await db.stream(query)
+    async for partition in result.partitions(batch_size):
+        loaded += await store.upsert([VectorRecord.from_chunk(chunk, document) for chunk, document in partition])
+    return loaded
@@ -0,0 +1,217 @@
+"""Embedded Chroma vector store persisted to disk"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.search_filters import normalize_filters
+from .base import VectorRecord, VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Chunk metadata keys are stored with this prefix so they cannot collide with the record fields
+METADATA_PREFIX = "meta_"
+# Chroma metadata cannot hold lists, so each document tag is stored as a boolean field
+TAG_PREFIX = "tag_"
+
+
+def _match(field: str, values: List[Any]) -> Dict[str, Any]:
+    return {field: {"$eq": values[0]}} if len(values) == 1 else {field: {"$in": values}}
+
+
+def chroma_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Translate a search filter dict into a Chroma ``where`` clause
+
+    Args:
+        filters: Filter dict (see app.core.search_filters)
+
+    Returns:
+        Chroma where dict, or None without filters
+    """
+    clauses = []
+    for key, values in normalize_filters(filters).items():
+        if key == "metadata":
+            clauses.extend(_match(METADATA_PREFIX + field, allowed) for field, allowed in values.items())
+        elif key == "tags":
+            tags = [{TAG_PREFIX + tag: {"$eq": True}} for tag in values]
+            clauses.append(tags[0] if len(tags) == 1 else {"$or": tags})
+        else:
+            clauses.append(_match(key, values))
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    Vector store in an embedded, disk-persisted Chroma collection
+
+    The collection uses cosine distance. Chunk payloads are kept in Chroma
+    metadata: document fields and scalar chunk metadata values are stored as
+    separate fields so they can be filtered on, and the full metadata dict
+    as JSON. Chroma's client is synchronous, so calls run in a worker thread.
+    """
+
+    name = "chroma"
+
+    def __init__(self, persist_directory: str, collection_name: str = "document_chunks"):
+        """
+        Initialize Chroma store (the client is opened on first use)
+
+        Args:
+            persist_directory: Directory for the Chroma database
+            collection_name: Collection holding the chunk embeddings
+        """
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self._client = None
+        self._collection = None
+
+    @property
+    def collection(self):
+        """Chroma collection, created on first use"""
+        if self._collection is None:
+            try:
+                import chromadb
+            except ImportError as e:
+                raise ImportError("The Chroma vector store requires chromadb (pip install chromadb)") from e
+
+            self._client = chromadb.PersistentClient(path=self.persist_directory)
+            self._collection = self._client.get_or_create_collection(
+                name=self.collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+            logger.info(f"Opened Chroma collection {self.collection_name} at {self.persist_directory}")
+        return self._collection
+
+    @staticmethod
+    def _to_metadata(record: VectorRecord) -> Dict[str, Any]:
+        # Chroma metadata values must be non-null scalars
+        metadata = {
+            "document_id": record.document_id,
+            "chunk_index": record.chunk_index,
+            "metadata_json": json.dumps(record.metadata),
+        }
+        if record.filename is not None:
+            metadata["filename"] = record.filename
+        if record.title is not None:
+            metadata["title"] = record.title
+        if record.collection_id is not None:
+            metadata["collection_id"] = record.collection_id
+        if record.language is not None:
+            metadata["language"] = record.language
+        if record.content_type is not None:
+            metadata["content_type"] = record.content_type
+        for tag in record.tags:
+            metadata[TAG_PREFIX + tag] = True
+        for key, value in record.metadata.items():
+            if isinstance(value, (str, int, float, bool)):
+                metadata[METADATA_PREFIX + key] = value
+        return metadata
+
+    @staticmethod
+    def _to_result(chunk_id: str, content: str, metadata: Dict[str, Any], distance: float) -> Dict[str, Any]:
+        return {
+            "chunk_id": int(chunk_id),
+            "document_id": metadata["document_id"],
+            "filename": metadata.get("filename"),
+            "title": metadata.get("title"),
+            "content": content,
+            "chunk_index": metadata["chunk_index"],
+            "similarity": 1.0 - float(distance),
+            "metadata": json.loads(metadata.get("metadata_json") or "{}"),
+        }
+
+    def _upsert(self, records: List[VectorRecord]) -> None:
+        self.collection.upsert(
+            ids=[str(record.chunk_id) for record in records],
+            embeddings=[list(record.embedding) for record in records],
+            documents=[record.content for record in records],
+            metadatas=[self._to_metadata(record) for record in records]
+        )
+
+    async def upsert(self, records: List[VectorRecord]) -> int:
+        if not records:
+            return 0
+        await asyncio.to_thread(self._upsert, records)
+        return len(records)
+
+    def _delete_document(self, document_id: int) -> int:
+        where = {"document_id": {"$eq": document_id}}
+        ids = self.collection.get(where=where, include=[])["ids"]
+        if ids:
+            self.collection.delete(ids=ids)
+        return len(ids)
+
+    async def delete_document(self, document_id: int) -> int:
+        return await asyncio.to_thread(self._delete_document, document_id)
+
+    def _delete_collection(self, collection_id: int) -> int:
+        ids = self.collection.get(where={"collection_id": {"$eq": collection_id}}, include=[])["ids"]
+        if ids:
+            self.collection.delete(ids=ids)
+        return len(ids)
+
+    async def delete_collection(self, collection_id: int) -> int:
+        return await asyncio.to_thread(self._delete_collection, collection_id)
+
+    def _search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        min_similarity: Optional[float],
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        # Chroma rejects n_results larger than the collection
+        limit = min(limit, self.collection.count())
+        if limit <= 0:
+            return []
+
+        response = self.collection.query(
+            query_embeddings=[list(query_embedding)],
+            n_results=limit,
+            where=chroma_where(filters),
+            include=["documents", "metadatas", "distances"]
+        )
+        results = [
+            self._to_result(chunk_id, content, metadata, distance)
+            for chunk_id, content, metadata, distance in zip(
+                response["ids"][0], response["documents"][0],
+                response["metadatas"][0], response["distances"][0]
+            )
+        ]
+        if min_similarity is not None:
+            results = [result for result in results if result["similarity"] >= min_similarity]
+        return results
+
+    async def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        min_similarity: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._search, query_embedding, limit, min_similarity, filters)
+
+    def _get_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        response = self.collection.get(ids=[str(chunk_id) for chunk_id in chunk_ids], include=["embeddings"])
+        return {
+            int(chunk_id): list(embedding)
+            for chunk_id, embedding in zip(response["ids"], response["embeddings"])
+        }
+
+    async def get_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        if not chunk_ids:
+            return {}
+        return await asyncio.to_thread(self._get_embeddings, chunk_ids)
+
+    async def stats(self) -> Dict[str, Any]:
+        vectors = await asyncio.to_thread(self.collection.count)
+        return {
+            "backend": self.name,
+            "vectors": vectors,
+            "collection": self.collection_name,
+            "persist_directory": self.persist_directory,
+        }
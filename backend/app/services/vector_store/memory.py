@@ -0,0 +1,183 @@
+"""NumPy vector store kept entirely in process memory"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.search_filters import matches_filters, normalize_filters
+from app.core.similarity import normalize, top_k
+from .base import VectorRecord, VectorStore
+
+
+class _Partition:
+    """Pre-normalized matrix and records of one collection"""
+
+    def __init__(self, dimension: int):
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+        self.records: List[VectorRecord] = []
+        self.positions: Dict[int, int] = {}
+
+    def remove(self, positions: List[int]) -> None:
+        keep = np.ones(len(self.records), dtype=bool)
+        keep[positions] = False
+        self.matrix = self.matrix[keep]
+        self.records = [record for record, kept in zip(self.records, keep) if kept]
+        self.positions = {record.chunk_id: idx for idx, record in enumerate(self.records)}
+
+    def append(self, records: List[VectorRecord], vectors: np.ndarray) -> None:
+        offset = len(self.records)
+        self.matrix = np.vstack([self.matrix, vectors])
+        self.records = self.records + records
+        for idx, record in enumerate(records):
+            self.positions[record.chunk_id] = offset + idx
+
+
+class MemoryVectorStore(VectorStore):
+    """
+    Exact cosine search over pre-normalized float32 matrices
+
+    Nothing is persisted; the store is filled from document_chunks at
+    startup. Each collection is kept in its own matrix, so a search scoped to
+    a collection only scores that collection's rows. Upserts append rows
+    (replacing the old row of an updated chunk) and deletes compact the
+    matrix, so writes cost O(n) while searches are a matrix-vector product.
+    """
+
+    name = "memory"
+
+    def __init__(self, dimension: int):
+        """
+        Initialize memory store
+
+        Args:
+            dimension: Embedding dimension
+        """
+        self.dimension = dimension
+        self._partitions: Dict[Optional[int], _Partition] = {}
+        self._collections: Dict[int, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def _remove_chunks(self, chunk_ids: List[int]) -> None:
+        by_collection: Dict[Optional[int], List[int]] = {}
+        for chunk_id in chunk_ids:
+            collection_id = self._collections.pop(chunk_id)
+            by_collection.setdefault(collection_id, []).append(self._partitions[collection_id].positions[chunk_id])
+        for collection_id, positions in by_collection.items():
+            self._partitions[collection_id].remove(positions)
+
+    async def upsert(self, records: List[VectorRecord]) -> int:
+        if not records:
+            return 0
+
+        # Last write wins for ids repeated within the batch
+        records = list({record.chunk_id: record for record in records}.values())
+        vectors = normalize([record.embedding for record in records])
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {vectors.shape[1]}")
+
+        by_collection: Dict[Optional[int], List[int]] = {}
+        for idx, record in enumerate(records):
+            by_collection.setdefault(record.collection_id, []).append(idx)
+
+        with self._lock:
+            self._remove_chunks([record.chunk_id for record in records if record.chunk_id in self._collections])
+            for collection_id, indices in by_collection.items():
+                partition = self._partitions.setdefault(collection_id, _Partition(self.dimension))
+                partition.append([records[idx] for idx in indices], vectors[indices])
+                for idx in indices:
+                    self._collections[records[idx].chunk_id] = collection_id
+        return len(records)
+
+    async def delete_document(self, document_id: int) -> int:
+        with self._lock:
+            chunk_ids = [
+                record.chunk_id
+                for partition in self._partitions.values()
+                for record in partition.records
+                if record.document_id == document_id
+            ]
+            if chunk_ids:
+                self._remove_chunks(chunk_ids)
+        return len(chunk_ids)
+
+    async def delete_collection(self, collection_id: int) -> int:
+        with self._lock:
+            partition = self._partitions.pop(collection_id, None)
+            if partition is None:
+                return 0
+            for record in partition.records:
+                self._collections.pop(record.chunk_id, None)
+        return len(partition.records)
+
+    async def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        min_similarity: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        filters = normalize_filters(filters)
+        with self._lock:
+            if "collection_id" in filters:
+                partitions = [
+                    self._partitions[collection_id]
+                    for collection_id in filters["collection_id"]
+                    if collection_id in self._partitions
+                ]
+            else:
+                partitions = list(self._partitions.values())
+            # Writers replace a partition's matrix and record list rather than mutating them
+            snapshots = [(partition.matrix, partition.records) for partition in partitions]
+
+        query = normalize(query_embedding)[0]
+        hits = []
+        for matrix, records in snapshots:
+            if not records:
+                continue
+            if filters:
+                mask = np.fromiter(
+                    (matches_filters(record.filter_fields(), record.metadata, filters) for record in records),
+                    dtype=bool,
+                    count=len(records)
+                )
+                positions = np.flatnonzero(mask)
+                matrix = matrix[positions]
+            else:
+                positions = None
+
+            indices, values = top_k(matrix @ query, limit)
+            hits.extend(
+                (float(score), records[positions[idx] if positions is not None else idx])
+                for idx, score in zip(indices, values)
+            )
+
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        results = []
+        for score, record in hits[:limit]:
+            if min_similarity is not None and score < min_similarity:
+                break
+            results.append(record.to_result(score))
+        return results
+
+    async def get_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        # Rows are stored normalized, which does not change cosine similarities
+        with self._lock:
+            embeddings = {}
+            for chunk_id in chunk_ids:
+                if chunk_id in self._collections:
+                    partition = self._partitions[self._collections[chunk_id]]
+                    embeddings[chunk_id] = partition.matrix[partition.positions[chunk_id]].tolist()
+            return embeddings
+
+    async def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            partitions = list(self._partitions.values())
+            collections = sum(1 for collection_id in self._partitions if collection_id is not None)
+        return {
+            "backend": self.name,
+            "vectors": sum(len(partition.records) for partition in partitions),
+            "documents": len({record.document_id for partition in partitions for record in partition.records}),
+            "collections": collections,
+            "memory_bytes": int(sum(partition.matrix.nbytes for partition in partitions)),
+        }
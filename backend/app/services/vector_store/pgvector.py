@@ -0,0 +1,200 @@
+"""pgvector store reading and writing document_chunks"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.filtered_search import SearchPlan, filtered_scan_settings, plan_filtered_search
+from app.db.models import DocumentChunk
+from app.db.session import AsyncSessionLocal
+from app.db.vector_indexes import candidate_count, configure_search_session, semantic_search_query
+from .base import VectorRecord, VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Cleared when the server rejects iterative scan settings (pgvector < 0.8)
+_iterative_scan_supported = True
+
+# SQLSTATE for "unrecognized configuration parameter"
+UNDEFINED_OBJECT = "42704"
+
+
+def _sqlstate(error: DBAPIError) -> Optional[str]:
+    """SQLSTATE of a database error (asyncpg and psycopg expose it differently)"""
+    orig = getattr(error, "orig", None)
+    return getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+
+
+async def apply_filtered_scan_settings(db: AsyncSession, plan: SearchPlan, limit: int) -> None:
+    """Widen a filtered ANN scan, falling back to larger scans when iterative scans are unavailable"""
+    global _iterative_scan_supported
+
+    if settings.vector_iterative_scan != "off" and _iterative_scan_supported:
+        try:
+            # A savepoint keeps a rejected SET from aborting the search transaction
+            async with db.begin_nested():
+                for statement in filtered_scan_settings(plan, limit):
+                    await db.execute(text(statement))
+            return
+        except DBAPIError as e:
+            # Only a missing GUC means pgvector is too old; anything else may be transient
+            if _sqlstate(e) == UNDEFINED_OBJECT:
+                _iterative_scan_supported = False
+                logger.warning(f"pgvector iterative scans unavailable, widening filtered scans instead: {e}")
+            else:
+                logger.warning(f"Iterative scan settings rejected, widening this filtered scan instead: {e}")
+
+    for statement in filtered_scan_settings(plan, limit, mode="off"):
+        await db.execute(text(statement))
+
+
+async def search_chunks(
+    db: AsyncSession,
+    query_embedding: List[float],
+    limit: int,
+    min_similarity: Optional[float] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run the pgvector top-k query in an existing session
+
+    Filtered searches are planned first: a selective filter is answered by
+    an exact scan over the matching rows, a broad one by the ANN index with
+    the filter applied during the scan.
+
+    Args:
+        db: Database session
+        query_embedding: Query embedding vector
+        limit: Maximum number of results
+        min_similarity: Optional minimum cosine similarity
+        filters: Optional chunk filters
+
+    Returns:
+        Result dicts, best first
+    """
+    plan = await plan_filtered_search(db, filters)
+    exact = plan is not None and plan.strategy == "exact"
+    if not exact:
+        await configure_search_session(db, candidate_count(limit))
+    if plan is not None and plan.strategy == "ann":
+        await apply_filtered_scan_settings(db, plan, limit)
+
+    result = await db.execute(
+        semantic_search_query(
+            query_embedding, limit=limit, min_similarity=min_similarity, filters=filters, exact=exact
+        )
+    )
+    return [
+        {
+            "chunk_id": row.id,
+            "document_id": row.document_id,
+            "filename": row.filename,
+            "title": row.title,
+            "content": row.content,
+            "chunk_index": row.chunk_index,
+            "similarity": float(row.similarity),
+            "metadata": row.chunk_metadata or {}
+        }
+        for row in result.all()
+    ]
+
+
+class PgVectorStore(VectorStore):
+    """
+    Vector store backed by the document_chunks table
+
+    Chunks written by IndexingService are already part of the store; upsert
+    is for copying records in from elsewhere. The parent documents must exist.
+    """
+
+    name = "pgvector"
+    uses_document_chunks = True
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        """
+        Initialize pgvector store
+
+        Args:
+            session_factory: Session factory (defaults to the application's)
+        """
+        self.session_factory = session_factory or AsyncSessionLocal
+
+    async def upsert(self, records: List[VectorRecord]) -> int:
+        if not records:
+            return 0
+
+        rows = [
+            {
+                "id": record.chunk_id,
+                "document_id": record.document_id,
+                "content": record.content,
+                "chunk_index": record.chunk_index,
+                "embedding": record.embedding,
+                "chunk_metadata": record.metadata,
+                "collection_id": record.collection_id,
+            }
+            for record in records
+        ]
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(DocumentChunk.id).where(DocumentChunk.id.in_([row["id"] for row in rows]))
+            )
+            existing = set(result.scalars().all())
+            updates = [row for row in rows if row["id"] in existing]
+            inserts = [row for row in rows if row["id"] not in existing]
+            if updates:
+                await db.execute(update(DocumentChunk), updates)
+            if inserts:
+                await db.execute(insert(DocumentChunk), inserts)
+            await db.commit()
+        return len(rows)
+
+    async def delete_document(self, document_id: int) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document_id))
+            await db.commit()
+        return result.rowcount or 0
+
+    async def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        min_similarity: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        async with self.session_factory() as db:
+            return await search_chunks(db, query_embedding, limit, min_similarity, filters)
+
+    async def delete_collection(self, collection_id: int) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(delete(DocumentChunk).where(DocumentChunk.collection_id == collection_id))
+            await db.commit()
+        return result.rowcount or 0
+
+    async def get_embeddings(self, chunk_ids: List[int]) -> Dict[int, List[float]]:
+        if not chunk_ids:
+            return {}
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(DocumentChunk.id, DocumentChunk.embedding).where(
+                    DocumentChunk.id.in_(chunk_ids), DocumentChunk.embedding.isnot(None)
+                )
+            )
+            return {row.id: list(row.embedding) for row in result.all()}
+
+    async def stats(self) -> Dict[str, Any]:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(func.count(DocumentChunk.id)).where(DocumentChunk.embedding.isnot(None))
+            )
+            vectors = result.scalar_one()
+        return {
+            "backend": self.name,
+            "vectors": vectors,
+            "index_type": settings.vector_index_type,
+            "quantization": settings.embedding_quantization,
+        }
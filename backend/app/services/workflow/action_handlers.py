@@ -96,6 +96,8 @@ class DocumentSearchAction(BaseAction):
             - query (str): Search query
             - limit (int, optional): Maximum number of results (default: 5)
             - min_similarity (float, optional): Minimum similarity threshold (default: 0.7)
+            - diversify (bool, optional): Rerank candidates with MMR to avoid near-duplicates (default: False)
+            - mmr_lambda (float, optional): MMR trade-off, 1 = relevance only, 0 = diversity only
 
         Returns:
             Dict with 'results' containing list of matching documents
@@ -105,6 +107,8 @@ class DocumentSearchAction(BaseAction):
         query = self.resolve_variables(parameters["query"], context)
         limit = parameters.get("limit", 5)
         min_similarity = parameters.get("min_similarity", 0.7)
+        diversify = parameters.get("diversify", False)
+        mmr_lambda = parameters.get("mmr_lambda")
 
         self.logger.info(f"Searching documents for: {query}")
 
@@ -112,7 +116,9 @@ class DocumentSearchAction(BaseAction):
             results = await indexing_service.search_documents(
                 query=query,
                 limit=limit,
-                min_similarity=min_similarity
+                min_similarity=min_similarity,
+                diversify=diversify,
+                mmr_lambda=mmr_lambda
             )
 
             return {
@@ -0,0 +1,262 @@
+"""
+Ingestion load test: EmbeddingsService and IndexingService against a fake provider
+
+Starts benchmarks.fake_embedding_server on a local port, points the OpenAI
+embedding provider at it and measures throughput for each concurrency level.
+Results are written as JSON named after the current git commit so runs can
+be compared across commits.
+
+Usage:
+    python -m benchmarks.bench_ingestion --texts 5000 --concurrency 1 4 8 --rate-limit 0.02
+    python -m benchmarks.bench_ingestion --indexing --documents 20
+    python -m benchmarks.bench_ingestion --compare benchmarks/results/ingestion-<sha>.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.embeddings import EmbeddingsService, count_embedding_tokens
+from benchmarks.fake_embedding_server import (
+    add_server_arguments,
+    config_from_arguments,
+    estimate_tokens,
+    run_in_process,
+)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+WORDS = (
+    "vector index embedding document chunk query latency throughput provider batch "
+    "token search retrieval model context cache database semantic workflow agent"
+).split()
+
+
+def git_sha() -> str:
+    """Short hash of the current commit, or "unknown" outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def make_texts(count: int, words: int, seed: int = 0) -> List[str]:
+    """Synthetic chunk texts, each unique so nothing is deduplicated"""
+    rng = random.Random(seed)
+    return [f"{idx}: " + " ".join(rng.choices(WORDS, k=words)) for idx in range(count)]
+
+
+def token_counts_for(texts: List[str]) -> List[int]:
+    """Token counts with tiktoken, or the fake server's estimate when encodings are unavailable"""
+    try:
+        return count_embedding_tokens(texts)
+    except Exception as e:
+        print(f"tiktoken unavailable ({type(e).__name__}), using 4 chars/token estimate")
+        return [estimate_tokens(text) for text in texts]
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def configure_fake_provider(base_url: str) -> None:
+    """Point new EmbeddingsService instances at the fake server"""
+    settings.embedding_provider = "openai"
+    settings.openai_api_key = "fake-key"
+    settings.openai_base_url = base_url
+    settings.embedding_cache_enabled = False
+    settings.embedding_coalesce_window_ms = 0
+    rate_limit.reset_rate_limiters()
+
+
+def instrument(service: EmbeddingsService) -> List[float]:
+    """Record the latency of every provider batch call made by the service"""
+    latencies: List[float] = []
+    generate = service.provider.generate_embeddings_batch
+
+    async def timed_generate(texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        try:
+            return await generate(texts)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    service.provider.generate_embeddings_batch = timed_generate
+    return latencies
+
+
+def summarize(
+    scenario: str,
+    concurrency: int,
+    texts: int,
+    tokens: int,
+    elapsed: float,
+    latencies: List[float],
+    service_retries: int
+) -> Dict[str, Any]:
+    limiter = rate_limit.get_rate_limiter_snapshots().get("openai-embeddings", {})
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "texts": texts,
+        "tokens": tokens,
+        "elapsed_seconds": round(elapsed, 3),
+        "texts_per_second": round(texts / elapsed, 2) if elapsed else 0.0,
+        "tokens_per_second": round(tokens / elapsed, 2) if elapsed else 0.0,
+        "batches": len(latencies),
+        "batch_latency_p50_ms": round(percentile(latencies, 50), 2),
+        "batch_latency_p99_ms": round(percentile(latencies, 99), 2),
+        "service_retries": service_retries,
+        "limiter_retries": limiter.get("retries", 0),
+        "limiter_throttles": limiter.get("throttles", 0),
+        "limiter_concurrency": limiter.get("concurrency_limit"),
+    }
+
+
+async def bench_embeddings(texts: List[str], concurrency: int, batch_size: int) -> Dict[str, Any]:
+    """Embed all texts with EmbeddingsService.generate_embeddings_batch"""
+    rate_limit.reset_rate_limiters()
+    service = EmbeddingsService(batch_size=batch_size, max_concurrency=concurrency)
+    latencies = instrument(service)
+    token_counts = token_counts_for(texts)
+
+    start = time.perf_counter()
+    await service.generate_embeddings_batch(texts, token_counts=token_counts)
+    elapsed = time.perf_counter() - start
+
+    stats = service.last_batch_stats
+    service.close()
+    return summarize("embeddings", concurrency, len(texts), sum(token_counts), elapsed, latencies, stats.retries)
+
+
+async def bench_indexing(documents: List[str], concurrency: int, batch_size: int) -> Dict[str, Any]:
+    """Index documents end to end with IndexingService into an in-memory SQLite database"""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from app.db.models import Base, Document
+    from app.services.indexing_service import IndexingService
+
+    rate_limit.reset_rate_limiters()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    indexing = IndexingService(embeddings=EmbeddingsService(batch_size=batch_size, max_concurrency=concurrency))
+    latencies = instrument(indexing.embeddings_service)
+
+    texts = tokens = retries = 0
+    start = time.perf_counter()
+    async with session_factory() as db:
+        for idx, content in enumerate(documents):
+            document = Document(filename=f"doc-{idx}.txt", content_type="text/plain", file_size=len(content))
+            db.add(document)
+            await db.commit()
+            result = await indexing.process_and_index_document(
+                db, document.id, content.encode("utf-8"), "text/plain"
+            )
+            texts += result["chunks_created"]
+            tokens += result["total_tokens"]
+            retries += indexing.embeddings_service.last_batch_stats.retries
+    elapsed = time.perf_counter() - start
+
+    indexing.embeddings_service.close()
+    await engine.dispose()
+    return summarize("indexing", concurrency, texts, tokens, elapsed, latencies, retries)
+
+
+def print_table(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> None:
+    baseline_rows = {
+        (row["scenario"], row["concurrency"]): row
+        for row in (baseline or {}).get("results", [])
+    }
+    print(f"{'scenario':<12}{'conc':>6}{'texts/s':>10}{'tokens/s':>12}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'batches':>9}{'retries':>9}{'429s':>6}{'vs base':>9}")
+    for row in results:
+        retries = row["service_retries"] + row["limiter_retries"]
+        previous = baseline_rows.get((row["scenario"], row["concurrency"]))
+        change = ""
+        if previous and previous["texts_per_second"]:
+            change = f"{row['texts_per_second'] / previous['texts_per_second'] - 1:+.0%}"
+        print(f"{row['scenario']:<12}{row['concurrency']:>6}{row['texts_per_second']:>10.1f}"
+              f"{row['tokens_per_second']:>12.0f}{row['batch_latency_p50_ms']:>9.1f}"
+              f"{row['batch_latency_p99_ms']:>9.1f}{row['batches']:>9}{retries:>9}"
+              f"{row['limiter_throttles']:>6}{change:>9}")
+
+
+async def run(args: argparse.Namespace, base_url: str) -> List[Dict[str, Any]]:
+    configure_fake_provider(base_url)
+    results = []
+
+    texts = make_texts(args.texts, args.words)
+    for concurrency in args.concurrency:
+        results.append(await bench_embeddings(texts, concurrency, args.batch_size))
+
+    if args.indexing:
+        # Paragraph-sized sentences so the chunker produces several chunks per document
+        documents = [
+            ". ".join(make_texts(args.document_sentences, 20, seed=idx)) + "."
+            for idx in range(args.documents)
+        ]
+        for concurrency in args.concurrency:
+            results.append(await bench_indexing(documents, concurrency, args.batch_size))
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000, help="Texts embedded per run")
+    parser.add_argument("--words", type=int, default=150, help="Words per text")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8],
+                        help="EmbeddingsService max_concurrency values to run")
+    parser.add_argument("--batch-size", type=int, default=100, help="Texts per provider batch")
+    parser.add_argument("--indexing", action="store_true", help="Also run IndexingService end to end")
+    parser.add_argument("--documents", type=int, default=10, help="Documents for the indexing run")
+    parser.add_argument("--document-sentences", type=int, default=200, help="Sentences per document")
+    parser.add_argument("--port", type=int, default=8100, help="Fake server port")
+    parser.add_argument("--output-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--compare", type=Path, help="Previous results file to compare against")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server_config = config_from_arguments(args)
+    settings.embedding_dimension = server_config.dimension
+
+    with run_in_process(server_config, port=args.port) as base_url:
+        results = asyncio.run(run(args, base_url))
+        server_stats = httpx.get(base_url.rsplit("/v1", 1)[0] + "/stats").json()
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_table(results, baseline)
+
+    sha = git_sha()
+    report = {
+        "git_sha": sha,
+        "created_at": datetime.utcnow().isoformat(),
+        "arguments": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        "server": server_stats,
+        "results": results,
+    }
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output = args.output_dir / f"ingestion-{sha}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
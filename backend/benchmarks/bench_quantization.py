@@ -0,0 +1,80 @@
+"""
+Benchmark: recall and latency of quantized candidate generation with rescoring
+
+Compares exact float32 search with halfvec and binary candidate generation
+followed by full-precision rescoring, for several rescore factors. This is
+the same two-stage search that EMBEDDING_QUANTIZATION enables in pgvector.
+
+bytes/vec is the size of the candidate representation only. In pgvector that
+is the index entry; the full-precision vectors are stored in the table as
+before, so the table does not shrink.
+
+Usage:
+    python -m benchmarks.bench_quantization --corpus 50000 --dim 768 --k 10
+    python -m benchmarks.bench_quantization --vectors embeddings.npy
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.core.quantization import QuantizedIndex
+
+
+def clustered_vectors(rng: np.random.Generator, count: int, dim: int, clusters: int = 100) -> np.ndarray:
+    """Synthetic vectors grouped around random centroids, closer to real embeddings than pure noise"""
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=count)
+    noise = rng.standard_normal((count, dim)).astype(np.float32) * 0.6
+    return centroids[assignments] + noise
+
+
+def recall_at_k(results, ground_truth, k: int) -> float:
+    """Mean fraction of the exact top-k found"""
+    hits = 0
+    for found, expected in zip(results, ground_truth):
+        hits += len({idx for idx, _ in found} & {idx for idx, _ in expected[:k]})
+    return hits / (k * len(ground_truth))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=int, default=50000, help="Number of synthetic corpus vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Top-k size")
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Rescore factors")
+    parser.add_argument("--vectors", help="Optional .npy file with real embeddings to use as corpus")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        corpus = np.load(args.vectors).astype(np.float32)
+        queries = corpus[rng.choice(len(corpus), size=args.queries, replace=False)]
+        queries = queries + rng.standard_normal(queries.shape).astype(np.float32) * 0.01
+    else:
+        data = clustered_vectors(rng, args.corpus + args.queries, args.dim)
+        corpus, queries = data[:args.corpus], data[args.corpus:]
+
+    exact = QuantizedIndex(corpus, mode="none")
+    start = time.perf_counter()
+    ground_truth = exact.search(queries, k=args.k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"corpus={len(corpus)} dim={corpus.shape[1]} queries={len(queries)} k={args.k}")
+    print(f"{'mode':<10}{'factor':>8}{'bytes/vec':>12}{'recall@k':>10}{'ms/query':>10}")
+    print(f"{'float32':<10}{'-':>8}{exact.bytes_per_vector:>12}{1.0:>10.3f}{exact_ms:>10.2f}")
+
+    for mode in ("halfvec", "binary"):
+        index = QuantizedIndex(corpus, mode=mode)
+        for factor in args.factors:
+            start = time.perf_counter()
+            results = index.search(queries, k=args.k, rescore_factor=factor)
+            ms = (time.perf_counter() - start) * 1000 / len(queries)
+            recall = recall_at_k(results, ground_truth, args.k)
+            print(f"{mode:<10}{factor:>8}{index.bytes_per_vector:>12}{recall:>10.3f}{ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
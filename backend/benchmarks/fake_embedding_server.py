@@ -0,0 +1,252 @@
+"""
+OpenAI-compatible fake embedding server for load tests
+
+Serves ``POST /v1/embeddings`` with deterministic vectors and configurable
+latency, jitter, throttling and batch limits, so ingestion throughput can be
+measured without calling a paid API. ``GET /stats`` reports what the server saw.
+
+Usage:
+    python -m benchmarks.fake_embedding_server --port 8100 --latency-ms 80 --rate-limit 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake EMBEDDING_PROVIDER=openai ...
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour of the fake embedding server"""
+    dimension: int = 1536
+    latency_ms: float = 50.0  # Base latency of every request
+    per_input_ms: float = 0.2  # Extra latency per input text
+    jitter_ms: float = 20.0  # Uniform +/- jitter added to the latency
+    rate_limit: float = 0.0  # Probability of answering 429
+    retry_after_ms: int = 250  # retry-after-ms header sent with 429s
+    max_concurrency: int = 0  # Requests in flight beyond this get 429, 0 = unlimited
+    max_batch_size: int = 2048  # Inputs per request
+    max_batch_tokens: int = 300_000  # Estimated tokens per request
+    seed: int = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dimension: int) -> np.ndarray:
+    """Deterministic float32 unit vector derived from the text"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def encode_embedding(vector: np.ndarray, encoding_format: str) -> Union[str, List[float]]:
+    """Encode a vector the way the OpenAI API does for the requested format"""
+    if encoding_format == "base64":
+        return base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+    return vector.tolist()
+
+
+def _error(status_code: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": error_type}},
+        headers=headers
+    )
+
+
+def create_app(config: FakeServerConfig) -> FastAPI:
+    """
+    Build the fake server application
+
+    Args:
+        config: Server behaviour
+
+    Returns:
+        FastAPI app with ``/v1/embeddings`` and ``/stats``
+    """
+    app = FastAPI(title="Fake embedding server")
+    rng = random.Random(config.seed)
+    stats: Dict[str, Any] = {
+        "requests": 0,
+        "inputs": 0,
+        "tokens": 0,
+        "throttled": 0,
+        "rejected": 0,
+        "max_in_flight": 0,
+    }
+    state = {"in_flight": 0}
+
+    @app.post("/v1/embeddings")
+    async def create_embeddings(request: Request):
+        body = await request.json()
+        raw_input: Union[str, List[str]] = body.get("input", [])
+        inputs = [raw_input] if isinstance(raw_input, str) else list(raw_input)
+        encoding_format = body.get("encoding_format") or "float"
+        stats["requests"] += 1
+
+        if config.rate_limit and rng.random() < config.rate_limit:
+            stats["throttled"] += 1
+            return _error(
+                429, "Rate limit reached for requests", "rate_limit_exceeded",
+                headers={"retry-after-ms": str(config.retry_after_ms)}
+            )
+        if config.max_concurrency and state["in_flight"] >= config.max_concurrency:
+            stats["throttled"] += 1
+            return _error(
+                429, "Too many concurrent requests", "rate_limit_exceeded",
+                headers={"retry-after-ms": str(config.retry_after_ms)}
+            )
+
+        token_counts = [estimate_tokens(text) for text in inputs]
+        if len(inputs) > config.max_batch_size:
+            stats["rejected"] += 1
+            return _error(
+                400, f"Request too large: {len(inputs)} inputs, maximum {config.max_batch_size}",
+                "invalid_request_error"
+            )
+        if sum(token_counts) > config.max_batch_tokens:
+            stats["rejected"] += 1
+            return _error(
+                400, f"Requested {sum(token_counts)} tokens, max {config.max_batch_tokens} tokens per request",
+                "max_tokens_per_request"
+            )
+
+        state["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], state["in_flight"])
+        try:
+            delay = config.latency_ms + config.per_input_ms * len(inputs)
+            delay += rng.uniform(-config.jitter_ms, config.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+        finally:
+            state["in_flight"] -= 1
+
+        stats["inputs"] += len(inputs)
+        stats["tokens"] += sum(token_counts)
+        # json.dumps directly: FastAPI's encoder is far slower for large float lists
+        payload = {
+            "object": "list",
+            "model": body.get("model", "fake-embedding"),
+            "data": [
+                {
+                    "object": "embedding",
+                    "index": idx,
+                    "embedding": encode_embedding(fake_embedding(text, config.dimension), encoding_format)
+                }
+                for idx, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": sum(token_counts), "total_tokens": sum(token_counts)},
+        }
+        return Response(content=json.dumps(payload), media_type="application/json")
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"config": asdict(config), **stats}
+
+    return app
+
+
+def _serve(config: FakeServerConfig, host: str, port: int) -> None:
+    uvicorn.run(create_app(config), host=host, port=port, log_level="warning")
+
+
+@contextmanager
+def run_in_process(config: FakeServerConfig, host: str = "127.0.0.1", port: int = 8100) -> Iterator[str]:
+    """
+    Run the fake server in a separate process
+
+    A separate process keeps the server's JSON encoding off the benchmarked
+    client's GIL, so the measured throughput is the client's.
+
+    Args:
+        config: Server behaviour
+        host: Bind address
+        port: Bind port
+
+    Yields:
+        Base URL to pass as ``OPENAI_BASE_URL``
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve, args=(config, host, port), name="fake-embedding-server", daemon=True
+    )
+    process.start()
+
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            httpx.get(f"http://{host}:{port}/stats", timeout=1.0).raise_for_status()
+            break
+        except httpx.HTTPError:
+            if not process.is_alive() or time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError(f"Fake embedding server failed to start on {host}:{port}")
+            time.sleep(0.1)
+
+    try:
+        yield f"http://{host}:{port}/v1"
+    finally:
+        process.terminate()
+        process.join(timeout=10)
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register FakeServerConfig options on a command-line parser"""
+    defaults = FakeServerConfig()
+    parser.add_argument("--dimension", type=int, default=defaults.dimension)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--per-input-ms", type=float, default=defaults.per_input_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--rate-limit", type=float, default=defaults.rate_limit,
+                        help="Probability of answering 429")
+    parser.add_argument("--retry-after-ms", type=int, default=defaults.retry_after_ms)
+    parser.add_argument("--server-max-concurrency", type=int, default=defaults.max_concurrency,
+                        help="Requests in flight beyond this get 429 (0 = unlimited)")
+    parser.add_argument("--max-batch-size", type=int, default=defaults.max_batch_size)
+    parser.add_argument("--max-batch-tokens", type=int, default=defaults.max_batch_tokens)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeServerConfig:
+    """Build FakeServerConfig from parsed arguments"""
+    return FakeServerConfig(
+        dimension=args.dimension,
+        latency_ms=args.latency_ms,
+        per_input_ms=args.per_input_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        retry_after_ms=args.retry_after_ms,
+        max_concurrency=args.server_max_concurrency,
+        max_batch_size=args.max_batch_size,
+        max_batch_tokens=args.max_batch_tokens,
+        seed=args.seed
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(config_from_arguments(args)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
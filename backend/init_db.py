@@ -3,6 +3,7 @@ import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.db.base import Base
 from app.db.models import (
+    Collection,
     Document,
     DocumentChunk,
     Conversation,
@@ -13,6 +14,11 @@ from app.db.models import (
     WorkflowStepExecution,
     WorkflowTemplate
 )
+from app.db.collections import ensure_collection_indexes
+from app.db.conversations import ensure_message_history_index
+from app.db.search_cache import ensure_search_cache_table
+from app.db.text_search import ensure_text_search_index
+from app.db.vector_indexes import ensure_vector_indexes
 from app.core.config import settings
 
 async def init_db():
@@ -26,6 +32,13 @@ async def init_db():
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
 
+        # Create vector and full-text indexes, including each collection's partial index
+        await ensure_collection_indexes(conn)
+        await ensure_message_history_index(conn)
+        await ensure_search_cache_table(conn)
+        await ensure_vector_indexes(conn)
+        await ensure_text_search_index(conn)
+
     await engine.dispose()
     print("Database tables created successfully!")
 
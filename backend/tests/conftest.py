@@ -1,15 +1,25 @@
 """Pytest configuration and fixtures"""
 
+from typing import Optional
+
+import numpy as np
 import pytest
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.main import app
+from app.core.config import settings
 from app.db.base import Base
 from app.db.session import get_db
 
 
+def random_vector(seed: int, dimension: Optional[int] = None):
+    """Deterministic random embedding (defaults to the configured dimension)"""
+    dimension = dimension or settings.embedding_dimension
+    return np.random.default_rng(seed).standard_normal(dimension).astype(np.float32).tolist()
+
+
 @pytest.fixture
 def test_client():
     """Synchronous test client"""
@@ -36,15 +46,19 @@ async def test_db_engine():
 
 
 @pytest.fixture
-async def test_db_session(test_db_engine):
-    """Create test database session"""
-    AsyncTestSession = async_sessionmaker(
+def test_session_factory(test_db_engine):
+    """Session factory for the test database, for code that opens its own sessions"""
+    return async_sessionmaker(
         test_db_engine,
         class_=AsyncSession,
         expire_on_commit=False
     )
 
-    async with AsyncTestSession() as session:
+
+@pytest.fixture
+async def test_db_session(test_session_factory):
+    """Create test database session"""
+    async with test_session_factory() as session:
         yield session
         await session.rollback()
 
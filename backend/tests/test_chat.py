@@ -1,9 +1,13 @@
 """Tests for chat endpoint"""
 
+import json
+
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 
+from app.core.llm import LLMResult
+
 
 def test_chat_endpoint_not_available(test_client: TestClient):
     """Test chat endpoint when LLM is not available"""
@@ -24,8 +28,9 @@ async def test_chat_endpoint_success(async_client):
     """Test successful chat interaction"""
     with patch("app.api.v1.chat.llm_manager") as mock_llm:
         mock_llm.is_available.return_value = True
-        mock_llm.generate = AsyncMock(return_value="This is a test response")
-        mock_llm.count_tokens.return_value = 5
+        mock_llm.generate_with_usage = AsyncMock(
+            return_value=LLMResult(text="This is a test response", prompt_tokens=10, completion_tokens=5)
+        )
 
         response = await async_client.post(
             "/api/v1/chat",
@@ -44,8 +49,7 @@ async def test_chat_endpoint_with_system_prompt(async_client):
     """Test chat with system prompt"""
     with patch("app.api.v1.chat.llm_manager") as mock_llm:
         mock_llm.is_available.return_value = True
-        mock_llm.generate = AsyncMock(return_value="Response")
-        mock_llm.count_tokens.return_value = 1
+        mock_llm.generate_with_usage = AsyncMock(return_value=LLMResult(text="Response", completion_tokens=1))
 
         response = await async_client.post(
             "/api/v1/chat",
@@ -56,7 +60,8 @@ async def test_chat_endpoint_with_system_prompt(async_client):
         )
 
         assert response.status_code == 200
-        mock_llm.generate.assert_called_once()
+        mock_llm.generate_with_usage.assert_called_once()
+        mock_llm.count_tokens.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -64,8 +69,7 @@ async def test_chat_endpoint_with_temperature(async_client):
     """Test chat with custom temperature"""
     with patch("app.api.v1.chat.llm_manager") as mock_llm:
         mock_llm.is_available.return_value = True
-        mock_llm.generate = AsyncMock(return_value="Response")
-        mock_llm.count_tokens.return_value = 1
+        mock_llm.generate_with_usage = AsyncMock(return_value=LLMResult(text="Response", completion_tokens=1))
 
         response = await async_client.post(
             "/api/v1/chat",
@@ -83,8 +87,7 @@ async def test_chat_endpoint_with_max_tokens(async_client):
     """Test chat with max_tokens"""
     with patch("app.api.v1.chat.llm_manager") as mock_llm:
         mock_llm.is_available.return_value = True
-        mock_llm.generate = AsyncMock(return_value="Response")
-        mock_llm.count_tokens.return_value = 1
+        mock_llm.generate_with_usage = AsyncMock(return_value=LLMResult(text="Response", completion_tokens=1))
 
         response = await async_client.post(
             "/api/v1/chat",
@@ -125,7 +128,7 @@ async def test_chat_endpoint_generation_error(async_client):
     """Test chat when generation fails"""
     with patch("app.api.v1.chat.llm_manager") as mock_llm:
         mock_llm.is_available.return_value = True
-        mock_llm.generate = AsyncMock(side_effect=Exception("API Error"))
+        mock_llm.generate_with_usage = AsyncMock(side_effect=Exception("API Error"))
 
         response = await async_client.post(
             "/api/v1/chat",
@@ -134,3 +137,149 @@ async def test_chat_endpoint_generation_error(async_client):
 
         assert response.status_code == 500
         assert "Failed to generate response" in response.json()["detail"]
+
+
+def _sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines.get("event"), json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_endpoint(async_client):
+    """Test streamed chat sends each token and a final done event with timings"""
+    async def generate_stream(on_first_token=None, **kwargs):
+        on_first_token(12.5)
+        for piece in ["Hel", "lo"]:
+            yield piece
+
+    with patch("app.api.v1.chat.llm_manager") as mock_llm:
+        mock_llm.is_available.return_value = True
+        mock_llm.generate_stream = generate_stream
+        mock_llm.count_tokens_many = AsyncMock(return_value=[1])
+
+        response = await async_client.post(
+            "/api/v1/chat/stream",
+            json={"message": "Hello!"}
+        )
+        mock_llm.count_tokens_many.assert_awaited_once_with(["Hello"])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _sse_events(response.text)
+    assert events[:2] == [(None, {"token": "Hel"}), (None, {"token": "lo"})]
+    assert events[2][0] == "done"
+    assert events[2][1]["tokens_used"] == 1
+    assert events[2][1]["time_to_first_token_ms"] == 12.5
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_endpoint_error(async_client):
+    """Test a failure mid-stream ends with an error event"""
+    async def generate_stream(**kwargs):
+        yield "partial"
+        raise Exception("API Error")
+
+    with patch("app.api.v1.chat.llm_manager") as mock_llm:
+        mock_llm.is_available.return_value = True
+        mock_llm.generate_stream = generate_stream
+
+        response = await async_client.post(
+            "/api/v1/chat/stream",
+            json={"message": "Hello!"}
+        )
+
+    events = _sse_events(response.text)
+    assert events[0] == (None, {"token": "partial"})
+    assert events[-1][0] == "error"
+    assert "API Error" in events[-1][1]["detail"]
+
+
+@pytest.mark.asyncio
+async def test_chat_batch_endpoint(async_client):
+    """Test batch results come back in request order with per-item errors"""
+    async def generate(prompt, **kwargs):
+        if prompt == "bad":
+            raise Exception("API Error")
+        return LLMResult(text=f"answer to {prompt}", completion_tokens=3)
+
+    with patch("app.api.v1.chat.llm_manager") as mock_llm:
+        mock_llm.is_available.return_value = True
+        mock_llm.generate_with_usage = AsyncMock(side_effect=generate)
+
+        response = await async_client.post(
+            "/api/v1/chat/batch",
+            json={"items": [{"message": "one"}, {"message": "bad"}, {"message": "two"}], "concurrency": 2}
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["index"] for result in data["results"]] == [0, 1, 2]
+    assert data["results"][0]["answer"] == "answer to one"
+    assert data["results"][1]["error"] == "API Error"
+    assert data["succeeded"] == 2
+    assert data["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_batch_endpoint_stream(async_client):
+    """Test streamed batch sends one NDJSON line per item and a summary line"""
+    with patch("app.api.v1.chat.llm_manager") as mock_llm:
+        mock_llm.is_available.return_value = True
+        mock_llm.generate_with_usage = AsyncMock(return_value=LLMResult(text="Response", completion_tokens=1))
+
+        response = await async_client.post(
+            "/api/v1/chat/batch",
+            json={"items": [{"message": "one"}, {"message": "two"}], "stream": True}
+        )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.strip().split("\n")]
+    assert sorted(line["index"] for line in lines[:2]) == [0, 1]
+    assert lines[-1]["summary"]["succeeded"] == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_rag_endpoint(async_client):
+    """Test RAG chat returns the answer with citations and separate timings"""
+    result = {
+        "answer": "Paris [1].",
+        "citations": [{"number": 1, "document_id": 3, "chunk_index": 2, "chunk_id": 7,
+                       "filename": "france.txt", "similarity": 0.91}],
+        "context_tokens": 120,
+        "tokens_used": 3,
+        "retrieval_ms": 12.345,
+        "generation_ms": 456.789,
+    }
+    with patch("app.api.v1.chat.llm_manager") as mock_llm, \
+            patch("app.api.v1.chat.rag_service") as mock_rag:
+        mock_llm.is_available.return_value = True
+        mock_rag.answer = AsyncMock(return_value=result)
+
+        response = await async_client.post(
+            "/api/v1/chat/rag",
+            json={"message": "What is the capital of France?", "context_tokens": 500}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["answer"] == "Paris [1]."
+        assert data["tokens_used"] == 3
+        assert data["citations"][0]["document_id"] == 3
+        assert data["citations"][0]["chunk_index"] == 2
+        assert data["retrieval_ms"] == 12.35
+        assert data["generation_ms"] == 456.79
+        assert mock_rag.answer.await_args.kwargs["context_tokens"] == 500
+
+
+def test_chat_rag_endpoint_not_available(test_client: TestClient):
+    """Test RAG chat when LLM is not available"""
+    with patch("app.api.v1.chat.llm_manager") as mock_llm:
+        mock_llm.is_available.return_value = False
+
+        response = test_client.post("/api/v1/chat/rag", json={"message": "Hello"})
+
+        assert response.status_code == 503
@@ -0,0 +1,72 @@
+"""Tests for bounded-concurrency batch chat"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.llm import LLMResult
+from app.services.chat_batch import run_chat_batch
+
+
+class SlowLLM:
+    """LLM stand-in that sleeps per prompt and tracks how many calls overlap"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+
+    async def generate_with_usage(self, prompt, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[prompt])
+            if prompt == "bad":
+                raise Exception("API Error")
+            text = f"answer to {prompt}"
+            return LLMResult(text=text, completion_tokens=len(text.split()))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_batch_bounds_concurrency_and_isolates_errors():
+    """Test results stream in completion order, errors stay per item and concurrency is capped"""
+    llm = SlowLLM({"slow": 0.05, "bad": 0.0, "a": 0.0, "b": 0.0, "c": 0.0})
+    items = [{"prompt": prompt} for prompt in ["slow", "bad", "a", "b", "c"]]
+
+    results = [result async for result in run_chat_batch(items, concurrency=2, llm=llm)]
+
+    assert llm.max_in_flight == 2
+    assert results[-1]["index"] == 0  # The slow item does not hold up the rest
+    by_index = {result["index"]: result for result in results}
+    assert by_index[0]["answer"] == "answer to slow"
+    assert by_index[0]["tokens_used"] == 3
+    assert by_index[1]["answer"] is None
+    assert by_index[1]["error"] == "API Error"
+    assert all(by_index[idx]["error"] is None for idx in (0, 2, 3, 4))
+
+
+@pytest.mark.asyncio
+async def test_batch_close_cancels_outstanding_items():
+    """Test closing the result stream early cancels items still running"""
+    llm = SlowLLM({"fast": 0.0, "slow": 10.0})
+    results = run_chat_batch([{"prompt": "fast"}, {"prompt": "slow"}, {"prompt": "slow"}], concurrency=3, llm=llm)
+
+    first = await results.__anext__()
+    await results.aclose()
+
+    assert first["answer"] == "answer to fast"
+    assert llm.cancelled == 2
+    assert llm.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_empty():
+    """Test an empty batch yields nothing"""
+    assert [result async for result in run_chat_batch([], concurrency=4, llm=MagicMock())] == []
@@ -0,0 +1,188 @@
+"""Tests for collections and their partitioned vector indexes"""
+
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.db.collections import (
+    build_collection_index,
+    collection_index_ddl,
+    collection_index_name,
+    remove_collection_index,
+)
+from app.db.filtered_search import filter_clauses
+from app.db.models import Collection, Document, DocumentChunk
+from app.services.collection_service import CollectionExistsError, CollectionNotFoundError, CollectionService
+from app.services.vector_store import VectorRecord
+from app.services.vector_store.memory import MemoryVectorStore
+from tests.conftest import random_vector
+
+DIMENSION = settings.embedding_dimension
+
+
+def _record(chunk_id: int, collection_id):
+    return VectorRecord(
+        chunk_id=chunk_id,
+        document_id=chunk_id // 10,
+        embedding=random_vector(chunk_id),
+        content=f"chunk {chunk_id}",
+        chunk_index=chunk_id % 10,
+        collection_id=collection_id
+    )
+
+
+def test_collection_index_ddl(monkeypatch):
+    """Test each collection gets a partial index of the configured type"""
+    monkeypatch.setattr(settings, "embedding_quantization", "none")
+    monkeypatch.setattr(settings, "vector_index_type", "hnsw")
+    monkeypatch.setattr(settings, "hnsw_m", 16)
+    monkeypatch.setattr(settings, "hnsw_ef_construction", 64)
+
+    ddl = collection_index_ddl(7)
+    assert collection_index_name(7) in ddl
+    assert "USING hnsw" in ddl
+    assert ddl.endswith("WHERE collection_id = 7")
+
+    monkeypatch.setattr(settings, "vector_index_type", "ivfflat")
+    monkeypatch.setattr(settings, "ivfflat_lists", 0)
+    ddl = collection_index_ddl(7, row_count=40000)
+    assert "USING ivfflat" in ddl
+    assert "lists = 40" in ddl
+    assert ddl.endswith("WHERE collection_id = 7")
+
+    monkeypatch.setattr(settings, "vector_index_type", "none")
+    assert collection_index_ddl(7) is None
+
+    monkeypatch.setattr(settings, "embedding_quantization", "halfvec")
+    ddl = collection_index_ddl(7)
+    assert "halfvec" in ddl
+    assert ddl.endswith("WHERE collection_id = 7")
+
+
+def _autocommit_engine(fail_on: Optional[str] = None):
+    """Engine mock recording statements run on its autocommit connections"""
+    statements = []
+
+    async def execute(statement, *args):
+        statements.append(str(statement))
+        if fail_on and fail_on in str(statement):
+            raise RuntimeError("index build failed")
+
+    conn = MagicMock()
+    conn.dialect.name = "postgresql"
+    conn.execute = AsyncMock(side_effect=execute)
+    raw = MagicMock()
+    raw.execution_options = AsyncMock(return_value=conn)
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=raw)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine, raw, statements
+
+
+@pytest.mark.asyncio
+async def test_collection_index_built_and_dropped_concurrently(monkeypatch):
+    """Test index DDL runs concurrently on autocommit connections, cleaning up failed builds"""
+    monkeypatch.setattr(settings, "embedding_quantization", "none")
+    monkeypatch.setattr(settings, "vector_index_type", "hnsw")
+
+    engine, raw, statements = _autocommit_engine()
+    await build_collection_index(engine, 7)
+    raw.execution_options.assert_awaited_once_with(isolation_level="AUTOCOMMIT")
+    assert statements[0].startswith(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {collection_index_name(7)}")
+
+    await remove_collection_index(engine, 7)
+    assert statements[-1] == f"DROP INDEX CONCURRENTLY IF EXISTS {collection_index_name(7)}"
+
+    engine, _, statements = _autocommit_engine(fail_on="CREATE INDEX")
+    with pytest.raises(RuntimeError):
+        await build_collection_index(engine, 7)
+    assert statements[-1] == f"DROP INDEX CONCURRENTLY IF EXISTS {collection_index_name(7)}"
+
+
+def test_collection_filter_inlines_id():
+    """Test the collection id is rendered as a literal so the planner can pick the partial index"""
+    query = select(DocumentChunk.id).where(*filter_clauses({"collection_id": [7]}))
+
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+    assert "document_chunks.collection_id = 7" in sql
+
+
+@pytest.mark.asyncio
+async def test_memory_store_partitions_by_collection():
+    """Test scoped searches only see their collection and dropping one leaves the rest"""
+    store = MemoryVectorStore(DIMENSION)
+    await store.upsert([_record(11, 1), _record(12, 1), _record(21, 2), _record(31, None)])
+
+    scoped = await store.search(random_vector(21), limit=5, filters={"collection_id": 1})
+    assert {result["chunk_id"] for result in scoped} == {11, 12}
+
+    everything = await store.search(random_vector(21), limit=5)
+    assert everything[0]["chunk_id"] == 21
+    assert len(everything) == 4
+
+    # Moving a chunk to another collection replaces its old row
+    await store.upsert([_record(12, 2)])
+    scoped = await store.search(random_vector(12), limit=5, filters={"collection_id": 2})
+    assert {result["chunk_id"] for result in scoped} == {12, 21}
+
+    assert await store.delete_collection(2) == 2
+    assert await store.delete_collection(2) == 0
+    stats = await store.stats()
+    assert stats["vectors"] == 2
+    assert stats["collections"] == 1
+    assert await store.search(random_vector(21), limit=5, filters={"collection_id": 2}) == []
+
+
+@pytest.mark.asyncio
+async def test_collection_service_create_and_delete(test_session_factory):
+    """Test creating, listing and dropping a collection with its documents"""
+    indexing = MagicMock()
+    indexing.memory_index = MagicMock()
+    indexing.vector_store.uses_document_chunks = False
+    indexing.vector_store.delete_collection = AsyncMock(return_value=1)
+    indexing.search_cache.invalidate = AsyncMock()
+    service = CollectionService(indexing)
+
+    async with test_session_factory() as db:
+        with pytest.raises(ValueError, match="lowercase"):
+            await service.create(db, "Not Valid")
+
+        docs = await service.create(db, "docs", "Product docs")
+        other = await service.create(db, "other")
+        with pytest.raises(CollectionExistsError, match="already exists"):
+            await service.create(db, "docs")
+
+        assert await service.scope_filters(db, "docs", {"tags": ["a"]}) == {"tags": ["a"], "collection_id": docs.id}
+        assert await service.scope_filters(db, None, None) is None
+        with pytest.raises(CollectionNotFoundError):
+            await service.scope_filters(db, "missing", None)
+
+        for doc_id, collection_id in ((1, docs.id), (2, other.id)):
+            db.add(Document(
+                id=doc_id, filename=f"doc{doc_id}.txt", content_type="text/plain",
+                file_size=10, collection_id=collection_id
+            ))
+            db.add(DocumentChunk(
+                document_id=doc_id, chunk_index=0, content="text", collection_id=collection_id
+            ))
+        await db.commit()
+
+        listed = await service.list(db)
+        assert [(c["name"], c["documents"], c["chunks"]) for c in listed] == [("docs", 1, 1), ("other", 1, 1)]
+
+        assert await service.delete(db, docs) == {"documents": 1, "chunks": 1}
+
+        assert await service.get_by_name(db, "docs") is None
+        assert (await db.execute(select(func.count(Document.id)))).scalar() == 1
+        assert (await db.execute(select(func.count(DocumentChunk.id)))).scalar() == 1
+        assert (await db.execute(select(Collection.name))).scalars().all() == ["other"]
+
+    indexing.memory_index.remove_document.assert_called_once_with(1)
+    indexing.vector_store.delete_collection.assert_awaited_once_with(docs.id)
+    indexing.search_cache.invalidate.assert_awaited_once()
@@ -0,0 +1,92 @@
+"""Tests for conversation history and token-budgeted context windows"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.llm import LLMResult
+from app.db.conversations import MESSAGE_TOKEN_OVERHEAD, context_window_query
+from app.db.models import Conversation, Message
+from app.services.conversation_service import ConversationService
+
+
+def _llm(answer: str = "four words of answer"):
+    llm = MagicMock()
+    llm.count_tokens_many = AsyncMock(side_effect=lambda texts: [len(text.split()) for text in texts])
+    llm.generate_with_usage = AsyncMock(return_value=LLMResult(text=answer, completion_tokens=len(answer.split())))
+    return llm
+
+
+def test_context_window_query_is_one_windowed_statement():
+    """Test history is read newest-first through the index with a running token total"""
+    sql = str(context_window_query(3, 500, 100).compile(dialect=postgresql.dialect()))
+
+    assert sql.count("SELECT") == 3
+    assert "sum(" in sql and "OVER (ORDER BY" in sql
+    assert "ORDER BY messages.id DESC" in sql
+    assert "coalesce(messages.tokens_used" in sql
+
+
+@pytest.mark.asyncio
+async def test_load_context_keeps_newest_turns_within_budget(test_session_factory):
+    """Test the newest contiguous turns that fit are returned oldest first"""
+    service = ConversationService(_llm())
+    async with test_session_factory() as db:
+        conversation = await service.create(db, session_id="s1")
+        for idx, tokens in enumerate([50, 10, 20, 30]):
+            db.add(Message(conversation_id=conversation.id, role="user", content=f"turn {idx}", tokens_used=tokens))
+        # Legacy row without a cached count: 40 characters at ~4 per token
+        db.add(Message(conversation_id=conversation.id, role="assistant", content="x" * 40))
+        await db.commit()
+
+        overhead = MESSAGE_TOKEN_OVERHEAD
+        history = await service.load_context(db, conversation.id, budget=10 + 30 + 20 + 3 * overhead)
+
+        assert [turn["content"] for turn in history] == ["turn 2", "turn 3", "x" * 40]
+        assert [turn["tokens"] for turn in history] == [20 + overhead, 30 + overhead, 10 + overhead]
+        assert await service.load_context(db, conversation.id, budget=5) == []
+        assert len(await service.load_context(db, conversation.id, budget=10000, max_messages=2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_stores_turns_and_sends_budgeted_history(test_session_factory):
+    """Test a turn sends only history that fits and stores both messages with token counts"""
+    llm = _llm()
+    service = ConversationService(llm)
+    async with test_session_factory() as db:
+        conversation = await service.create(db, session_id="s1")
+        conversation_id = conversation.id
+        db.add_all([
+            Message(conversation_id=conversation.id, role="user", content="old question", tokens_used=500),
+            Message(conversation_id=conversation.id, role="assistant", content="recent answer", tokens_used=2),
+        ])
+        await db.commit()
+
+        result = await service.chat(db, conversation, "what now", system_prompt="be brief", context_tokens=100)
+
+        assert result["answer"] == "four words of answer"
+        assert result["tokens_used"] == 4
+        assert result["context_messages"] == 1
+        assert result["context_tokens"] == (2 + 2 + 2) + 3 * MESSAGE_TOKEN_OVERHEAD
+        assert llm.generate_with_usage.call_args.kwargs["history"] == [{"role": "assistant", "content": "recent answer"}]
+
+        messages = (await db.execute(
+            select(Message).where(Message.conversation_id == conversation.id).order_by(Message.id)
+        )).scalars().all()
+        assert [(m.role, m.content, m.tokens_used) for m in messages[2:]] == [
+            ("user", "what now", 2),
+            ("assistant", "four words of answer", 4),
+        ]
+        assert (await db.get(Conversation, conversation.id)).title == "what now"
+
+        llm.generate_with_usage.side_effect = Exception("API Error")
+        with pytest.raises(Exception, match="API Error"):
+            await service.chat(db, conversation, "again")
+        await db.rollback()
+        conversation = await service.get(db, conversation_id)
+        assert len(await service.get_messages(db, conversation_id)) == 4
+
+        assert await service.delete(db, conversation) == 4
+        assert await service.get(db, conversation_id) is None
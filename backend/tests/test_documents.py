@@ -3,6 +3,7 @@
 import pytest
 from io import BytesIO
 from httpx import AsyncClient
+from unittest.mock import AsyncMock, patch
 
 from app.main import app
 
@@ -150,3 +151,44 @@ async def test_get_indexing_stats():
         assert "failed" in data
         assert "pending" in data
         assert "total_chunks" in data
+
+
+@pytest.mark.asyncio
+async def test_search_documents():
+    """Test semantic search endpoint"""
+    results = [{
+        "chunk_id": 1,
+        "document_id": 1,
+        "filename": "test.txt",
+        "title": "Test Document",
+        "content": "This is a test document with some content.",
+        "chunk_index": 0,
+        "similarity": 0.92,
+        "metadata": {}
+    }]
+
+    with patch(
+        "app.api.v1.documents.indexing_service.search_documents",
+        new=AsyncMock(return_value=results)
+    ) as mock_search:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/documents/search",
+                json={"query": "test document", "limit": 3, "min_similarity": 0.5}
+            )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["results"][0]["similarity"] == 0.92
+    assert mock_search.call_args.kwargs["limit"] == 3
+    assert mock_search.call_args.kwargs["min_similarity"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_search_documents_validation():
+    """Test search request validation"""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/documents/search", json={"query": "", "limit": 0})
+
+        assert response.status_code == 422
@@ -0,0 +1,238 @@
+"""Tests for embedding request coalescing"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.core.embedding_base import BaseEmbeddingProvider
+from app.core.embedding_coalescer import EmbeddingCoalescer
+from app.core.embedding_cache import EmbeddingCache
+from app.core.embeddings import EmbeddingsService
+
+
+class RecordingBatch:
+    """Batch function recording every call"""
+
+    def __init__(self, fail_on=None, error=None):
+        self.calls = []
+        self.fail_on = fail_on
+        self.error = error
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        if self.fail_on is not None and self.fail_on in texts:
+            error = Exception("invalid input")
+            error.status_code = 400
+            raise error
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_batch():
+    """Test calls within the window are sent together and fanned back out"""
+    batch = RecordingBatch()
+    coalescer = EmbeddingCoalescer(batch, window_ms=20, max_batch_size=64)
+
+    results = await asyncio.gather(*(coalescer.embed("x" * n) for n in range(1, 6)))
+
+    assert len(batch.calls) == 1
+    assert batch.calls[0] == ["x", "xx", "xxx", "xxxx", "xxxxx"]
+    assert [result[0] for result in results] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert coalescer.stats()["average_batch_size"] == 5.0
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_flushes_immediately():
+    """Test a full queue is sent without waiting for the window"""
+    batch = RecordingBatch()
+    coalescer = EmbeddingCoalescer(batch, window_ms=10_000, max_batch_size=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(coalescer.embed("a"), coalescer.embed("bb")),
+        timeout=1.0
+    )
+
+    assert batch.calls == [["a", "bb"]]
+    assert results == [[1.0, 1.0], [2.0, 1.0]]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_are_embedded_once():
+    """Test identical concurrent texts share one provider input"""
+    batch = RecordingBatch()
+    coalescer = EmbeddingCoalescer(batch, window_ms=10)
+
+    results = await asyncio.gather(coalescer.embed("same"), coalescer.embed("same"))
+
+    assert batch.calls == [["same"]]
+    assert results[0] == results[1]
+
+
+@pytest.mark.asyncio
+async def test_empty_text_fails_only_its_caller():
+    """Test empty input is rejected before queueing"""
+    batch = RecordingBatch()
+    coalescer = EmbeddingCoalescer(batch, window_ms=10)
+
+    results = await asyncio.gather(
+        coalescer.embed("ok"),
+        coalescer.embed("  "),
+        return_exceptions=True
+    )
+
+    assert results[0] == [2.0, 1.0]
+    assert isinstance(results[1], ValueError)
+    assert batch.calls == [["ok"]]
+
+
+@pytest.mark.asyncio
+async def test_bad_request_is_isolated_to_its_caller():
+    """Test a rejected batch is retried per text so only the bad input fails"""
+    batch = RecordingBatch(fail_on="bad")
+    coalescer = EmbeddingCoalescer(batch, window_ms=10)
+
+    results = await asyncio.gather(
+        coalescer.embed("good"),
+        coalescer.embed("bad"),
+        coalescer.embed("fine"),
+        return_exceptions=True
+    )
+
+    assert results[0] == [4.0, 1.0]
+    assert isinstance(results[1], Exception)
+    assert "invalid input" in str(results[1])
+    assert results[2] == [4.0, 1.0]
+    assert len(batch.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_provider_outage_fails_every_caller():
+    """Test non-client errors are propagated without per-text retries"""
+    batch = RecordingBatch(error=ConnectionError("provider down"))
+    coalescer = EmbeddingCoalescer(batch, window_ms=10)
+
+    results = await asyncio.gather(
+        coalescer.embed("a"),
+        coalescer.embed("b"),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert len(batch.calls) == 1
+    assert coalescer.stats()["failures"] == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_vector_result_is_an_error():
+    """Test texts the provider could not embed raise for their caller"""
+    async def batch_fn(texts):
+        return [[0.0, 0.0] if text == "lost" else [1.0, 0.0] for text in texts]
+
+    coalescer = EmbeddingCoalescer(batch_fn, window_ms=10)
+    results = await asyncio.gather(
+        coalescer.embed("kept"),
+        coalescer.embed("lost"),
+        return_exceptions=True
+    )
+
+    assert results[0] == [1.0, 0.0]
+    assert isinstance(results[1], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_break_batch():
+    """Test a caller cancelled before the flush is skipped"""
+    batch = RecordingBatch()
+    coalescer = EmbeddingCoalescer(batch, window_ms=20)
+
+    cancelled = asyncio.ensure_future(coalescer.embed("gone"))
+    kept = asyncio.ensure_future(coalescer.embed("kept"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == [4.0, 1.0]
+    assert batch.calls == [["kept"]]
+
+
+class CountingProvider(BaseEmbeddingProvider):
+    """Provider counting single and batch calls"""
+
+    name = "counting"
+    model = "counting-model"
+
+    def __init__(self):
+        self.single_calls = 0
+        self.batch_calls = 0
+
+    async def generate_embedding(self, text):
+        self.single_calls += 1
+        return [1.0, 0.0]
+
+    async def generate_embeddings_batch(self, texts):
+        self.batch_calls += 1
+        return [[1.0, float(i)] for i, _ in enumerate(texts)]
+
+    def get_dimension(self):
+        return 2
+
+
+@pytest.mark.asyncio
+async def test_service_coalesces_single_embeddings():
+    """Test EmbeddingsService routes concurrent single calls through the coalescer"""
+    with patch("app.core.embeddings.settings") as mock_settings:
+        mock_settings.llm_provider = "unused"
+        mock_settings.embedding_batch_size = 100
+        mock_settings.embedding_max_concurrency = 4
+        mock_settings.embedding_batch_max_retries = 3
+        mock_settings.embedding_cache_enabled = False
+        mock_settings.embedding_coalesce_window_ms = 10
+        mock_settings.embedding_coalesce_max_batch = 64
+        mock_settings.embedding_dimension = 2
+
+        provider = CountingProvider()
+        with patch.object(EmbeddingsService, "_initialize_provider", lambda self: setattr(self, "provider", provider)):
+            service = EmbeddingsService()
+
+        results = await asyncio.gather(*(service.generate_embedding(f"query {i}") for i in range(10)))
+
+    assert provider.batch_calls == 1
+    assert provider.single_calls == 0
+    assert [result[1] for result in results] == [float(i) for i in range(10)]
+    assert service.get_coalescer_stats()["requests"] == 10
+
+    with pytest.raises(Exception, match="Embedding generation failed"):
+        await service.generate_embedding("")
+
+
+@pytest.mark.asyncio
+async def test_service_does_not_cache_failed_coalesced_items():
+    """Test an item the batch could not embed fails its caller and stays out of the cache"""
+    with patch("app.core.embeddings.settings") as mock_settings:
+        mock_settings.llm_provider = "unused"
+        mock_settings.embedding_batch_size = 100
+        mock_settings.embedding_max_concurrency = 4
+        mock_settings.embedding_batch_max_retries = 3
+        mock_settings.embedding_coalesce_window_ms = 10
+        mock_settings.embedding_coalesce_max_batch = 64
+        mock_settings.embedding_dimension = 2
+
+        provider = CountingProvider()
+        provider.generate_embeddings_batch = lambda texts: asyncio.sleep(
+            0, [[0.0, 0.0] if text == "lost" else [1.0, 0.0] for text in texts]
+        )
+        with patch.object(EmbeddingsService, "_initialize_provider", lambda self: setattr(self, "provider", provider)):
+            service = EmbeddingsService(cache=EmbeddingCache(max_entries=10))
+
+        results = await asyncio.gather(
+            service.generate_embedding("kept"),
+            service.generate_embedding("lost"),
+            return_exceptions=True
+        )
+
+    assert results[0] == [1.0, 0.0]
+    assert isinstance(results[1], Exception)
+    assert await service.cache.get_many([service._cache_key("lost", 2)]) == {}
@@ -1,10 +1,40 @@
 """Tests for embeddings service"""
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import os
 
-from app.core.embeddings import EmbeddingsService, GeminiEmbeddingProvider, OpenAIEmbeddingProvider
+from app.core.embedding_base import BaseEmbeddingProvider, truncate_to_tokens
+from app.core.embedding_cache import EmbeddingCache
+from app.core.rate_limit import AdaptiveRateLimiter
+from app.core.embeddings import (
+    EmbeddingsService,
+    GeminiEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    pack_batches,
+)
+
+
+class FakeTokenizer:
+    """Whitespace tokenizer standing in for tiktoken"""
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts):
+        return [text.split() for text in texts]
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+@pytest.fixture(autouse=True)
+def fake_tokenizer():
+    """Avoid downloading tiktoken encodings in unit tests"""
+    with patch("app.core.embedding_base.get_embedding_tokenizer", return_value=FakeTokenizer()):
+        yield
 
 
 @pytest.fixture
@@ -12,8 +42,17 @@ def mock_settings_gemini():
     """Mock settings for Gemini provider"""
     with patch("app.core.embeddings.settings") as mock_settings:
         mock_settings.llm_provider = "gemini"
+        mock_settings.embedding_provider = ""
+        mock_settings.embedding_dimension = 768
         mock_settings.gemini_api_key = "test-gemini-key"
         mock_settings.embedding_model = "models/embedding-001"
+        mock_settings.embedding_batch_size = 100
+        mock_settings.embedding_max_concurrency = 4
+        mock_settings.embedding_batch_max_retries = 3
+        mock_settings.gemini_embedding_max_workers = 4
+        mock_settings.embedding_cache_enabled = False
+        mock_settings.embedding_coalesce_window_ms = 0
+        mock_settings.embedding_coalesce_max_batch = 64
         yield mock_settings
 
 
@@ -22,8 +61,18 @@ def mock_settings_openai():
     """Mock settings for OpenAI provider"""
     with patch("app.core.embeddings.settings") as mock_settings:
         mock_settings.llm_provider = "openai"
+        mock_settings.embedding_provider = ""
+        mock_settings.embedding_dimension = 1536
         mock_settings.openai_api_key = "test-openai-key"
+        mock_settings.openai_base_url = ""
         mock_settings.embedding_model = "text-embedding-3-small"
+        mock_settings.embedding_batch_size = 100
+        mock_settings.embedding_max_concurrency = 4
+        mock_settings.embedding_batch_max_retries = 3
+        mock_settings.gemini_embedding_max_workers = 4
+        mock_settings.embedding_cache_enabled = False
+        mock_settings.embedding_coalesce_window_ms = 0
+        mock_settings.embedding_coalesce_max_batch = 64
         yield mock_settings
 
 
@@ -53,11 +102,18 @@ async def test_generate_embedding_empty_text(mock_settings_gemini):
     assert "cannot be empty" in str(exc_info.value).lower()
 
 
+def fake_gemini_embed_content(model, content, task_type=None):
+    """Mimic genai.embed_content for single and multi-content requests"""
+    if isinstance(content, list):
+        return {"embedding": [[0.1] * 768 for _ in content]}
+    return {"embedding": [0.1] * 768}
+
+
 @pytest.mark.asyncio
 async def test_generate_embeddings_batch_gemini(mock_settings_gemini):
     """Test generating embeddings in batch with Gemini"""
     with patch("app.core.embeddings.genai.embed_content") as mock_embed:
-        mock_embed.return_value = {"embedding": [0.1] * 768}
+        mock_embed.side_effect = fake_gemini_embed_content
 
         service = EmbeddingsService()
         texts = ["Text one", "Text two", "Text three"]
@@ -157,3 +213,290 @@ async def test_gemini_provider():
 
         assert len(embedding) == 768
         assert provider.get_dimension() == 768
+
+
+@pytest.mark.asyncio
+async def test_gemini_provider_uses_multi_content_batches():
+    """Test that Gemini batches use one request per sub-batch and keep order"""
+    with patch("app.core.embeddings.genai") as mock_genai:
+        def embed(model, content, task_type=None):
+            return {"embedding": [[float(len(text))] * 768 for text in content]}
+
+        mock_genai.embed_content.side_effect = embed
+
+        provider = GeminiEmbeddingProvider("test-key", batch_size=2)
+        texts = ["a", "", "ccc", "dd", "   ", "e"]
+        embeddings = await provider.generate_embeddings_batch(texts)
+
+        assert mock_genai.embed_content.call_count == 2
+        assert [emb[0] for emb in embeddings] == [1.0, 0.0, 3.0, 2.0, 0.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_gemini_provider_batch_falls_back_per_item():
+    """Test per-item fallback with zero vectors when a batch request fails"""
+    with patch("app.core.embeddings.genai") as mock_genai, \
+            patch("app.core.embeddings.asyncio.sleep", new=AsyncMock()):
+        def embed(model, content, task_type=None):
+            if isinstance(content, list):
+                raise RuntimeError("batch rejected")
+            if content == "bad":
+                raise RuntimeError("item rejected")
+            return {"embedding": [1.0] * 768}
+
+        mock_genai.embed_content.side_effect = embed
+
+        provider = GeminiEmbeddingProvider("test-key")
+        embeddings = await provider.generate_embeddings_batch(["good", "bad", "fine"])
+
+        assert embeddings[0] == [1.0] * 768
+        assert embeddings[1] == [0.0] * 768
+        assert embeddings[2] == [1.0] * 768
+
+
+@pytest.mark.asyncio
+async def test_gemini_provider_batch_does_not_fan_out_when_throttled():
+    """Test a batch the rate limiter gave up on is raised instead of retried item by item"""
+    class ResourceExhausted(Exception):
+        pass
+
+    with patch("app.core.embeddings.genai") as mock_genai, \
+            patch("app.core.rate_limit.asyncio.sleep", new=AsyncMock()):
+        mock_genai.embed_content.side_effect = ResourceExhausted("quota exceeded")
+
+        provider = GeminiEmbeddingProvider("test-key")
+        provider.rate_limiter = AdaptiveRateLimiter("gemini-test", max_retries=1)
+        with pytest.raises(ResourceExhausted):
+            await provider.generate_embeddings_batch(["a", "b", "c"])
+
+        # One batch request plus one limiter retry, no per-item requests
+        assert mock_genai.embed_content.call_count == 2
+
+
+class FakeBatchProvider(BaseEmbeddingProvider):
+    """Provider that records concurrency and fails selected batches"""
+
+    def __init__(self, fail_first_for=None, delay: float = 0.01):
+        self.fail_first_for = set(fail_first_for or [])
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_embedding(self, text):
+        return [float(len(text))]
+
+    async def generate_embeddings_batch(self, texts):
+        self.calls.append(texts[0])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if texts[0] in self.fail_first_for:
+                self.fail_first_for.discard(texts[0])
+                raise RuntimeError("transient failure")
+            return [[float(t)] for t in texts]
+        finally:
+            self.in_flight -= 1
+
+    def get_dimension(self):
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_concurrent_preserves_order(mock_settings_gemini):
+    """Test that concurrent batches keep input order and respect the concurrency cap"""
+    service = EmbeddingsService(batch_size=2, max_concurrency=3)
+    service.provider = FakeBatchProvider()
+    texts = [str(i) for i in range(11)]
+
+    embeddings = await service.generate_embeddings_batch(texts)
+
+    assert embeddings == [[float(i)] for i in range(11)]
+    assert service.provider.max_in_flight == 3
+    assert service.last_batch_stats.batches == 6
+    assert service.last_batch_stats.texts == 11
+    assert service.last_batch_stats.texts_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_retries_only_failed_batch(mock_settings_gemini):
+    """Test that only the failing batch is retried"""
+    service = EmbeddingsService(batch_size=2, max_concurrency=2, retry_base_delay=0)
+    service.provider = FakeBatchProvider(fail_first_for=["2"])
+
+    embeddings = await service.generate_embeddings_batch([str(i) for i in range(6)])
+
+    assert embeddings == [[float(i)] for i in range(6)]
+    assert sorted(service.provider.calls) == ["0", "2", "2", "4"]
+    assert service.last_batch_stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_gives_up_after_retries(mock_settings_gemini):
+    """Test that a persistently failing batch raises after max retries"""
+    service = EmbeddingsService(batch_size=2, max_retries=1, retry_base_delay=0)
+    provider = FakeBatchProvider()
+    provider.generate_embeddings_batch = AsyncMock(side_effect=RuntimeError("boom"))
+    service.provider = provider
+
+    with pytest.raises(Exception, match="Batch embedding generation failed"):
+        await service.generate_embeddings_batch(["a", "b", "c"])
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_leaves_limiter_errors_to_the_limiter(mock_settings_gemini):
+    """Test errors the rate limiter already retried are not retried again per batch"""
+    class RateLimitError(Exception):
+        status_code = 429
+
+    service = EmbeddingsService(batch_size=2, max_retries=3, retry_base_delay=0)
+    provider = FakeBatchProvider()
+    provider.generate_embeddings_batch = AsyncMock(side_effect=RateLimitError("rate limited"))
+    service.provider = provider
+
+    with pytest.raises(Exception, match="Batch embedding generation failed"):
+        await service.generate_embeddings_batch(["a", "b"])
+
+    provider.generate_embeddings_batch.assert_awaited_once()
+    assert service.last_batch_stats.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_embedding_cache_sends_only_misses(mock_settings_gemini):
+    """Test that batch lookups only send uncached, de-duplicated texts to the provider"""
+    cache = EmbeddingCache(max_entries=100)
+    service = EmbeddingsService(batch_size=10, cache=cache)
+    service.provider = FakeBatchProvider()
+    service.provider.model = "fake"
+
+    first = await service.generate_embeddings_batch(["1", "2", "2"])
+    service.provider.generate_embeddings_batch = AsyncMock(side_effect=lambda texts: [[float(t)] for t in texts])
+    second = await service.generate_embeddings_batch(["2", "3", "1", ""])
+
+    assert first == [[1.0], [2.0], [2.0]]
+    assert second == [[2.0], [3.0], [1.0], [0.0]]
+    service.provider.generate_embeddings_batch.assert_awaited_once_with(["3"])
+    stats = service.get_cache_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_embedding_cache_persistent_tier(tmp_path, mock_settings_gemini):
+    """Test that embeddings survive a restart through the persistent tier"""
+    path = str(tmp_path / "cache.sqlite3")
+    service = EmbeddingsService(cache=EmbeddingCache(max_entries=1, path=path))
+    service.provider = FakeBatchProvider()
+    await service.generate_embeddings_batch(["1", "2"])
+
+    assert service.get_cache_stats()["evictions"] == 1
+
+    restarted = EmbeddingsService(cache=EmbeddingCache(max_entries=10, path=path))
+    restarted.provider = FakeBatchProvider()
+    restarted.provider.generate_embeddings_batch = AsyncMock()
+
+    embeddings = await restarted.generate_embeddings_batch(["1", "2"])
+
+    assert embeddings == [[1.0], [2.0]]
+    restarted.provider.generate_embeddings_batch.assert_not_awaited()
+    assert restarted.get_cache_stats()["persistent_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_cache_skips_zero_vector_single_embedding(mock_settings_gemini):
+    """Test a zero-vector fallback from a failed single call is not cached"""
+    cache = EmbeddingCache(max_entries=10)
+    service = EmbeddingsService(cache=cache)
+    service.provider = FakeBatchProvider()
+    service.provider.generate_embedding = AsyncMock(side_effect=[[0.0], [3.0]])
+
+    assert await service.generate_embedding("abc") == [0.0]
+    assert await service.generate_embedding("abc") == [3.0]
+    assert await service.generate_embedding("abc") == [3.0]
+
+    assert service.provider.generate_embedding.await_count == 2
+    assert service.get_cache_stats()["hits"] == 1
+
+
+def test_embedding_cache_key_includes_provider_and_model():
+    """Test that cache keys separate providers, models and dimensions"""
+    key = EmbeddingCache.make_key("openai", "text-embedding-3-small", 1536, "hello")
+
+    assert key != EmbeddingCache.make_key("gemini", "text-embedding-3-small", 1536, "hello")
+    assert key != EmbeddingCache.make_key("openai", "text-embedding-3-large", 1536, "hello")
+    assert key != EmbeddingCache.make_key("openai", "text-embedding-3-small", 768, "hello")
+    assert key == EmbeddingCache.make_key("openai", "text-embedding-3-small", 1536, "hello")
+
+
+def test_pack_batches_respects_token_and_size_limits():
+    """Test greedy token-budget packing"""
+    batches = pack_batches([400, 300, 200, 900, 50, 50, 50], max_batch_tokens=1000, max_batch_size=3)
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_truncate_to_tokens():
+    """Test that truncation counts tokens rather than characters"""
+    text = "alpha beta gamma delta epsilon"
+
+    assert truncate_to_tokens(text, 10) == text
+    assert truncate_to_tokens(text, 2) == "alpha beta"
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_packs_by_token_count(mock_settings_gemini):
+    """Test that provided token counts drive batch packing"""
+    service = EmbeddingsService(batch_size=100)
+    provider = FakeBatchProvider()
+    provider.max_batch_tokens = 100
+    service.provider = provider
+
+    texts = [str(i) for i in range(6)]
+    embeddings = await service.generate_embeddings_batch(texts, token_counts=[60, 30, 30, 90, 5, 5])
+
+    assert embeddings == [[float(i)] for i in range(6)]
+    assert sorted(provider.calls) == ["0", "2", "3"]
+    assert service.last_batch_stats.tokens == 220
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_splits_oversized_batch(mock_settings_gemini):
+    """Test that a batch rejected as too large is split in half and retried"""
+    service = EmbeddingsService(batch_size=100, max_retries=0)
+    provider = FakeBatchProvider()
+    original = provider.generate_embeddings_batch
+
+    async def reject_large(texts):
+        if len(texts) > 2:
+            raise RuntimeError("Request too large for model")
+        return await original(texts)
+
+    provider.generate_embeddings_batch = reject_large
+    service.provider = provider
+
+    embeddings = await service.generate_embeddings_batch([str(i) for i in range(5)])
+
+    assert embeddings == [[float(i)] for i in range(5)]
+    assert service.last_batch_stats.splits == 2
+    assert service.last_batch_stats.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_gemini_oversized_batch_is_split_by_service(mock_settings_gemini):
+    """Test a Gemini batch rejected as too large reaches the service's split logic"""
+    def embed(model, content, task_type=None):
+        if isinstance(content, list) and len(content) > 2:
+            raise RuntimeError("Request payload size exceeds the limit")
+        return fake_gemini_embed_content(model, content, task_type)
+
+    with patch("app.core.embeddings.genai.embed_content") as mock_embed:
+        mock_embed.side_effect = embed
+
+        service = EmbeddingsService(batch_size=100, max_retries=0)
+        embeddings = await service.generate_embeddings_batch([f"text {i}" for i in range(4)])
+
+    assert embeddings == [[0.1] * 768] * 4
+    assert service.last_batch_stats.splits == 1
+    # One rejected batch plus the two halves, no per-item requests
+    assert mock_embed.call_count == 3
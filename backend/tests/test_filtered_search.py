@@ -0,0 +1,181 @@
+"""Tests for metadata-filtered search planning and filter SQL"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core.search_filters import matches_filters, normalize_filters
+from app.db.filtered_search import (
+    SearchPlan,
+    filtered_chunks,
+    filtered_scan_settings,
+    plan_filtered_search,
+)
+from app.db.models import DocumentChunk
+from app.db.vector_indexes import semantic_search_query
+from app.services.vector_store import pgvector as pgvector_store
+
+DIMENSION = settings.embedding_dimension
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def _db(dialect: str = "postgresql", matching: int = 0, total: int = 0):
+    db = MagicMock()
+    db.bind.dialect.name = dialect
+    count, estimate = MagicMock(), MagicMock()
+    count.scalar_one.return_value = matching
+    estimate.scalar.return_value = total
+    db.execute = AsyncMock(side_effect=[count, estimate])
+    return db
+
+
+@pytest.fixture
+def scan_settings(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_quantization", "none")
+    monkeypatch.setattr(settings, "vector_index_type", "hnsw")
+    monkeypatch.setattr(settings, "hnsw_ef_search", 40)
+    monkeypatch.setattr(settings, "vector_iterative_scan", "relaxed_order")
+    monkeypatch.setattr(settings, "vector_max_scan_tuples", 20000)
+    monkeypatch.setattr(settings, "filter_exact_scan_max_rows", 100)
+
+
+def test_normalize_filters():
+    """Test values become lists, empty values are dropped and unknown keys rejected"""
+    assert normalize_filters(None) == {}
+    assert normalize_filters({"document_id": 3, "tags": ["a", "b"], "language": None}) == {
+        "document_id": [3],
+        "tags": ["a", "b"],
+    }
+    assert normalize_filters({"metadata": {"section": "intro", "page": None}}) == {
+        "metadata": {"section": ["intro"]}
+    }
+
+    with pytest.raises(ValueError, match="section"):
+        normalize_filters({"section": "intro"})
+
+
+def test_matches_filters():
+    """Test document fields, tag overlap and chunk metadata matching"""
+    fields = {"document_id": 1, "tags": ["faq", "billing"], "language": "en", "content_type": "text/plain"}
+    metadata = {"section": "body", "page": 2}
+
+    assert matches_filters(fields, metadata, None)
+    assert matches_filters(fields, metadata, normalize_filters({"tags": ["billing", "legal"], "language": "en"}))
+    assert matches_filters(fields, metadata, normalize_filters({"metadata": {"page": [1, 2]}}))
+    assert not matches_filters(fields, metadata, normalize_filters({"tags": "legal"}))
+    assert not matches_filters(fields, metadata, normalize_filters({"content_type": "application/pdf"}))
+    assert not matches_filters(fields, metadata, normalize_filters({"metadata": {"section": "intro"}}))
+
+
+def test_filter_clauses_sql():
+    """Test filters compile to index-friendly jsonb operators and join documents when needed"""
+    sql = _sql(filtered_chunks(
+        {"tags": ["faq", "billing"], "language": ["en", "de"], "metadata": {"section": "body"}},
+        DocumentChunk.id
+    ))
+
+    assert "JOIN documents ON documents.id = document_chunks.document_id" in sql
+    assert "CAST(documents.tags AS JSONB) ?| CAST(" in sql
+    assert "documents.language IN" in sql
+    assert "CAST(document_chunks.chunk_metadata AS JSONB) @>" in sql
+
+    sql = _sql(filtered_chunks({"document_id": 3}, DocumentChunk.id))
+    assert "JOIN documents" not in sql
+    assert "document_chunks.document_id =" in sql
+
+
+def test_exact_search_query_prefilters(monkeypatch):
+    """Test the exact plan materializes the filtered rows and skips the ANN index"""
+    monkeypatch.setattr(settings, "embedding_quantization", "none")
+    sql = _sql(semantic_search_query([0.1] * DIMENSION, limit=5, filters={"tags": "faq"}, exact=True))
+
+    assert "WITH filtered AS MATERIALIZED" in sql
+    assert "CAST(documents.tags AS JSONB) ?|" in sql
+    assert "filtered.embedding <=>" in sql
+
+
+@pytest.mark.asyncio
+async def test_plan_filtered_search(scan_settings):
+    """Test selective filters are planned as exact scans and broad ones as ANN scans"""
+    assert await plan_filtered_search(_db(), None) is None
+    assert await plan_filtered_search(_db("sqlite"), {"tags": "faq"}) is None
+
+    plan = await plan_filtered_search(_db(matching=40, total=50000), {"tags": "faq"})
+    assert plan.strategy == "exact"
+
+    plan = await plan_filtered_search(_db(matching=101, total=50000), {"tags": "faq"})
+    assert plan.strategy == "ann"
+    assert plan.selectivity == pytest.approx(101 / 50000)
+
+
+def test_filtered_scan_settings(scan_settings):
+    """Test iterative scans are enabled, or the scan widened when they are off"""
+    plan = SearchPlan(strategy="ann", matching_rows=1000, total_rows=100000)
+
+    assert filtered_scan_settings(plan, limit=5) == [
+        "SET LOCAL hnsw.iterative_scan = relaxed_order",
+        "SET LOCAL hnsw.max_scan_tuples = 20000",
+    ]
+    assert filtered_scan_settings(plan, limit=5, mode="off") == ["SET LOCAL hnsw.ef_search = 500"]
+
+
+class FakePostgresError(Exception):
+    """Driver error carrying a SQLSTATE like asyncpg's"""
+
+    def __init__(self, message, sqlstate):
+        super().__init__(message)
+        self.sqlstate = sqlstate
+
+
+async def _apply_with_rejected_iterative_scan(error):
+    statements = []
+
+    async def execute(statement):
+        if "iterative_scan" in str(statement):
+            raise DBAPIError("SET", {}, error)
+        statements.append(str(statement))
+
+    @asynccontextmanager
+    async def begin_nested():
+        yield
+
+    db = MagicMock()
+    db.execute = execute
+    db.begin_nested = begin_nested
+    plan = SearchPlan(strategy="ann", matching_rows=1000, total_rows=100000)
+
+    await pgvector_store.apply_filtered_scan_settings(db, plan, limit=5)
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_apply_filtered_scan_settings_falls_back(scan_settings, monkeypatch):
+    """Test a server without iterative scans gets a widened scan instead"""
+    monkeypatch.setattr(pgvector_store, "_iterative_scan_supported", True)
+
+    statements = await _apply_with_rejected_iterative_scan(
+        FakePostgresError('unrecognized configuration parameter "hnsw.iterative_scan"', "42704")
+    )
+
+    assert statements == ["SET LOCAL hnsw.ef_search = 500"]
+    assert pgvector_store._iterative_scan_supported is False
+
+
+@pytest.mark.asyncio
+async def test_apply_filtered_scan_settings_keeps_support_on_other_errors(scan_settings, monkeypatch):
+    """Test an unrelated error widens this scan without disabling iterative scans for good"""
+    monkeypatch.setattr(pgvector_store, "_iterative_scan_supported", True)
+
+    statements = await _apply_with_rejected_iterative_scan(
+        FakePostgresError("canceling statement due to statement timeout", "57014")
+    )
+
+    assert statements == ["SET LOCAL hnsw.ef_search = 500"]
+    assert pgvector_store._iterative_scan_supported is True
@@ -0,0 +1,137 @@
+"""Tests for the in-memory HNSW index"""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hnswlib")
+
+from app.core.hnsw_index import HNSWIndex
+
+
+def _vectors(n: int = 200, dim: int = 16, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_add_and_search():
+    """Test nearest neighbour search returns the query's own id first"""
+    vectors = _vectors()
+    index = HNSWIndex(16, capacity=256)
+    index.add(range(100, 300), vectors)
+
+    results = index.search(vectors[:3], k=5)
+
+    assert len(index) == 200
+    for offset, hits in enumerate(results):
+        assert hits[0][0] == 100 + offset
+        assert abs(hits[0][1] - 1.0) < 1e-5
+        assert len(hits) == 5
+
+
+def test_min_similarity_filter():
+    """Test results below the threshold are dropped"""
+    vectors = _vectors()
+    index = HNSWIndex(16)
+    index.add(range(200), vectors)
+
+    hits = index.search(vectors[0], k=10, min_similarity=0.99)[0]
+
+    assert [item_id for item_id, _ in hits] == [0]
+
+
+def test_delete_tombstones_and_revive():
+    """Test deleted ids are skipped and can be inserted again"""
+    vectors = _vectors()
+    index = HNSWIndex(16)
+    index.add(range(200), vectors)
+
+    assert index.delete([0, 1, 999]) == 2
+    assert 0 not in index
+    assert index.search(vectors[0], k=1)[0][0][0] != 0
+    assert index.stats()["tombstones"] == 2
+
+    index.add([0], vectors[:1])
+    assert index.search(vectors[0], k=1)[0][0][0] == 0
+    assert index.stats()["tombstones"] == 1
+
+
+def test_tombstoned_slots_are_reused():
+    """Test inserts after deletes do not grow the graph"""
+    vectors = _vectors(n=100)
+    index = HNSWIndex(16, capacity=100)
+    index.add(range(100), vectors)
+    index.delete(range(10))
+
+    index.add(range(1000, 1010), _vectors(n=10, seed=1))
+
+    assert index.capacity == 100
+    assert len(index) == 100
+    assert index.stats()["tombstones"] == 0
+
+
+def test_grows_when_full():
+    """Test capacity is increased automatically"""
+    index = HNSWIndex(16, capacity=10)
+    index.add(range(50), _vectors(n=50))
+
+    assert len(index) == 50
+    assert index.capacity >= 50
+
+
+def test_upsert_replaces_vector():
+    """Test adding an existing id replaces its vector"""
+    vectors = _vectors(n=50)
+    index = HNSWIndex(16)
+    index.add(range(50), vectors)
+
+    index.add([7], vectors[20:21])
+
+    assert len(index) == 50
+    assert {item_id for item_id, _ in index.search(vectors[20], k=2)[0]} == {7, 20}
+
+
+def test_dimension_mismatch():
+    """Test wrong-sized vectors are rejected"""
+    index = HNSWIndex(16)
+
+    with pytest.raises(ValueError, match="16-dimensional"):
+        index.add([1], np.ones((1, 8)))
+
+
+def test_empty_index_search():
+    """Test searching an empty index"""
+    assert HNSWIndex(16).search(np.ones(16), k=3) == [[]]
+
+
+def test_concurrent_insert_search_delete():
+    """Test readers and writers can run from several threads"""
+    vectors = _vectors(n=2000)
+    index = HNSWIndex(16, capacity=100)
+    index.add(range(500), vectors[:500])
+    errors = []
+
+    def writer(start: int):
+        try:
+            for offset in range(start, start + 500, 50):
+                index.add(range(offset, offset + 50), vectors[offset:offset + 50])
+                index.delete(range(offset, offset + 5))
+        except Exception as e:  # pragma: no cover - surfaced by the assertion below
+            errors.append(e)
+
+    def reader():
+        try:
+            for i in range(200):
+                index.search(vectors[i], k=5)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(start,)) for start in (500, 1000, 1500)]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(index) == 2000 - 3 * 50
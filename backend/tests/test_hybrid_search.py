@@ -0,0 +1,156 @@
+"""Tests for hybrid lexical + vector search"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.db.text_search import lexical_search, lexical_search_query, text_search_ddl
+from app.services.hybrid_search import reciprocal_rank_fusion, run_with_budget
+from app.services.indexing_service import IndexingService
+from app.services.vector_store import VectorRecord
+from app.services.vector_store.memory import MemoryVectorStore
+from tests.conftest import random_vector
+
+DIMENSION = settings.embedding_dimension
+
+
+def _result(chunk_id: int, **extra):
+    return {"chunk_id": chunk_id, "document_id": 1, "content": f"chunk {chunk_id}", **extra}
+
+
+def test_reciprocal_rank_fusion():
+    """Test results found by both legs outrank single-leg results"""
+    fused = reciprocal_rank_fusion(
+        {
+            "vector": [_result(1, similarity=0.9), _result(2, similarity=0.8)],
+            "lexical": [_result(3, rank=0.5), _result(2, rank=0.4)],
+        },
+        limit=10,
+        k=60
+    )
+
+    assert [result["chunk_id"] for result in fused] == [2, 1, 3]
+    assert fused[0]["matched_by"] == ["vector", "lexical"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 62)
+    assert fused[0]["similarity"] == 0.8
+    assert fused[2]["similarity"] is None
+    assert "rank" not in fused[2]
+
+
+def test_reciprocal_rank_fusion_limit_and_single_leg():
+    """Test the limit and fusing a single ranking"""
+    fused = reciprocal_rank_fusion({"lexical": [_result(idx, rank=1.0) for idx in range(5)]}, limit=2)
+
+    assert [result["chunk_id"] for result in fused] == [0, 1]
+    assert fused[0]["matched_by"] == ["lexical"]
+
+
+@pytest.mark.asyncio
+async def test_run_with_budget():
+    """Test a leg's results, timeout and failure"""
+    async def slow():
+        await asyncio.sleep(1)
+        return [_result(1)]
+
+    async def broken():
+        raise RuntimeError("connection lost")
+
+    assert await run_with_budget("vector", AsyncMock(return_value=[_result(1)])(), 100) == [_result(1)]
+    assert await run_with_budget("lexical", slow(), 10) is None
+    assert await run_with_budget("lexical", broken(), 100) is None
+
+
+def test_text_search_ddl():
+    """Test the generated tsvector column and GIN index"""
+    column, index = text_search_ddl("simple")
+
+    assert "content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED" in column
+    assert "USING gin (content_tsv)" in index
+
+
+def test_lexical_search_query():
+    """Test the full-text query uses the indexed column and ranks by ts_rank_cd"""
+    sql = str(lexical_search_query("error E1234", limit=20, filters={"document_id": 3})
+              .compile(dialect=postgresql.dialect()))
+
+    assert "document_chunks.content_tsv @@ websearch_to_tsquery(" in sql
+    assert "ts_rank_cd(document_chunks.content_tsv" in sql
+    assert "document_chunks.document_id =" in sql
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_lexical_search_outside_postgres():
+    """Test full-text search returns nothing on databases without tsvector"""
+    db = MagicMock()
+    db.bind.dialect.name = "sqlite"
+    db.execute = AsyncMock()
+
+    assert await lexical_search(db, "error", 5) == []
+    db.execute.assert_not_called()
+
+
+async def _hybrid_service():
+    embeddings = MagicMock()
+    embeddings.generate_embedding = AsyncMock(return_value=random_vector(1))
+    store = MemoryVectorStore(DIMENSION)
+    await store.upsert([
+        VectorRecord(chunk_id=idx, document_id=1, embedding=random_vector(idx), content=f"chunk {idx}", chunk_index=idx)
+        for idx in range(1, 4)
+    ])
+    return IndexingService(embeddings=embeddings, store=store)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_legs():
+    """Test a chunk found by both legs is ranked first"""
+    service = await _hybrid_service()
+    service._search_lexical = AsyncMock(return_value=[_result(9, rank=0.7), _result(1, rank=0.3)])
+
+    results = await service.search_documents("E1234", limit=2, mode="hybrid")
+
+    assert results[0]["chunk_id"] == 1
+    assert results[0]["matched_by"] == ["vector", "lexical"]
+    assert len(results) == 2
+    service._search_lexical.assert_awaited_once_with("E1234", 2 * settings.hybrid_candidate_factor, {})
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_degrades_to_vector(monkeypatch):
+    """Test a slow lexical leg is dropped after its budget"""
+    monkeypatch.setattr(settings, "hybrid_lexical_timeout_ms", 10.0)
+    service = await _hybrid_service()
+
+    async def slow_lexical(query, limit, filters):
+        await asyncio.sleep(1)
+        return [_result(9)]
+
+    service._search_lexical = slow_lexical
+
+    results = await service.search_documents("E1234", limit=3, mode="hybrid")
+
+    assert [result["matched_by"] for result in results] == [["vector"]] * 3
+    assert results[0]["chunk_id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fails_without_any_leg():
+    """Test an error is raised when neither leg returns"""
+    service = await _hybrid_service()
+    service.embeddings_service.generate_embedding = AsyncMock(side_effect=RuntimeError("provider down"))
+    service._search_lexical = AsyncMock(side_effect=RuntimeError("database down"))
+
+    with pytest.raises(Exception, match="no hybrid search leg"):
+        await service.search_documents("E1234", mode="hybrid")
+
+
+@pytest.mark.asyncio
+async def test_search_rejects_unknown_mode():
+    """Test mode validation"""
+    service = await _hybrid_service()
+
+    with pytest.raises(ValueError):
+        await service.search_documents("E1234", mode="keyword")
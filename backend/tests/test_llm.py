@@ -1,11 +1,16 @@
 """Tests for LLM module"""
 
+import time
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
-from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessage
 from openai.types.chat.chat_completion import Choice, CompletionUsage
+from openai.types.chat.chat_completion_chunk import Choice as ChunkChoice, ChoiceDelta
 
+from app.core.config import settings
 from app.core.llm import OpenAIProvider, LLMManager
+from app.core.llm_cache import LLMResponseCache, is_deterministic
 
 
 @pytest.fixture
@@ -161,3 +166,189 @@ async def test_llm_manager_count_tokens_no_provider():
 
         with pytest.raises(RuntimeError, match="No LLM provider configured"):
             manager.count_tokens("Hello!")
+
+
+class FakeStream:
+    """Async iterator standing in for openai's AsyncStream"""
+
+    def __init__(self, pieces):
+        self.chunks = [
+            ChatCompletionChunk(
+                id="test-id",
+                object="chat.completion.chunk",
+                created=1234567890,
+                model="gpt-4",
+                choices=[ChunkChoice(index=0, delta=ChoiceDelta(content=piece), finish_reason=None)]
+            )
+            for piece in pieces
+        ]
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_generate_stream():
+    """Test streamed deltas are yielded in order and the stream is closed"""
+    provider = OpenAIProvider(api_key="test-key", model="gpt-4")
+    stream = FakeStream(["Hel", None, "lo", "!"])
+    provider.client.chat.completions.create = AsyncMock(return_value=stream)
+
+    pieces = [piece async for piece in provider.generate_stream(prompt="Hi", system_prompt="Be brief")]
+
+    assert pieces == ["Hel", "lo", "!"]
+    assert stream.closed
+    kwargs = provider.client.chat.completions.create.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert kwargs["messages"][0] == {"role": "system", "content": "Be brief"}
+
+
+@pytest.mark.asyncio
+async def test_llm_manager_stream_stats():
+    """Test time to first token is recorded and early closes count as cancelled"""
+    with patch("app.core.llm.settings") as mock_settings:
+        mock_settings.llm_provider = "openai"
+        mock_settings.openai_api_key = "test-key"
+        mock_settings.llm_model = "gpt-4"
+        manager = LLMManager()
+
+    streams = []
+
+    def open_stream(**kwargs):
+        streams.append(FakeStream(["a", "b"]))
+        return streams[-1]
+
+    manager.provider.client.chat.completions.create = AsyncMock(side_effect=open_stream)
+    first_token = []
+
+    pieces = [piece async for piece in manager.generate_stream(prompt="Hi", on_first_token=first_token.append)]
+    assert pieces == ["a", "b"]
+    assert len(first_token) == 1
+
+    stream = manager.generate_stream(prompt="Hi")
+    assert await stream.__anext__() == "a"
+    await stream.aclose()
+    assert streams[-1].closed
+
+    stats = manager.get_stream_stats()
+    assert stats["started"] == 2
+    assert stats["completed"] == 1
+    assert stats["cancelled"] == 1
+    assert stats["ttft_p50_ms"] is not None
+
+
+@pytest.fixture
+def cached_manager(monkeypatch, mock_openai_response):
+    """LLM manager with a fresh response cache and a mocked completion call"""
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    cache = LLMResponseCache(max_entries=10)
+    monkeypatch.setattr("app.core.llm.get_llm_cache", lambda: cache)
+
+    with patch("app.core.llm.settings") as mock_settings:
+        mock_settings.llm_provider = "openai"
+        mock_settings.openai_api_key = "test-key"
+        mock_settings.llm_model = "gpt-4"
+        manager = LLMManager()
+
+    manager.provider.client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_llm_manager_caches_deterministic_requests(cached_manager):
+    """Test temperature 0 requests are served from cache and sampled ones bypass it"""
+    create = cached_manager.provider.client.chat.completions.create
+
+    first = await cached_manager.generate(prompt="Hello!", system_prompt="Be brief", temperature=0)
+    second = await cached_manager.generate(prompt="Hello!", system_prompt="Be brief", temperature=0)
+    assert first == second == "This is a test response"
+    assert create.await_count == 1
+
+    await cached_manager.generate(prompt="Hello!", system_prompt="Be brief", temperature=0, max_tokens=5)
+    await cached_manager.generate(prompt="Hello!", temperature=0.7)
+    await cached_manager.generate(prompt="Hello!", temperature=0.7)
+    await cached_manager.generate(prompt="Hello!", temperature=0, use_cache=False)
+    assert create.await_count == 5
+
+    stats = cached_manager.get_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["bypassed"] == 2
+    assert stats["hit_ratio"] == round(1 / 3, 4)
+    # Savings come from the provider's usage report
+    assert stats["saved_completion_tokens"] == 5
+    assert stats["saved_tokens"] == 15
+
+
+@pytest.mark.asyncio
+async def test_llm_manager_stream_uses_cache(cached_manager):
+    """Test a completed deterministic stream is cached and replayed as one piece"""
+    cached_manager.provider.client.chat.completions.create = AsyncMock(
+        side_effect=lambda **kwargs: FakeStream(["Hel", "lo"])
+    )
+
+    streamed = [piece async for piece in cached_manager.generate_stream(prompt="Hi", temperature=0)]
+    replayed = [piece async for piece in cached_manager.generate_stream(prompt="Hi", temperature=0)]
+
+    assert streamed == ["Hel", "lo"]
+    assert replayed == ["Hello"]
+    assert cached_manager.provider.client.chat.completions.create.await_count == 1
+    assert await cached_manager.generate(prompt="Hi", temperature=0) == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_persistent_tier_and_ttl(tmp_path, monkeypatch):
+    """Test responses survive a restart and expire after the TTL"""
+    path = str(tmp_path / "llm.sqlite3")
+    key = LLMResponseCache.make_key("openai:gpt-4", "Hello!", None, 0, None)
+    await LLMResponseCache(path=path, ttl_seconds=60).set(key, "cached", 3, 1)
+
+    restarted = LLMResponseCache(path=path, ttl_seconds=60)
+    entry = await restarted.get(key)
+    assert entry["text"] == "cached"
+    assert restarted.stats()["persistent_hits"] == 1
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert await restarted.get(key) is None
+    assert await LLMResponseCache(path=path, ttl_seconds=60).get(key) is None
+
+
+def test_llm_cache_key_and_determinism():
+    """Test cache keys cover every request parameter and sampling bypasses the cache"""
+    key = LLMResponseCache.make_key("openai:gpt-4", "Hi", "sys", 0, 100, top_p=1)
+
+    assert key == LLMResponseCache.make_key("openai:gpt-4", "Hi", "sys", 0, 100, top_p=1)
+    assert key != LLMResponseCache.make_key("openai:gpt-4o", "Hi", "sys", 0, 100, top_p=1)
+    assert key != LLMResponseCache.make_key("openai:gpt-4", "Hi", None, 0, 100, top_p=1)
+    assert key != LLMResponseCache.make_key("openai:gpt-4", "Hi", "sys", 0, 200, top_p=1)
+    assert key != LLMResponseCache.make_key("openai:gpt-4", "Hi", "sys", 0, 100, top_p=0.5)
+
+    assert is_deterministic(0)
+    assert not is_deterministic(0.2)
+    assert not is_deterministic(0, n=2)
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_generate_with_history(mock_openai_response):
+    """Test earlier turns are sent between the system prompt and the new message"""
+    provider = OpenAIProvider(api_key="test-key", model="gpt-4")
+    provider.client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+
+    await provider.generate(
+        prompt="And now?",
+        system_prompt="Be brief",
+        history=[{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+    )
+
+    messages = provider.client.chat.completions.create.call_args.kwargs["messages"]
+    assert [message["role"] for message in messages] == ["system", "user", "assistant", "user"]
+    assert messages[-1]["content"] == "And now?"
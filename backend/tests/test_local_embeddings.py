@@ -0,0 +1,129 @@
+"""Tests for local sentence-transformers embedding provider"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.core import local_embedding_worker
+from app.core.embeddings import EmbeddingsService
+from app.core.local_embeddings import LocalEmbeddingProvider
+
+
+class FakeSentenceTransformer:
+    """Stands in for a loaded SentenceTransformer model"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text))] * 4 for text in texts])
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+
+@pytest.fixture
+def fake_worker_model():
+    """Install a fake model as the worker-global model"""
+    model = FakeSentenceTransformer()
+    with patch.object(local_embedding_worker, "_worker_model", model):
+        yield model
+
+
+@pytest.fixture
+def provider(fake_worker_model):
+    """Local provider running its 'workers' in a thread pool"""
+    executor = ThreadPoolExecutor(max_workers=2)
+    provider = LocalEmbeddingProvider(model="custom-model", max_workers=2, batch_size=2, executor=executor)
+    yield provider
+    provider.close()
+
+
+@pytest.mark.asyncio
+async def test_local_provider_generate_embedding(provider):
+    """Test single embedding generation"""
+    embedding = await provider.generate_embedding("hello")
+
+    assert embedding == [5.0] * 4
+
+
+@pytest.mark.asyncio
+async def test_local_provider_batch_spreads_work_and_keeps_order(provider, fake_worker_model):
+    """Test batch encoding across workers with zero vectors for empty texts"""
+    texts = ["a", "", "bbb", "cc", "dddd", "eeeee"]
+
+    embeddings = await provider.generate_embeddings_batch(texts)
+
+    assert [emb[0] for emb in embeddings] == [1.0, 0.0, 3.0, 2.0, 4.0, 5.0]
+    assert len(fake_worker_model.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_local_provider_dimension(provider):
+    """Test dimension lookup from the table, the configured value or, asynchronously, a worker"""
+    with pytest.raises(RuntimeError):
+        provider.get_dimension()
+    assert await provider.load_dimension() == 4
+    assert provider.get_dimension() == 4
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    assert LocalEmbeddingProvider(model="all-MiniLM-L6-v2", executor=executor).get_dimension() == 384
+    assert LocalEmbeddingProvider(model="custom-model", dimension=512, executor=executor).get_dimension() == 512
+    executor.shutdown()
+
+
+def test_local_provider_imports_in_spawned_worker(monkeypatch):
+    """Test a real spawn worker can import the provider modules with EMBEDDING_PROVIDER=local"""
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        assert pool.submit(exec, "import app.core.local_embeddings").result(timeout=120) is None
+
+
+def test_embeddings_service_selects_local_provider():
+    """Test that EMBEDDING_PROVIDER=local selects the local provider"""
+    with patch("app.core.embeddings.settings") as mock_settings, \
+            patch("app.core.local_embeddings.ProcessPoolExecutor") as mock_pool:
+        mock_settings.llm_provider = "openai"
+        mock_settings.embedding_provider = "local"
+        mock_settings.embedding_model = "sentence-transformers/all-MiniLM-L6-v2"
+        mock_settings.embedding_dimension = 384
+        mock_settings.local_embedding_workers = 2
+        mock_settings.local_embedding_batch_size = 32
+        mock_settings.local_embedding_device = "cpu"
+        mock_settings.embedding_batch_size = 100
+        mock_settings.embedding_max_concurrency = 4
+        mock_settings.embedding_batch_max_retries = 3
+        mock_settings.embedding_cache_enabled = False
+        mock_settings.embedding_coalesce_window_ms = 0
+
+        service = EmbeddingsService()
+
+        assert isinstance(service.provider, LocalEmbeddingProvider)
+        assert service.provider.get_dimension() == 384
+        assert "dimension" not in mock_pool.call_args.kwargs
+        assert mock_pool.call_args.kwargs["max_workers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_check_dimension_asks_worker_for_unknown_model(provider, caplog):
+    """Test the startup check reports the model's own dimension, not EMBEDDING_DIMENSION"""
+    with patch("app.core.embeddings.settings") as mock_settings, \
+            patch.object(EmbeddingsService, "_initialize_provider", lambda self: setattr(self, "provider", provider)):
+        mock_settings.embedding_batch_size = 100
+        mock_settings.embedding_max_concurrency = 4
+        mock_settings.embedding_batch_max_retries = 3
+        mock_settings.embedding_cache_enabled = False
+        mock_settings.embedding_coalesce_window_ms = 0
+        mock_settings.embedding_dimension = 384
+
+        service = EmbeddingsService()
+        assert await service.check_dimension() == 4
+
+    assert provider.get_dimension() == 4
+    assert "will not fit" in caplog.text
@@ -0,0 +1,125 @@
+"""Tests for the in-memory vector index kept in sync with document_chunks"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+pytest.importorskip("hnswlib")
+
+from app.core.config import settings
+from app.db.models import Document, DocumentChunk
+from app.services.indexing_service import IndexingService
+from app.services.memory_index import MemoryVectorIndex
+from tests.conftest import random_vector
+
+DIMENSION = settings.embedding_dimension
+
+
+@pytest.fixture
+async def session(test_session_factory):
+    """Test database session with two indexed documents"""
+    async with test_session_factory() as db:
+        for doc_idx in range(2):
+            document = Document(filename=f"doc{doc_idx}.txt", title=f"Doc {doc_idx}",
+                                content_type="text/plain", file_size=10, status="completed")
+            db.add(document)
+            await db.flush()
+            for chunk_idx in range(3):
+                db.add(DocumentChunk(
+                    document_id=document.id,
+                    content=f"doc {doc_idx} chunk {chunk_idx}",
+                    chunk_index=chunk_idx,
+                    embedding=random_vector(doc_idx * 10 + chunk_idx),
+                    token_count=4
+                ))
+        await db.commit()
+        yield db
+
+
+@pytest.mark.asyncio
+async def test_load_and_search(session):
+    """Test the index is built from document_chunks and answers without the database"""
+    index = MemoryVectorIndex(dimension=DIMENSION, capacity=4)
+
+    loaded = await index.load(session)
+    results = index.search(random_vector(11), limit=2)
+
+    assert loaded == 6
+    assert index.ready
+    assert results[0]["content"] == "doc 1 chunk 1"
+    assert results[0]["filename"] == "doc1.txt"
+    assert results[0]["title"] == "Doc 1"
+    assert abs(results[0]["similarity"] - 1.0) < 1e-5
+    assert len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_document_tombstones_chunks(session):
+    """Test IndexingService.delete_document removes the document's chunks from the index"""
+    index = MemoryVectorIndex(dimension=DIMENSION)
+    await index.load(session)
+    service = IndexingService(embeddings=MagicMock(), vector_index=index)
+
+    deleted = await service.delete_document(session, 2)
+
+    assert deleted.filename == "doc1.txt"
+    assert all(result["document_id"] != 2 for result in index.search(random_vector(11), limit=6))
+    assert index.stats()["vectors"] == 3
+    assert index.stats()["tombstones"] == 3
+    assert await service.delete_document(session, 2) is None
+
+
+@pytest.mark.asyncio
+async def test_search_documents_uses_memory_index(session):
+    """Test search is served from memory when the index is loaded"""
+    index = MemoryVectorIndex(dimension=DIMENSION)
+    await index.load(session)
+    embeddings = MagicMock()
+    embeddings.generate_embedding = AsyncMock(return_value=random_vector(0))
+    db = MagicMock()
+    db.execute = AsyncMock()
+
+    service = IndexingService(embeddings=embeddings, vector_index=index)
+    results = await service.search_documents("chunk zero", limit=1, db=db)
+
+    assert results[0]["content"] == "doc 0 chunk 0"
+    db.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_add_chunks_skips_missing_embeddings():
+    """Test chunks without usable embeddings are not indexed"""
+    index = MemoryVectorIndex(dimension=DIMENSION)
+    document = Document(id=1, filename="a.txt", title=None)
+    chunks = [
+        DocumentChunk(id=1, document_id=1, content="a", chunk_index=0, embedding=random_vector(1)),
+        DocumentChunk(id=2, document_id=1, content="b", chunk_index=1, embedding=[0.0] * DIMENSION),
+        DocumentChunk(id=3, document_id=1, content="c", chunk_index=2, embedding=None),
+    ]
+
+    assert index.add_chunks(chunks, document) == 1
+    assert index.remove_document(1) == 1
+    assert index.search(random_vector(1)) == []
+
+
+@pytest.mark.asyncio
+async def test_writes_during_load_are_kept(session):
+    """Test uploads made while loading stay indexed and deletes are not undone by the load"""
+    index = MemoryVectorIndex(dimension=DIMENSION)
+    uploaded = Document(id=99, filename="new.txt", title=None)
+    add_chunks = index.add_chunks
+
+    def add_chunks_racing_writes(chunks, document):
+        if document.id == 1:
+            add_chunks([DocumentChunk(id=99, document_id=99, content="new", chunk_index=0,
+                                      embedding=random_vector(99))], uploaded)
+            index.remove_document(2)
+        return add_chunks(chunks, document)
+
+    index.add_chunks = add_chunks_racing_writes
+    loaded = await index.load(session, batch_size=3)
+    results = index.search(random_vector(99), limit=6)
+
+    assert loaded == 3
+    assert results[0]["document_id"] == 99
+    assert all(result["document_id"] != 2 for result in results)
+    assert index.stats()["vectors"] == 4
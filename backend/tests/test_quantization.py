@@ -0,0 +1,135 @@
+"""Tests for embedding quantization and quantized pgvector queries"""
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.quantization import (
+    QuantizedIndex,
+    binary_quantize,
+    halfvec_quantize,
+    hamming_distances,
+)
+from app.db.vector_indexes import quantized_index_ddl, rescored_search_query
+
+DIMENSION = settings.embedding_dimension
+
+
+def _corpus(n: int = 500, dim: int = 64, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_binary_quantize_and_hamming():
+    """Test sign-bit packing and Hamming distances"""
+    bits = binary_quantize([[1.0, -1.0] * 4, [-1.0, 1.0] * 4, [1.0, -1.0] * 4])
+
+    assert bits.dtype == np.uint8
+    assert bits.shape == (3, 1)
+
+    distances = hamming_distances(bits[:1], bits)
+    assert distances.tolist() == [[0, 8, 0]]
+
+
+def test_halfvec_quantize():
+    """Test float16 quantization keeps normalized values"""
+    halves = halfvec_quantize([[3.0, 4.0]])
+
+    assert halves.dtype == np.float16
+    assert np.allclose(halves, [[0.6, 0.8]], atol=1e-3)
+
+
+def test_bytes_per_vector():
+    """Test memory footprint per mode"""
+    corpus = _corpus(dim=768)
+
+    assert QuantizedIndex(corpus, "none").bytes_per_vector == 3072
+    assert QuantizedIndex(corpus, "halfvec").bytes_per_vector == 1536
+    assert QuantizedIndex(corpus, "binary").bytes_per_vector == 96
+
+
+def test_unknown_mode_rejected():
+    """Test invalid quantization mode"""
+    with pytest.raises(ValueError, match="Unsupported quantization mode"):
+        QuantizedIndex(_corpus(), "int4")
+
+
+def test_rescoring_returns_exact_scores():
+    """Test rescored results carry full-precision similarities"""
+    corpus = _corpus()
+    index = QuantizedIndex(corpus, "binary")
+
+    results = index.search(corpus[:3], k=5, rescore_factor=20)
+
+    for query_idx, hits in enumerate(results):
+        assert hits[0][0] == query_idx
+        assert abs(hits[0][1] - 1.0) < 1e-5
+        scores = [score for _, score in hits]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_rescoring_improves_binary_recall():
+    """Test a larger candidate pool recovers the exact top-k"""
+    corpus = _corpus(n=2000, dim=256)
+    queries = _corpus(n=20, dim=256, seed=1)
+    k = 10
+
+    exact = QuantizedIndex(corpus, "none").search(queries, k=k)
+    index = QuantizedIndex(corpus, "binary")
+
+    def recall(rescore_factor: int) -> float:
+        results = index.search(queries, k=k, rescore_factor=rescore_factor)
+        return np.mean([
+            len({i for i, _ in got} & {i for i, _ in want}) / k
+            for got, want in zip(results, exact)
+        ])
+
+    assert recall(50) > recall(1)
+    assert recall(50) >= 0.9
+
+
+def test_quantized_index_ddl():
+    """Test expression index DDL per mode"""
+    assert quantized_index_ddl("none", 768) is None
+
+    halfvec_ddl = quantized_index_ddl("halfvec", 768)
+    assert "USING hnsw ((embedding::halfvec(768)) halfvec_cosine_ops)" in halfvec_ddl
+
+    binary_ddl = quantized_index_ddl("binary", 768)
+    assert "binary_quantize(embedding)::bit(768)" in binary_ddl
+    assert "bit_hamming_ops" in binary_ddl
+
+    with pytest.raises(ValueError):
+        quantized_index_ddl("int4", 768)
+
+
+def _compile(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_rescored_search_query_without_quantization():
+    """Test plain cosine top-k query"""
+    sql = _compile(rescored_search_query([0.1] * DIMENSION, limit=5, mode="none"))
+
+    assert "<=>" in sql
+    assert "binary_quantize" not in sql
+    assert "LIMIT" in sql
+
+
+def test_rescored_search_query_binary():
+    """Test binary candidates are rescored with full vectors"""
+    sql = _compile(rescored_search_query([0.1] * DIMENSION, limit=5, mode="binary", rescore_factor=8))
+
+    assert "binary_quantize(document_chunks.embedding)" in sql
+    assert "<~>" in sql
+    assert "<=>" in sql
+    assert f"BIT({DIMENSION})" in sql
+
+
+def test_rescored_search_query_halfvec():
+    """Test halfvec candidates are rescored with full vectors"""
+    sql = _compile(rescored_search_query([0.1] * DIMENSION, limit=5, mode="halfvec"))
+
+    assert f"CAST(document_chunks.embedding AS HALFVEC({DIMENSION})) <=>" in sql
+    assert "ORDER BY document_chunks.embedding <=>" in sql
@@ -0,0 +1,122 @@
+"""Tests for retrieval-augmented chat"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.llm import LLMResult
+from app.services.rag_service import RAGService, build_prompt, format_chunk, pack_context
+
+
+def _count_tokens(text: str) -> int:
+    return len(text.split())
+
+
+async def _count_tokens_many(texts):
+    return [_count_tokens(text) for text in texts]
+
+
+def _chunks():
+    return [
+        {
+            "chunk_id": idx + 10,
+            "document_id": idx + 1,
+            "filename": f"doc{idx + 1}.txt",
+            "title": None,
+            "content": " ".join(["word"] * 20),
+            "chunk_index": idx,
+            "similarity": 0.9 - idx * 0.1,
+            "metadata": {},
+        }
+        for idx in range(4)
+    ]
+
+
+def test_format_chunk():
+    """Test passages are numbered and name their source"""
+    passage = format_chunk(2, _chunks()[0])
+
+    assert passage.startswith("[2] doc1.txt (chunk 0)\n")
+
+
+@pytest.mark.asyncio
+async def test_pack_context_stops_at_budget():
+    """Test chunks are packed best first until the next one would exceed the budget"""
+    passage_tokens = _count_tokens(format_chunk(1, _chunks()[0]))
+
+    context, used, tokens = await pack_context(_chunks(), 2 * passage_tokens + 1, _count_tokens_many)
+
+    assert [chunk["chunk_id"] for chunk in used] == [10, 11]
+    assert tokens <= 2 * passage_tokens + 1
+    assert "[1] doc1.txt" in context and "[2] doc2.txt" in context
+
+    assert await pack_context(_chunks(), 1, _count_tokens_many) == ("", [], 0)
+
+
+@pytest.mark.asyncio
+async def test_pack_context_truncates_oversized_best_chunk():
+    """Test a best chunk over the whole budget is cut to fit instead of dropped"""
+    async def truncate(text, max_tokens):
+        return " ".join(text.split()[:max_tokens])
+
+    context, used, tokens = await pack_context(_chunks(), 10, _count_tokens_many, truncate)
+
+    assert [chunk["chunk_id"] for chunk in used] == [10]
+    assert context.startswith("[1] doc1.txt")
+    assert _count_tokens(context) == tokens == 10
+
+
+@pytest.mark.asyncio
+async def test_pack_context_counts_all_passages_in_one_call():
+    """Test passages are counted with a single bulk call"""
+    counter = AsyncMock(side_effect=_count_tokens_many)
+
+    await pack_context(_chunks(), 1000, counter)
+
+    counter.assert_awaited_once()
+    assert len(counter.await_args.args[0]) == len(_chunks()) + 1
+
+
+def test_build_prompt():
+    """Test the question follows the context"""
+    assert build_prompt("Why?", "[1] a") == "Context:\n[1] a\n\nQuestion: Why?"
+    assert "No document passages" in build_prompt("Why?", "")
+
+
+@pytest.mark.asyncio
+async def test_rag_answer_returns_citations_and_timings():
+    """Test retrieval feeds the prompt and the used chunks come back as citations"""
+    indexing = MagicMock()
+    indexing.search_documents = AsyncMock(return_value=_chunks())
+    llm = MagicMock()
+    llm.count_tokens_many = _count_tokens_many
+    llm.generate_with_usage = AsyncMock(return_value=LLMResult(text="It works [1].", completion_tokens=4))
+    service = RAGService(indexing=indexing, llm=llm)
+
+    result = await service.answer("Does it work?", limit=4, context_tokens=60)
+
+    assert result["answer"] == "It works [1]."
+    assert result["tokens_used"] == 4
+    assert [(c["document_id"], c["chunk_index"]) for c in result["citations"]] == [(1, 0), (2, 1)]
+    assert result["context_tokens"] <= 60
+    assert result["retrieval_ms"] >= 0 and result["generation_ms"] >= 0
+
+    indexing.search_documents.assert_awaited_once()
+    prompt = llm.generate_with_usage.await_args.kwargs["prompt"]
+    assert "[2] doc2.txt" in prompt and "[3]" not in prompt
+    assert prompt.endswith("Question: Does it work?")
+
+
+@pytest.mark.asyncio
+async def test_rag_service_truncate_uses_the_llm_tokenizer():
+    """Test truncation keeps the leading tokens of the generating model's encoding"""
+    llm = MagicMock()
+    llm.provider.model = "gpt-4"
+    service = RAGService(indexing=MagicMock(), llm=llm)
+
+    with patch("app.services.rag_service.tokenizer_service") as mock_tokenizer:
+        mock_tokenizer.encode.return_value = [1, 2, 3, 4]
+        mock_tokenizer.decode.return_value = "first two"
+        assert await service.truncate("first two more words", 2) == "first two"
+        assert await service.truncate("first two more words", 4) == "first two more words"
+
+    mock_tokenizer.decode.assert_called_once_with([1, 2], "gpt-4")
@@ -0,0 +1,144 @@
+"""Tests for adaptive rate limiter"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.rate_limit import (
+    AdaptiveRateLimiter,
+    classify_error,
+    get_rate_limiter,
+    get_rate_limiter_snapshots,
+    parse_retry_after,
+)
+
+
+class FakeRateLimitError(Exception):
+    """Mimics an HTTP 429 error carrying response headers"""
+
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers=headers or {})
+
+
+class FakeServerError(Exception):
+    """Mimics an HTTP 5xx error"""
+
+    def __init__(self, status_code=503):
+        super().__init__("service unavailable")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    """Same name as the OpenAI SDK's connection error"""
+
+
+def test_classify_error():
+    """Test error classification"""
+    assert classify_error(FakeRateLimitError()) == "throttled"
+    assert classify_error(asyncio.TimeoutError()) == "timeout"
+    assert classify_error(FakeServerError(502)) == "transient"
+    assert classify_error(APIConnectionError("connection reset")) == "transient"
+    assert classify_error(ConnectionResetError()) == "transient"
+    assert classify_error(FakeServerError(400)) is None
+    assert classify_error(ValueError("bad input")) is None
+
+
+def test_parse_retry_after():
+    """Test Retry-After header parsing"""
+    assert parse_retry_after(FakeRateLimitError({"retry-after": "2"})) == 2.0
+    assert parse_retry_after(FakeRateLimitError({"retry-after-ms": "250"})) == 0.25
+    assert parse_retry_after(FakeRateLimitError({})) is None
+    assert parse_retry_after(ValueError()) is None
+
+
+def test_aimd_adjustments():
+    """Test additive increase and cooled-down multiplicative decrease"""
+    limiter = AdaptiveRateLimiter("test", initial_concurrency=4, max_concurrency=8)
+
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.concurrency_limit == 4
+    limiter.on_success()
+    assert limiter.concurrency_limit == 5
+
+    limiter.on_throttle(retry_after=0)
+    limiter.on_throttle(retry_after=0)
+    assert limiter.concurrency_limit == 2
+    assert limiter.rate is not None
+    assert limiter.snapshot()["throttles"] == 2
+
+
+@pytest.mark.asyncio
+async def test_call_retries_throttled_requests():
+    """Test that throttled calls are retried after the Retry-After pause"""
+    limiter = AdaptiveRateLimiter("test", initial_concurrency=2, max_rate=1000)
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeRateLimitError({"retry-after": "0.01"})
+        return "ok"
+
+    assert await limiter.call(request) == "ok"
+    assert limiter.retries == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_call_retries_transient_errors_without_backing_off_limits():
+    """Test 5xx and connection errors are retried while the concurrency limit stays put"""
+    limiter = AdaptiveRateLimiter("test", initial_concurrency=4, base_backoff=0.001)
+    errors = [FakeServerError(503), APIConnectionError("connection reset")]
+
+    async def request():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert await limiter.call(request) == "ok"
+    assert limiter.retries == 2
+    assert limiter.snapshot()["transient_errors"] == 2
+    assert limiter.concurrency_limit == 4
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_retry_other_errors():
+    """Test that non-rate-limit errors propagate immediately"""
+    limiter = AdaptiveRateLimiter("test")
+
+    async def request():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        await limiter.call(request)
+    assert limiter.retries == 0
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_enforced():
+    """Test that no more than the current limit of calls run at once"""
+    limiter = AdaptiveRateLimiter("test", initial_concurrency=2, max_concurrency=2)
+    running = []
+    peak = []
+
+    async def request():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    await asyncio.gather(*(limiter.call(request) for _ in range(6)))
+
+    assert max(peak) == 2
+
+
+def test_registry_shares_limiters():
+    """Test that providers share one limiter per API"""
+    assert get_rate_limiter("shared-test") is get_rate_limiter("shared-test")
+    assert "shared-test" in get_rate_limiter_snapshots()
@@ -0,0 +1,187 @@
+"""Tests for semantic document search"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.db.vector_indexes import (
+    ann_index_ddl,
+    candidate_count,
+    check_embedding_column,
+    configure_search_session,
+    recommended_ivfflat_lists,
+    semantic_search_query,
+)
+from app.services.indexing_service import IndexingService
+from app.services.vector_store.pgvector import search_chunks
+
+
+def _compile(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def _session(dialect: str = "postgresql", rows=None):
+    db = MagicMock()
+    db.bind.dialect.name = dialect
+    result = MagicMock()
+    result.all.return_value = rows or []
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def test_ann_index_ddl():
+    """Test HNSW and IVFFlat index DDL"""
+    hnsw = ann_index_ddl("hnsw")
+    assert "USING hnsw (embedding vector_cosine_ops)" in hnsw
+    assert "m = 16" in hnsw and "ef_construction = 64" in hnsw
+
+    ivfflat = ann_index_ddl("ivfflat", lists=250)
+    assert "USING ivfflat (embedding vector_cosine_ops) WITH (lists = 250)" in ivfflat
+
+    assert ann_index_ddl("none") is None
+    with pytest.raises(ValueError):
+        ann_index_ddl("flat")
+
+
+def test_recommended_ivfflat_lists():
+    """Test IVFFlat list sizing"""
+    assert recommended_ivfflat_lists(0) == 1
+    assert recommended_ivfflat_lists(50_000) == 50
+    assert recommended_ivfflat_lists(4_000_000) == 2000
+
+
+def test_semantic_search_query_pushes_limit_and_threshold():
+    """Test the ANN-friendly inner query and the outer similarity filter"""
+    sql = _compile(semantic_search_query([0.1] * 768, limit=5, min_similarity=0.7, mode="none"))
+
+    inner = sql[sql.index("FROM (") :]
+    assert "ORDER BY document_chunks.embedding <=>" in inner
+    assert "LIMIT" in inner
+    assert "top_k.similarity >=" in sql
+    assert "JOIN documents" in sql
+    # The vector column is never sent back to the client
+    assert "document_chunks.embedding," not in sql
+
+
+def test_semantic_search_query_without_threshold():
+    """Test no filter is added when min_similarity is not given"""
+    sql = _compile(semantic_search_query([0.1] * 768, limit=5, mode="none"))
+
+    assert "top_k.similarity >=" not in sql
+
+
+def test_candidate_count():
+    """Test candidate pool sizing with and without quantization"""
+    assert candidate_count(10, mode="none") == 10
+    assert candidate_count(10, mode="binary", rescore_factor=8) == 80
+    assert candidate_count(400, mode="binary", rescore_factor=4) == 1000
+    assert candidate_count(1500, mode="binary", rescore_factor=4) == 1500
+
+
+@pytest.mark.asyncio
+async def test_configure_search_session_hnsw():
+    """Test ef_search is raised to the candidate count"""
+    db = _session()
+    with patch("app.db.vector_indexes.settings") as mock_settings:
+        mock_settings.embedding_quantization = "none"
+        mock_settings.vector_index_type = "hnsw"
+        mock_settings.hnsw_ef_search = 40
+
+        await configure_search_session(db, 100)
+
+    statement = str(db.execute.call_args[0][0])
+    assert statement == "SET LOCAL hnsw.ef_search = 100"
+
+
+@pytest.mark.asyncio
+async def test_quantized_hybrid_search_stays_within_ef_search_limit(monkeypatch):
+    """Test a limit-100 hybrid vector leg with quantization never asks for ef_search above 1000"""
+    monkeypatch.setattr(settings, "embedding_quantization", "binary")
+    monkeypatch.setattr(settings, "quantization_rescore_factor", 4)
+    monkeypatch.setattr(settings, "hnsw_ef_search", 40)
+    db = _session()
+
+    await search_chunks(db, [0.1] * settings.embedding_dimension, limit=100 * settings.hybrid_candidate_factor)
+
+    statements = [call.args[0] for call in db.execute.call_args_list]
+    assert str(statements[0]) == "SET LOCAL hnsw.ef_search = 1000"
+    # The quantized candidate scan asks for exactly as many rows as ef_search allows
+    params = statements[1].compile(dialect=postgresql.dialect()).params
+    assert 1000 in params.values() and 1600 not in params.values()
+
+
+@pytest.mark.asyncio
+async def test_configure_search_session_ivfflat():
+    """Test probes are set for IVFFlat"""
+    db = _session()
+    with patch("app.db.vector_indexes.settings") as mock_settings:
+        mock_settings.embedding_quantization = "none"
+        mock_settings.vector_index_type = "ivfflat"
+        mock_settings.ivfflat_probes = 12
+
+        await configure_search_session(db, 5)
+
+    assert str(db.execute.call_args[0][0]) == "SET LOCAL ivfflat.probes = 12"
+
+
+@pytest.mark.asyncio
+async def test_configure_search_session_skips_other_dialects():
+    """Test nothing is executed outside PostgreSQL"""
+    db = _session(dialect="sqlite")
+
+    await configure_search_session(db, 5)
+
+    db.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_embedding_column_reports_dimension_mismatch(caplog):
+    """Test a column created with another EMBEDDING_DIMENSION is reported"""
+    def connection(embedding_type):
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        conn.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=embedding_type)))
+        return conn
+
+    assert await check_embedding_column(connection(f"vector({settings.embedding_dimension})"))
+    assert await check_embedding_column(connection(None))
+    assert not await check_embedding_column(connection(f"vector({settings.embedding_dimension + 1})"))
+    assert "EMBEDDING_DIMENSION" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_search_documents():
+    """Test search maps rows to result dicts"""
+    embeddings = MagicMock()
+    embeddings.generate_embedding = AsyncMock(return_value=[0.1] * 768)
+    row = SimpleNamespace(
+        id=7, document_id=3, filename="notes.txt", title="Notes", content="pgvector tips",
+        chunk_index=0, similarity=0.91, chunk_metadata={"token_count": 3}
+    )
+    db = _session(rows=[row])
+
+    service = IndexingService(embeddings=embeddings)
+    results = await service.search_documents("vector tips", limit=3, min_similarity=0.5, db=db)
+
+    embeddings.generate_embedding.assert_awaited_once_with("vector tips")
+    assert results == [{
+        "chunk_id": 7,
+        "document_id": 3,
+        "filename": "notes.txt",
+        "title": "Notes",
+        "content": "pgvector tips",
+        "chunk_index": 0,
+        "similarity": 0.91,
+        "metadata": {"token_count": 3},
+    }]
+
+
+@pytest.mark.asyncio
+async def test_search_documents_rejects_empty_query():
+    """Test empty query validation"""
+    service = IndexingService(embeddings=MagicMock())
+
+    with pytest.raises(ValueError, match="cannot be empty"):
+        await service.search_documents("   ", db=_session())
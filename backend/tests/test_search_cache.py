@@ -0,0 +1,230 @@
+"""Tests for the semantic search result cache"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import Document, VectorSearchCache
+from app.db.search_cache import ensure_search_cache_table
+from app.services.indexing_service import IndexingService
+from app.services.search_cache import SearchResultCache
+
+EMBEDDING = [0.1] * settings.embedding_dimension
+RESULTS = [{"chunk_id": 1, "document_id": 1, "content": "pgvector tips", "similarity": 0.9}]
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """SQLite database with the cache table; a file, so every session gets its own connection"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cache.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(session_factory):
+    """Request session the searches run in"""
+    async with session_factory() as db:
+        yield db
+
+
+@pytest.fixture
+def make_cache(session_factory):
+    """Build caches writing through the test database"""
+    def make(**kwargs) -> SearchResultCache:
+        options = {"ttl_seconds": 60, "similarity_threshold": 0.0, "flush_seconds": 1.0}
+        options.update(kwargs)
+        return SearchResultCache(session_factory=session_factory, **options)
+    return make
+
+
+async def _entries(db: AsyncSession):
+    result = await db.execute(select(VectorSearchCache))
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_exact_hit(session, make_cache):
+    """Test stored results are returned for the same query and parameters"""
+    cache = make_cache()
+    params = cache.params_hash(5, None)
+
+    assert await cache.get(session, "vector tips", params) is None
+    assert await cache.set("vector tips", params, EMBEDDING, RESULTS, 12.5, cache.generation)
+
+    assert await cache.get(session, "  vector   tips ", params) == RESULTS
+    assert await cache.get(session, "vector tips", cache.params_hash(10, None)) is None
+    assert await cache.get(session, "vector tips", cache.params_hash(5, 0.5)) is None
+    assert cache.stats()["exact_hits"] == 1
+
+    entry = (await _entries(session))[0]
+    assert entry.query_text == "vector tips"
+    assert entry.result_count == 1
+    assert entry.search_time_ms == 12.5
+    assert entry.expires_at > datetime.utcnow()
+
+
+@pytest.mark.asyncio
+async def test_writes_leave_the_request_session_alone(session, make_cache):
+    """Test storing and invalidating never commit or roll back the caller's session"""
+    cache = make_cache()
+    document = Document(filename="draft.txt", content_type="text/plain", file_size=1)
+    session.add(document)
+
+    await cache.set("vector tips", cache.params_hash(5, None), EMBEDDING, RESULTS, 1.0, cache.generation)
+    await cache.invalidate()
+
+    assert document in session.new
+
+
+@pytest.mark.asyncio
+async def test_ensure_search_cache_table_recreates_stale_table():
+    """Test a table from before the result cache is rebuilt and a current one is left alone"""
+    def connection(columns, embedding_type):
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        columns_result, type_result = MagicMock(), MagicMock()
+        columns_result.scalars.return_value.all.return_value = columns
+        type_result.scalar.return_value = embedding_type
+        conn.execute = AsyncMock(side_effect=[columns_result, type_result, None])
+        conn.run_sync = AsyncMock()
+        return conn
+
+    current = ["id", "query_text", "query_hash", "params_hash", "query_embedding"]
+    conn = connection(current, f"vector({settings.embedding_dimension})")
+    await ensure_search_cache_table(conn)
+    conn.run_sync.assert_not_called()
+
+    conn = connection(["id", "query_text", "query_embedding"], "vector(1536)")
+    await ensure_search_cache_table(conn)
+    assert str(conn.execute.call_args_list[-1].args[0]) == "DROP TABLE vector_search_cache"
+    conn.run_sync.assert_awaited_once_with(VectorSearchCache.__table__.create)
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_miss_and_are_purged(session, make_cache):
+    """Test TTL expiry"""
+    cache = make_cache()
+    params = cache.params_hash(5, None)
+    await cache.set("vector tips", params, EMBEDDING, RESULTS, 1.0, cache.generation)
+    entry = (await _entries(session))[0]
+    entry.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await session.commit()
+
+    assert await cache.get(session, "vector tips", params) is None
+
+    await cache.flush_hits(session)
+    assert await _entries(session) == []
+
+
+@pytest.mark.asyncio
+async def test_no_ttl(session, make_cache):
+    """Test a zero TTL stores entries without expiry"""
+    cache = make_cache(ttl_seconds=0)
+    await cache.set("vector tips", cache.params_hash(5, None), EMBEDDING, RESULTS, 1.0, 0)
+
+    assert (await _entries(session))[0].expires_at is None
+
+
+@pytest.mark.asyncio
+async def test_hit_statistics_are_batched(session, make_cache):
+    """Test hits are counted in memory and written by flush_hits"""
+    cache = make_cache()
+    params = cache.params_hash(5, None)
+    await cache.set("vector tips", params, EMBEDDING, RESULTS, 1.0, cache.generation)
+
+    for _ in range(3):
+        await cache.get(session, "vector tips", params)
+
+    entry = (await _entries(session))[0]
+    assert entry.hit_count == 0
+    assert cache.stats()["pending_hit_updates"] == 1
+
+    assert await cache.flush_hits(session) == 1
+    await session.refresh(entry)
+    assert entry.hit_count == 3
+    assert entry.last_hit_at is not None
+    assert cache.stats()["pending_hit_updates"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_entries_and_stale_writes(session, make_cache):
+    """Test invalidation clears the table and rejects searches started before it"""
+    cache = make_cache()
+    params = cache.params_hash(5, None)
+    await cache.set("vector tips", params, EMBEDDING, RESULTS, 1.0, cache.generation)
+    generation = cache.generation
+
+    await cache.invalidate()
+
+    assert await _entries(session) == []
+    assert not await cache.set("other", params, EMBEDDING, RESULTS, 1.0, generation)
+    assert await _entries(session) == []
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_lookup(make_cache):
+    """Test near-duplicate hits are gated by the similarity threshold"""
+    cache = make_cache(similarity_threshold=0.95)
+    db = MagicMock()
+    db.bind.dialect.name = "postgresql"
+    result = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    result.first.return_value = SimpleNamespace(id=4, results=RESULTS, similarity=0.97)
+    assert await cache.get_similar(db, EMBEDDING, "params") == RESULTS
+    assert "<=>" in str(db.execute.call_args[0][0])
+
+    result.first.return_value = SimpleNamespace(id=4, results=RESULTS, similarity=0.9)
+    assert await cache.get_similar(db, EMBEDDING, "params") is None
+
+    assert cache.stats()["similar_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_lookup_disabled(session, make_cache):
+    """Test no similarity lookup without a threshold or outside PostgreSQL"""
+    assert await make_cache().get_similar(session, EMBEDDING, "params") is None
+    assert await make_cache(similarity_threshold=0.9).get_similar(session, EMBEDDING, "params") is None
+
+
+@pytest.mark.asyncio
+async def test_search_documents_uses_cache(session, make_cache):
+    """Test a repeated search is answered from the cache without embedding the query"""
+    embeddings = MagicMock()
+    embeddings.generate_embedding = AsyncMock(return_value=EMBEDDING)
+    cache = make_cache()
+    service = IndexingService(embeddings=embeddings, result_cache=cache)
+
+    with patch.object(service, "_search_store", AsyncMock(return_value=RESULTS)) as search:
+        first = await service.search_documents("vector tips", limit=5, db=session)
+        second = await service.search_documents("vector tips", limit=5, db=session)
+
+    assert first == second == RESULTS
+    search.assert_awaited_once()
+    embeddings.generate_embedding.assert_awaited_once_with("vector tips")
+
+
+@pytest.mark.asyncio
+async def test_delete_document_invalidates_cache(session, make_cache):
+    """Test deleting a document clears cached results"""
+    cache = make_cache()
+    document = Document(filename="notes.txt", content_type="text/plain", file_size=10)
+    session.add(document)
+    await session.commit()
+    await cache.set("vector tips", cache.params_hash(5, None), EMBEDDING, RESULTS, 1.0, 0)
+
+    service = IndexingService(embeddings=MagicMock(), result_cache=cache)
+    await service.delete_document(session, document.id)
+
+    assert await _entries(session) == []
+    assert cache.generation == 1
@@ -0,0 +1,81 @@
+"""Tests for vectorized similarity module"""
+
+import numpy as np
+import pytest
+
+from app.core.similarity import (
+    SimilarityIndex,
+    cosine_similarity,
+    cosine_similarity_matrix,
+    mmr_select,
+    normalize,
+    top_k,
+)
+
+
+def test_normalize_keeps_zero_vectors():
+    """Test row normalization and zero-vector handling"""
+    matrix = normalize([[3.0, 4.0], [0.0, 0.0]])
+
+    assert matrix.dtype == np.float32
+    assert np.allclose(matrix[0], [0.6, 0.8])
+    assert np.allclose(matrix[1], [0.0, 0.0])
+
+
+def test_cosine_similarity():
+    """Test pairwise cosine similarity"""
+    assert abs(cosine_similarity([1.0, 2.0, 3.0], [1.0, 2.0, 3.0]) - 1.0) < 1e-6
+    assert abs(cosine_similarity([1.0, 0.0], [0.0, 1.0])) < 1e-6
+    assert cosine_similarity([0.0, 0.0], [1.0, 1.0]) == 0.0
+
+    with pytest.raises(ValueError, match="same dimension"):
+        cosine_similarity([1.0], [1.0, 2.0])
+
+
+def test_cosine_similarity_matrix_matches_pairwise():
+    """Test batched query x corpus scoring"""
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((3, 8))
+    corpus = rng.standard_normal((5, 8))
+
+    scores = cosine_similarity_matrix(queries, corpus)
+
+    assert scores.shape == (3, 5)
+    assert abs(scores[2, 4] - cosine_similarity(queries[2], corpus[4])) < 1e-5
+
+
+def test_top_k_orders_descending():
+    """Test argpartition-based top-k on vectors and matrices"""
+    indices, values = top_k(np.array([0.1, 0.9, 0.5, 0.7]), 2)
+    assert indices.tolist() == [1, 3]
+    assert np.allclose(values, [0.9, 0.7])
+
+    indices, _ = top_k(np.array([[0.1, 0.9, 0.5], [0.8, 0.2, 0.3]]), 5)
+    assert indices.tolist() == [[1, 2, 0], [0, 2, 1]]
+
+
+def test_similarity_index_search_and_duplicates():
+    """Test search with ids, thresholds and near-duplicate detection"""
+    index = SimilarityIndex([[1.0, 0.0], [0.0, 1.0], [0.99, 0.01]], ids=["a", "b", "c"])
+
+    results = index.search([[1.0, 0.0], [0.0, 1.0]], k=2, min_similarity=0.5)
+
+    assert [hit[0] for hit in results[0]] == ["a", "c"]
+    assert [hit[0] for hit in results[1]] == ["b"]
+    assert [(a, b) for a, b, _ in index.near_duplicates(0.99)] == [("a", "c")]
+
+
+def test_mmr_select_skips_near_duplicates():
+    """Test MMR trades a near-duplicate for a less relevant but distinct candidate"""
+    rng = np.random.default_rng(7)
+    base, other = rng.standard_normal((2, 64))
+    candidates = np.vstack([base, base + 0.01 * rng.standard_normal(64), other])
+    relevance = [0.9, 0.89, 0.6]
+
+    assert list(mmr_select(relevance, candidates, k=2, lambda_mult=1.0)) == [0, 1]
+    assert list(mmr_select(relevance, candidates, k=2, lambda_mult=0.5)) == [0, 2]
+    assert list(mmr_select(relevance, candidates, k=5)) == [0, 2, 1]
+    assert len(mmr_select([], np.empty((0, 64)), k=3)) == 0
+
+    with pytest.raises(ValueError):
+        mmr_select([0.9], candidates, k=1)
@@ -0,0 +1,123 @@
+"""Tests for the shared tokenizer service"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.llm import LLMManager, LLMResult
+from app.core.tokenizer import DEFAULT_ENCODING, TokenizerService
+
+
+class FakeEncoding:
+    """Whitespace encoding that records how it was called"""
+
+    def __init__(self):
+        self.batch_calls = []
+
+    def encode_ordinary(self, text):
+        return list(range(len(text.split())))
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        self.batch_calls.append((len(texts), num_threads))
+        return [self.encode_ordinary(text) for text in texts]
+
+    def decode(self, tokens):
+        return " ".join(str(token) for token in tokens)
+
+
+@pytest.fixture
+def fake_tiktoken():
+    """Patch tiktoken so encodings load without network access"""
+    encoding = FakeEncoding()
+
+    def encoding_for_model(model):
+        if model.startswith("unknown"):
+            raise KeyError(model)
+        return encoding
+
+    def get_encoding(name):
+        if name != DEFAULT_ENCODING:
+            raise ValueError(name)
+        return encoding
+
+    with patch("app.core.tokenizer.tiktoken") as mock_tiktoken:
+        mock_tiktoken.encoding_for_model.side_effect = encoding_for_model
+        mock_tiktoken.get_encoding.side_effect = get_encoding
+        yield mock_tiktoken, encoding
+
+
+def test_encoding_loaded_once_per_model(fake_tiktoken):
+    """Test repeated lookups reuse the loaded encoding"""
+    mock_tiktoken, encoding = fake_tiktoken
+    service = TokenizerService(default_model="gpt-4", num_threads=4)
+
+    assert service.get_encoding() is service.get_encoding("gpt-4") is encoding
+    service.count("one two")
+    assert mock_tiktoken.encoding_for_model.call_count == 1
+
+    # Unknown models fall back to the default encoding, and are remembered
+    assert service.get_encoding("unknown-model") is encoding
+    service.get_encoding("unknown-model")
+    assert mock_tiktoken.get_encoding.call_args_list[-1].args == (DEFAULT_ENCODING,)
+    assert mock_tiktoken.get_encoding.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_count_many_uses_one_batch_encode(fake_tiktoken):
+    """Test bulk counts match single counts and go through the batch encoder"""
+    _, encoding = fake_tiktoken
+    service = TokenizerService(default_model="gpt-4", num_threads=4)
+    texts = ["one", "one two", "", "one two three"]
+
+    assert service.count_many(texts) == [service.count(text) for text in texts] == [1, 2, 0, 3]
+    assert await service.count_many_async(texts) == [1, 2, 0, 3]
+    assert encoding.batch_calls == [(4, 4), (4, 4)]
+    assert service.count_many([]) == []
+
+
+def _manager(provider_result: LLMResult) -> LLMManager:
+    with patch("app.core.llm.settings") as mock_settings:
+        mock_settings.llm_provider = "openai"
+        mock_settings.openai_api_key = ""
+        manager = LLMManager()
+    manager.provider = MagicMock(model="gpt-4")
+    manager.provider.generate_with_usage = AsyncMock(return_value=provider_result)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_generate_with_usage_keeps_provider_counts():
+    """Test reported usage is passed through without re-encoding anything"""
+    manager = _manager(LLMResult(text="an answer", prompt_tokens=10, completion_tokens=5))
+
+    with patch("app.core.llm.tokenizer_service") as mock_tokenizer:
+        result = await manager.generate_with_usage(prompt="Hello!", use_cache=False)
+
+    assert (result.text, result.prompt_tokens, result.completion_tokens) == ("an answer", 10, 5)
+    mock_tokenizer.count_many_async.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_with_usage_counts_missing_usage():
+    """Test prompt and completion are counted together when the provider reports no usage"""
+    manager = _manager(LLMResult(text="a three word"))
+
+    with patch("app.core.llm.tokenizer_service") as mock_tokenizer:
+        mock_tokenizer.count_many_async = AsyncMock(return_value=[4, 2, 3])
+        result = await manager.generate_with_usage(prompt="Hi there", system_prompt="Be very brief", use_cache=False)
+
+    assert (result.prompt_tokens, result.completion_tokens) == (6, 3)
+    mock_tokenizer.count_many_async.assert_awaited_once_with(["Be very brief", "Hi there", "a three word"], "gpt-4")
+
+
+@pytest.mark.asyncio
+async def test_count_tokens_many_runs_off_the_event_loop():
+    """Test the manager's bulk count goes through the threaded tokenizer call"""
+    manager = _manager(LLMResult(text=""))
+
+    with patch("app.core.llm.tokenizer_service") as mock_tokenizer:
+        mock_tokenizer.count_many_async = AsyncMock(return_value=[2, 3])
+        assert await manager.count_tokens_many(["a b", "c d e"]) == [2, 3]
+
+    mock_tokenizer.count_many_async.assert_awaited_once_with(["a b", "c d e"], "gpt-4")
+    mock_tokenizer.count_many.assert_not_called()
@@ -0,0 +1,284 @@
+"""Tests for the pluggable vector stores"""
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.similarity import normalize
+from app.db.models import Document, DocumentChunk
+from app.db.vector_indexes import semantic_search_query
+from app.services.chunking import TextChunk
+from app.services.indexing_service import IndexingService
+from app.services.vector_store import VectorRecord, create_vector_store
+from app.services.vector_store.chroma import ChromaVectorStore, chroma_where
+from app.services.vector_store.memory import MemoryVectorStore
+from app.services.vector_store.pgvector import PgVectorStore
+from tests.conftest import random_vector
+
+DIMENSION = settings.embedding_dimension
+
+
+def _records():
+    return [
+        VectorRecord(
+            chunk_id=doc_idx * 10 + chunk_idx,
+            document_id=doc_idx,
+            embedding=random_vector(doc_idx * 10 + chunk_idx),
+            content=f"doc {doc_idx} chunk {chunk_idx}",
+            chunk_index=chunk_idx,
+            filename=f"doc{doc_idx}.txt",
+            metadata={"section": "intro" if chunk_idx == 0 else "body"},
+            tags=["guide"] if doc_idx == 1 else ["faq", "billing"],
+            language="en" if doc_idx == 1 else "de"
+        )
+        for doc_idx in (1, 2)
+        for chunk_idx in range(3)
+    ]
+
+
+@pytest.fixture
+async def session_factory(test_session_factory):
+    """Test database with two documents"""
+    async with test_session_factory() as db:
+        for doc_idx in (1, 2):
+            db.add(Document(id=doc_idx, filename=f"doc{doc_idx}.txt", content_type="text/plain", file_size=10))
+        await db.commit()
+    return test_session_factory
+
+
+@pytest.mark.asyncio
+async def test_memory_store_search():
+    """Test exact top-k search returns the stored payload"""
+    store = MemoryVectorStore(DIMENSION)
+    assert await store.upsert(_records()) == 6
+
+    results = await store.search(random_vector(21), limit=2)
+
+    assert results[0]["chunk_id"] == 21
+    assert results[0]["filename"] == "doc2.txt"
+    assert results[0]["content"] == "doc 2 chunk 1"
+    assert results[0]["metadata"] == {"section": "body"}
+    assert abs(results[0]["similarity"] - 1.0) < 1e-5
+    assert len(results) == 2
+    assert await store.search(random_vector(21), limit=6, min_similarity=0.5) == results[:1]
+
+
+@pytest.mark.asyncio
+async def test_memory_store_filters():
+    """Test filtered search only returns matching chunks"""
+    store = MemoryVectorStore(DIMENSION)
+    await store.upsert(_records())
+
+    results = await store.search(random_vector(21), limit=6, filters={"metadata": {"section": "intro"}})
+    assert sorted(result["chunk_id"] for result in results) == [10, 20]
+
+    results = await store.search(random_vector(21), limit=6, filters={"document_id": 1, "metadata": {"section": "body"}})
+    assert sorted(result["chunk_id"] for result in results) == [11, 12]
+
+    results = await store.search(random_vector(21), limit=6, filters={"tags": ["faq", "other"], "language": "de"})
+    assert sorted(result["chunk_id"] for result in results) == [20, 21, 22]
+
+    with pytest.raises(ValueError):
+        await store.search(random_vector(21), filters={"section": "intro"})
+
+
+@pytest.mark.asyncio
+async def test_memory_store_upsert_replaces_and_delete():
+    """Test upserts replace by chunk id and deletes remove a whole document"""
+    store = MemoryVectorStore(DIMENSION)
+    await store.upsert(_records())
+
+    updated = _records()[0]
+    updated.embedding = random_vector(99)
+    updated.content = "updated"
+    await store.upsert([updated])
+
+    assert (await store.stats())["vectors"] == 6
+    assert (await store.search(random_vector(99), limit=1))[0]["content"] == "updated"
+
+    assert await store.delete_document(1) == 3
+    assert await store.delete_document(1) == 0
+    stats = await store.stats()
+    assert stats["vectors"] == 3
+    assert stats["documents"] == 1
+    assert all(result["document_id"] == 2 for result in await store.search(random_vector(10), limit=6))
+
+
+@pytest.mark.asyncio
+async def test_memory_store_rejects_wrong_dimension():
+    """Test vectors of another dimension are rejected"""
+    store = MemoryVectorStore(DIMENSION)
+    record = _records()[0]
+    record.embedding = [1.0, 0.0]
+
+    with pytest.raises(ValueError):
+        await store.upsert([record])
+
+
+def test_create_vector_store(monkeypatch):
+    """Test the factory follows VECTOR_DB_TYPE and rejects unknown backends"""
+    monkeypatch.setattr(settings, "vector_db_type", "memory")
+
+    assert isinstance(create_vector_store(), MemoryVectorStore)
+    assert isinstance(create_vector_store("PGVECTOR"), PgVectorStore)
+    with pytest.raises(ValueError):
+        create_vector_store("faiss")
+
+
+def test_chroma_where():
+    """Test filter translation to Chroma where clauses"""
+    assert chroma_where(None) is None
+    assert chroma_where({"document_id": 3}) == {"document_id": {"$eq": 3}}
+    assert chroma_where({"document_id": [1, 2], "metadata": {"section": "body"}}) == {
+        "$and": [{"document_id": {"$in": [1, 2]}}, {"meta_section": {"$eq": "body"}}]
+    }
+    assert chroma_where({"tags": ["faq", "guide"], "language": "en"}) == {
+        "$and": [{"$or": [{"tag_faq": {"$eq": True}}, {"tag_guide": {"$eq": True}}]}, {"language": {"$eq": "en"}}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_chroma_store(tmp_path):
+    """Test the Chroma backend end to end"""
+    pytest.importorskip("chromadb")
+    store = ChromaVectorStore(str(tmp_path), collection_name="test")
+    await store.upsert(_records())
+
+    results = await store.search(random_vector(21), limit=2)
+    assert results[0]["chunk_id"] == 21
+    assert results[0]["metadata"] == {"section": "body"}
+
+    results = await store.search(random_vector(21), limit=6, filters={"metadata": {"section": "intro"}})
+    assert sorted(result["chunk_id"] for result in results) == [10, 20]
+
+    results = await store.search(random_vector(21), limit=6, filters={"tags": "guide"})
+    assert sorted(result["chunk_id"] for result in results) == [10, 11, 12]
+
+    assert await store.delete_document(1) == 3
+    assert (await store.stats())["vectors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pgvector_store_upsert_and_delete(session_factory):
+    """Test pgvector upserts insert new rows, update existing ones and delete by document"""
+    store = PgVectorStore(session_factory=session_factory)
+    await store.upsert(_records())
+
+    updated = _records()[0]
+    updated.content = "updated"
+    await store.upsert([updated])
+
+    async with session_factory() as db:
+        chunk = await db.get(DocumentChunk, 10)
+        assert chunk.content == "updated"
+    assert (await store.stats())["vectors"] == 6
+
+    assert await store.delete_document(1) == 3
+    async with session_factory() as db:
+        result = await db.execute(select(DocumentChunk.document_id))
+        assert set(result.scalars().all()) == {2}
+
+
+def test_semantic_search_query_filters():
+    """Test filters are applied inside the top-k query"""
+    query = semantic_search_query([0.1] * DIMENSION, limit=5, mode="none",
+                                  filters={"document_id": [1, 2], "metadata": {"section": "body"}})
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    inner = sql[sql.index("FROM (") :]
+    assert "document_chunks.document_id IN" in inner
+    assert "CAST(document_chunks.chunk_metadata AS JSONB) @>" in inner
+
+
+@pytest.mark.asyncio
+async def test_indexing_service_uses_external_store(session_factory):
+    """Test search and delete go to a store outside document_chunks"""
+    embeddings = MagicMock()
+    embeddings.generate_embedding = AsyncMock(return_value=random_vector(11))
+    store = MemoryVectorStore(DIMENSION)
+    await store.upsert(_records())
+    service = IndexingService(embeddings=embeddings, store=store)
+
+    async with session_factory() as db:
+        results = await service.search_documents("chunk", limit=1, db=db)
+        assert results[0]["chunk_id"] == 11
+
+        await service.delete_document(db, 1)
+
+    assert (await store.stats())["vectors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_indexing_does_not_upsert_uncommitted_chunks(session_factory):
+    """Test an external store only receives chunks after their insert is committed"""
+    embeddings = MagicMock()
+    embeddings.generate_embeddings_batch = AsyncMock(return_value=[random_vector(1), random_vector(2)])
+    store = MemoryVectorStore(DIMENSION)
+    service = IndexingService(embeddings=embeddings, store=store)
+    service.text_extractor = MagicMock(extract_text=AsyncMock(return_value="first part. second part."))
+    service.chunker = MagicMock()
+    service.chunker.chunk_text.return_value = [
+        TextChunk(content=text, index=idx, token_count=2, start_char=0, end_char=len(text))
+        for idx, text in enumerate(["first part.", "second part."])
+    ]
+
+    async with session_factory() as db:
+        commit = db.commit
+        commits = []
+
+        async def failing_chunk_commit():
+            commits.append(1)
+            if len(commits) == 2:
+                await db.rollback()
+                raise RuntimeError("commit failed")
+            await commit()
+
+        db.commit = failing_chunk_commit
+        with pytest.raises(Exception, match="commit failed"):
+            await service.process_and_index_document(db, 1, b"", "text/plain")
+
+    assert (await store.stats())["vectors"] == 0
+
+    async with session_factory() as db:
+        await service.process_and_index_document(db, 2, b"", "text/plain")
+        stored = list(await db.scalars(select(DocumentChunk.id).where(DocumentChunk.document_id == 2)))
+
+    assert len(await store.get_embeddings(stored)) == 2
+
+
+@pytest.mark.asyncio
+async def test_store_get_embeddings(session_factory):
+    """Test stores return embeddings for known chunk ids only"""
+    memory_store = MemoryVectorStore(DIMENSION)
+    pg_store = PgVectorStore(session_factory=session_factory)
+    for store in (memory_store, pg_store):
+        await store.upsert(_records())
+        embeddings = await store.get_embeddings([10, 21, 99])
+
+        assert set(embeddings) == {10, 21}
+        assert np.allclose(normalize(embeddings[21]), normalize(random_vector(21)), atol=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_search_documents_diversify():
+    """Test diversified search replaces near-duplicate chunks with distinct ones"""
+    rng = np.random.default_rng(3)
+    base, other = rng.standard_normal((2, DIMENSION))
+    vectors = [base + 0.01 * rng.standard_normal(DIMENSION) for _ in range(3)] + [other]
+    store = MemoryVectorStore(DIMENSION)
+    await store.upsert([
+        VectorRecord(chunk_id=idx + 1, document_id=1, embedding=vector.tolist(), content=f"chunk {idx}", chunk_index=idx)
+        for idx, vector in enumerate(vectors)
+    ])
+    embeddings = MagicMock()
+    embeddings.generate_embedding = AsyncMock(return_value=(base + 0.5 * other).tolist())
+    service = IndexingService(embeddings=embeddings, store=store)
+
+    plain = await service.search_documents("chunk", limit=2, db=MagicMock())
+    diverse = await service.search_documents("chunk", limit=2, db=MagicMock(), diversify=True, mmr_lambda=0.5)
+
+    assert 4 not in [result["chunk_id"] for result in plain]
+    assert [result["chunk_id"] for result in diverse][1] == 4
@@ -9,5 +9,7 @@ GRANT ALL PRIVILEGES ON DATABASE ai_platform TO aiplatform;
 -- Set timezone
 SET timezone = 'UTC';
 
--- Create indexes will be handled by SQLAlchemy migrations
+-- Tables, the vector index on document_chunks.embedding (HNSW or IVFFlat,
+-- see VECTOR_INDEX_TYPE) and the generated content_tsv column with its GIN
+-- index for hybrid search are created by init_db once the tables exist
 -- This script only handles initial setup